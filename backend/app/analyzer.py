@@ -4,6 +4,143 @@ from typing import Dict, List, Optional
 import json
 import os
 
+from .config import settings
+from .interval_index import IntervalIndex
+from .comparison import align_spectra
+from .change_detection import classify_changes
+from .noise_floor import rolling_noise_floor
+from .anomaly_detection import detect_anomalies
+from .emission_bandwidth import measure_emissions
+from .license_parser import parse_emission_bandwidth_khz
+
+MATCH_TOLERANCE_MHZ = 0.1
+MATCH_CANDIDATES = 3
+MATCH_WEIGHTS = {'frequency': 0.5, 'distance': 0.35, 'service': 0.15}
+
+# (start MHz, stop MHz, service keywords) of the dominant allocation per range
+SERVICE_HINTS = [
+    (87.5, 108.0, ('broadcast', 'siaran')),
+    (108.0, 137.0, ('aeronautical', 'penerbangan')),
+    (156.0, 162.05, ('maritime', 'maritim', 'pelayaran')),
+    (174.0, 230.0, ('broadcast', 'siaran')),
+    (478.0, 806.0, ('broadcast', 'siaran', 'television', 'televisi')),
+]
+
+def band_noise_floor(band_channels: pd.DataFrame) -> float:
+    """Median of the lowest 10 % of the average levels of a band"""
+    lowest_10_percent = int(len(band_channels) * 0.1)
+    if lowest_10_percent < 1:
+        lowest_10_percent = 1
+    
+    lowest_signals = band_channels.nsmallest(lowest_10_percent, 'avg_field_strength')
+    return float(lowest_signals['avg_field_strength'].median())
+
+def detect_peaks(band_channels: pd.DataFrame, threshold: float,
+                 prominence: float = 3.0, min_distance: int = 3) -> pd.DataFrame:
+    """
+    Detect true signal peaks using numpy-based peak detection.
+    Only returns actual peaks (local maxima) that are above the threshold.
+    Excludes valleys and non-peak points.
+    
+    Args:
+        band_channels: DataFrame with channel data
+        threshold: Minimum signal strength to consider, a single value or
+            one per row of band_channels
+        prominence: Minimum dB difference from surrounding valleys (default 3 dB)
+        min_distance: Minimum channels between peaks (default 3)
+    """
+    if len(band_channels) < 3:
+        return band_channels[band_channels['avg_field_strength'] > threshold]
+    
+    # Sort by frequency to ensure proper peak detection; a per-channel
+    # threshold array follows the same order
+    order = np.argsort(band_channels['frequency'].to_numpy(), kind='stable')
+    sorted_channels = band_channels.iloc[order].reset_index(drop=True)
+    thresholds = np.broadcast_to(np.asarray(threshold, dtype=float), (len(band_channels),))[order]
+    signal_values = sorted_channels['avg_field_strength'].values
+    n = len(signal_values)
+    
+    # Find local maxima (points higher than both neighbors)
+    local_max_mask = np.zeros(n, dtype=bool)
+    for i in range(1, n - 1):
+        if signal_values[i] > signal_values[i-1] and signal_values[i] > signal_values[i+1]:
+            local_max_mask[i] = True
+    
+    # Also check edges if they're higher than their single neighbor
+    if n > 1:
+        if signal_values[0] > signal_values[1]:
+            local_max_mask[0] = True
+        if signal_values[-1] > signal_values[-2]:
+            local_max_mask[-1] = True
+    
+    # Get indices of local maxima
+    peak_indices = np.where(local_max_mask)[0]
+    
+    if len(peak_indices) == 0:
+        return pd.DataFrame(columns=band_channels.columns)
+    
+    # Filter by threshold
+    peak_indices = [i for i in peak_indices if signal_values[i] > thresholds[i]]
+    
+    if len(peak_indices) == 0:
+        return pd.DataFrame(columns=band_channels.columns)
+    
+    # Filter by prominence (peak must be X dB above surrounding valleys)
+    prominent_peaks = []
+    for idx in peak_indices:
+        # Find left valley
+        left_min = signal_values[idx]
+        for j in range(idx - 1, -1, -1):
+            if signal_values[j] < left_min:
+                left_min = signal_values[j]
+            if signal_values[j] > signal_values[idx]:
+                break
+    
+        # Find right valley
+        right_min = signal_values[idx]
+        for j in range(idx + 1, n):
+            if signal_values[j] < right_min:
+                right_min = signal_values[j]
+            if signal_values[j] > signal_values[idx]:
+                break
+    
+        # Calculate prominence (height above the higher of the two valleys)
+        valley_height = max(left_min, right_min)
+        peak_prominence = signal_values[idx] - valley_height
+    
+        if peak_prominence >= prominence:
+            prominent_peaks.append((idx, signal_values[idx], peak_prominence))
+    
+    if len(prominent_peaks) == 0:
+        return pd.DataFrame(columns=band_channels.columns)
+    
+    # Sort by signal strength descending
+    prominent_peaks.sort(key=lambda x: x[1], reverse=True)
+    
+    # Apply minimum distance filter (keep strongest peaks, remove nearby weaker ones)
+    final_peaks = []
+    for peak in prominent_peaks:
+        idx = peak[0]
+        # Check if too close to an already selected peak
+        too_close = False
+        for selected_idx in final_peaks:
+            if abs(idx - selected_idx) < min_distance:
+                too_close = True
+                break
+        if not too_close:
+            final_peaks.append(idx)
+    
+    if len(final_peaks) == 0:
+        return pd.DataFrame(columns=band_channels.columns)
+    
+    # Get the peak channels
+    peak_channels = sorted_channels.iloc[final_peaks].copy()
+    
+    # Sort by field strength descending
+    peak_channels = peak_channels.sort_values('avg_field_strength', ascending=False)
+    
+    return peak_channels
+
 class SpectrumAnalyzer:
     def __init__(self, channels_df: pd.DataFrame, bands: List[Dict], metadata: Dict, db_session=None):
         self.channels_df = channels_df
@@ -11,29 +148,46 @@ class SpectrumAnalyzer:
         self.metadata = metadata
         self.db_session = db_session
         self.licensed_stations = self._load_licensed_stations()
+        self._build_station_arrays()
     
     def _load_licensed_stations(self) -> List[Dict]:
         """
-        Load licensed stations from database if available, otherwise from JSON file
+        Load licensed stations from database if available, otherwise from JSON file.
+        When the measurement location is known only stations within
+        LICENSE_MATCH_RADIUS_KM of it are loaded, nearest first.
         """
         stations = []
+        site = self._measurement_location()
+        radius_km = settings.LICENSE_MATCH_RADIUS_KM
         
         # Try to load from database first
         if self.db_session:
             try:
                 from .database import LicensedStation
-                db_stations = self.db_session.query(LicensedStation).all()
+                from .spatial_index import stations_within_radius
                 
-                for s in db_stations:
+                if site:
+                    db_stations = stations_within_radius(self.db_session, site[0], site[1], radius_km)
+                    # Stations without coordinates are kept after the located ones, as in the JSON fallback
+                    unlocated = self.db_session.query(LicensedStation).filter(
+                        (LicensedStation.latitude.is_(None)) | (LicensedStation.longitude.is_(None))
+                    ).order_by(LicensedStation.id)
+                    db_stations += [(s, None) for s in unlocated]
+                else:
+                    db_stations = [(s, None) for s in self.db_session.query(LicensedStation).all()]
+                
+                for s, distance_km in db_stations:
                     stations.append({
                         'name': s.stn_name or s.clnt_name,
                         'clnt_name': s.clnt_name,
                         'callsign': s.callsign,
                         'frequency': s.freq,
+                        'freq_pair': s.freq_pair,
                         'location': s.city or s.province,
                         'service': s.service,
                         'latitude': s.latitude,
                         'longitude': s.longitude,
+                        'distance_km': round(distance_km, 2) if distance_km is not None else None,
                         'eq_mfr': s.eq_mfr,
                         'eq_mdl': s.eq_mdl,
                         'emis_class_1': s.emis_class_1,
@@ -50,12 +204,42 @@ class SpectrumAnalyzer:
         if os.path.exists(stations_file):
             try:
                 with open(stations_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    stations = json.load(f)
+                return self._filter_by_distance(stations, site, radius_km) if site else stations
             except:
                 pass
         
         return []
     
+    def _measurement_location(self) -> Optional[tuple]:
+        lat = self.metadata.get('Location (lat)')
+        lon = self.metadata.get('Location (lon)')
+        if isinstance(lat, (int, float)) and isinstance(lon, (int, float)):
+            return float(lat), float(lon)
+        return None
+    
+    def _filter_by_distance(self, stations: List[Dict], site: tuple, radius_km: float) -> List[Dict]:
+        """
+        Keep stations within radius_km of the site, nearest first.
+        Stations without coordinates are kept after the located ones.
+        """
+        from .spatial_index import haversine_km
+        
+        lats = np.array([s.get('latitude') if s.get('latitude') is not None else np.nan for s in stations], dtype=float)
+        lons = np.array([s.get('longitude') if s.get('longitude') is not None else np.nan for s in stations], dtype=float)
+        distances = haversine_km(site[0], site[1], lats, lons)
+        
+        located = np.flatnonzero(distances <= radius_km)
+        located = located[np.argsort(distances[located], kind='stable')]
+        unlocated = np.flatnonzero(np.isnan(distances))
+        
+        result = []
+        for i in located:
+            result.append({**stations[i], 'distance_km': round(float(distances[i]), 2)})
+        for i in unlocated:
+            result.append({**stations[i], 'distance_km': None})
+        return result
+    
     def calculate_auto_threshold(self, band_number: int, margin_db: float = 10.0) -> Dict:
         """
         Calculate automatic threshold based on noise floor + margin
@@ -88,7 +272,12 @@ class SpectrumAnalyzer:
             'recommendation': f"Threshold otomatis: {round(auto_threshold, 2)} dBµV/m (Noise Floor: {round(noise_floor, 2)} + Margin: {margin_db} dB)"
         }
     
-    def analyze_band(self, band_number: int, threshold: float = 50.0, use_auto_threshold: bool = False, margin_db: float = 10.0) -> Dict:
+    def analyze_band(self, band_number: int, threshold: float = 50.0, use_auto_threshold: bool = False, margin_db: float = 10.0,
+                     adaptive_noise_floor: bool = False, noise_window_mhz: Optional[float] = None) -> Dict:
+        """
+        With adaptive_noise_floor the threshold follows a rolling noise floor
+        across frequency plus margin_db instead of one value for the band.
+        """
         if band_number > len(self.bands):
             raise ValueError(f"Band {band_number} not found")
         
@@ -115,25 +304,60 @@ class SpectrumAnalyzer:
             }
         
         noise_floor = self._calculate_noise_floor(band_channels)
-        
-        # Calculate auto threshold if requested
-        if use_auto_threshold:
+        noise_floor_profile = None
+        
+        if adaptive_noise_floor:
+            band_channels = band_channels.sort_values('frequency', kind='stable')
+            floor_curve = rolling_noise_floor(
+                band_channels['frequency'].to_numpy(), band_channels['avg_field_strength'].to_numpy(), noise_window_mhz
+            )
+            threshold_curve = floor_curve + margin_db
+            noise_floor = float(np.median(floor_curve))
+            threshold = float(np.median(threshold_curve))
+            noise_floor_profile = {
+                'window_mhz': noise_window_mhz or settings.NOISE_FLOOR_WINDOW_MHZ,
+                'percentile': settings.NOISE_FLOOR_PERCENTILE,
+                'min': round(float(floor_curve.min()), 2),
+                'max': round(float(floor_curve.max()), 2)
+            }
+        elif use_auto_threshold:
+            # Calculate auto threshold if requested
             threshold = noise_floor + margin_db
         
         # Detect true peaks using scipy find_peaks
-        peak_channels = self._detect_peaks(band_channels, threshold)
+        peak_channels = self._detect_peaks(band_channels, threshold_curve if adaptive_noise_floor else threshold)
         
         occupancy_percentage = (len(peak_channels) / len(band_channels)) * 100
         
+        emissions = self._measure_peak_emissions(
+            band_channels, peak_channels, floor_curve if adaptive_noise_floor else noise_floor
+        )
+        
         occupied_list = []
-        for _, row in peak_channels.iterrows():
-            station_match = self._match_station(row['frequency'])
+        peak_columns = zip(
+            peak_channels['channel_no'].to_numpy(),
+            peak_channels['frequency'].to_numpy(dtype=float),
+            peak_channels['avg_field_strength'].to_numpy(dtype=float),
+            peak_channels['max_field_strength'].to_numpy(dtype=float),
+            emissions['bandwidth_99_khz'],
+            emissions['bandwidth_xdb_khz'],
+            emissions['center_frequency'],
+            emissions['integrated_level']
+        )
+        for channel_no, frequency, avg_level, max_level, bandwidth, bandwidth_xdb, center, integrated in peak_columns:
+            # Match on the measured emission rather than the peak channel
+            candidates = self.rank_stations(float(center), bandwidth_khz=float(bandwidth) or band.get('bandwidth'))
             occupied_list.append({
-                'channel_no': int(row['channel_no']),
-                'frequency': float(row['frequency']),
-                'avg_field_strength': float(row['avg_field_strength']),
-                'max_field_strength': float(row['max_field_strength']),
-                'station': station_match
+                'channel_no': int(channel_no),
+                'frequency': float(frequency),
+                'avg_field_strength': float(avg_level),
+                'max_field_strength': float(max_level),
+                'center_frequency': float(center),
+                'bandwidth_khz': float(bandwidth),
+                'bandwidth_xdb_khz': float(bandwidth_xdb),
+                'integrated_level': float(integrated),
+                'station': candidates[0] if candidates else None,
+                'candidates': candidates
             })
         
         top_signals = band_channels.nlargest(20, 'avg_field_strength')[
@@ -141,7 +365,7 @@ class SpectrumAnalyzer:
         ].to_dict('records')
         
         for signal in top_signals:
-            signal['station'] = self._match_station(signal['frequency'])
+            signal['station'] = self._match_station(signal['frequency'], band.get('bandwidth'))
         
         anomalies = self._detect_anomalies(band_channels, band)
         
@@ -149,7 +373,8 @@ class SpectrumAnalyzer:
             'noise_floor': round(noise_floor, 2),
             'suggested_threshold': round(noise_floor + margin_db, 2),
             'margin_db': margin_db,
-            'is_auto': use_auto_threshold
+            'is_auto': use_auto_threshold or adaptive_noise_floor,
+            'adaptive': noise_floor_profile
         }
         
         return {
@@ -166,168 +391,240 @@ class SpectrumAnalyzer:
             'auto_threshold_info': auto_threshold_info
         }
     
+    def _measure_peak_emissions(self, band_channels: pd.DataFrame, peak_channels: pd.DataFrame,
+                                noise_floor) -> Dict[str, np.ndarray]:
+        """
+        Occupied bandwidth, centre frequency and integrated level of every
+        peak, in the row order of peak_channels. noise_floor is a scalar or
+        one value per row of band_channels.
+        """
+        order = np.argsort(band_channels['frequency'].to_numpy(), kind='stable')
+        freqs = band_channels['frequency'].to_numpy(dtype=float)[order]
+        levels = band_channels['avg_field_strength'].to_numpy(dtype=float)[order]
+        floor = np.broadcast_to(np.asarray(noise_floor, dtype=float), (len(band_channels),))[order]
+        
+        positions = np.searchsorted(freqs, peak_channels['frequency'].to_numpy(dtype=float))
+        positions = np.clip(positions, 0, max(len(freqs) - 1, 0))
+        return measure_emissions(freqs, levels, positions, floor)
+    
     def _calculate_noise_floor(self, band_channels: pd.DataFrame) -> float:
-        lowest_10_percent = int(len(band_channels) * 0.1)
-        if lowest_10_percent < 1:
-            lowest_10_percent = 1
+        return band_noise_floor(band_channels)
+    
+    def _detect_peaks(self, band_channels: pd.DataFrame, threshold: float,
+                      prominence: float = 3.0, min_distance: int = 3) -> pd.DataFrame:
+        return detect_peaks(band_channels, threshold, prominence, min_distance)
+    
+    def _build_station_arrays(self):
+        """
+        Column arrays over licensed_stations so candidate scoring is vectorized.
+        """
+        stations = self.licensed_stations
+        
+        freqs = np.array([s.get('frequency') if s.get('frequency') is not None else np.nan for s in stations], dtype=float)
+        pairs = np.array([s.get('freq_pair') if s.get('freq_pair') is not None else np.nan for s in stations], dtype=float)
+        bandwidths = np.array([
+            parse_emission_bandwidth_khz(s.get('emis_class_1')) or np.nan for s in stations
+        ], dtype=float)
+        
+        # Occupied range of every assignment: [f - bw/2, f + bw/2] around the
+        # main and the duplex pair frequency. Without an emission class the
+        # legacy fixed tolerance is used as half-width.
+        half_widths = np.where(np.isnan(bandwidths), MATCH_TOLERANCE_MHZ, bandwidths / 2000.0)
+        station_ids = np.arange(len(stations))
+        has_freq = ~np.isnan(freqs)
+        has_pair = ~np.isnan(pairs)
+        
+        self._interval_station = np.concatenate([station_ids[has_freq], station_ids[has_pair]])
+        self._interval_center = np.concatenate([freqs[has_freq], pairs[has_pair]])
+        self._interval_half = np.concatenate([half_widths[has_freq], half_widths[has_pair]])
+        self._station_bandwidths = bandwidths
+        self._station_index = IntervalIndex(
+            self._interval_center - self._interval_half,
+            self._interval_center + self._interval_half
+        )
         
-        lowest_signals = band_channels.nsmallest(lowest_10_percent, 'avg_field_strength')
-        return float(lowest_signals['avg_field_strength'].median())
+        lats = np.array([s.get('latitude') if s.get('latitude') is not None else np.nan for s in stations], dtype=float)
+        lons = np.array([s.get('longitude') if s.get('longitude') is not None else np.nan for s in stations], dtype=float)
+        
+        site = self._measurement_location()
+        if site and len(stations):
+            from .spatial_index import haversine_km
+            self._station_distances = haversine_km(site[0], site[1], lats, lons)
+        else:
+            self._station_distances = np.full(len(stations), np.nan)
+        
+        # Per-station service score for every SERVICE_HINTS range: 1.0 if the
+        # service fits the range, 0.0 if it is another service, 0.5 if unknown
+        services = [(s.get('service') or '').lower() for s in stations]
+        self._service_scores = []
+        for _, _, keywords in SERVICE_HINTS:
+            self._service_scores.append(np.array([
+                (1.0 if any(word in service for word in keywords) else 0.0) if service else 0.5
+                for service in services
+            ]))
+    
+    def _service_score(self, frequency: float, candidates: np.ndarray) -> np.ndarray:
+        for (start, stop, _), scores in zip(SERVICE_HINTS, self._service_scores):
+            if start <= frequency <= stop:
+                return scores[candidates]
+        return np.full(len(candidates), 0.5)
     
-    def _detect_peaks(self, band_channels: pd.DataFrame, threshold: float, 
-                       prominence: float = 3.0, min_distance: int = 3) -> pd.DataFrame:
+    def rank_stations(self, frequency: float, limit: int = MATCH_CANDIDATES,
+                      bandwidth_khz: Optional[float] = None) -> List[Dict]:
         """
-        Detect true signal peaks using numpy-based peak detection.
-        Only returns actual peaks (local maxima) that are above the threshold.
-        Excludes valleys and non-peak points.
-        
-        Args:
-            band_channels: DataFrame with channel data
-            threshold: Minimum signal strength to consider
-            prominence: Minimum dB difference from surrounding valleys (default 3 dB)
-            min_distance: Minimum channels between peaks (default 3)
+        Rank the licensed stations whose occupied range overlaps an emission.
+        
+        The emission spans bandwidth_khz around frequency (a point if not
+        given). Overlapping assignments come from the interval index; each
+        candidate is scored on its offset relative to the combined half-widths,
+        great-circle distance from the measurement site and whether its service
+        fits the band. The best scoring candidates are returned first.
         """
-        if len(band_channels) < 3:
-            return band_channels[band_channels['avg_field_strength'] > threshold]
-        
-        # Sort by frequency to ensure proper peak detection
-        sorted_channels = band_channels.sort_values('frequency').reset_index(drop=True)
-        signal_values = sorted_channels['avg_field_strength'].values
-        n = len(signal_values)
-        
-        # Find local maxima (points higher than both neighbors)
-        local_max_mask = np.zeros(n, dtype=bool)
-        for i in range(1, n - 1):
-            if signal_values[i] > signal_values[i-1] and signal_values[i] > signal_values[i+1]:
-                local_max_mask[i] = True
-        
-        # Also check edges if they're higher than their single neighbor
-        if n > 1:
-            if signal_values[0] > signal_values[1]:
-                local_max_mask[0] = True
-            if signal_values[-1] > signal_values[-2]:
-                local_max_mask[-1] = True
-        
-        # Get indices of local maxima
-        peak_indices = np.where(local_max_mask)[0]
-        
-        if len(peak_indices) == 0:
-            return pd.DataFrame(columns=band_channels.columns)
-        
-        # Filter by threshold
-        peak_indices = [i for i in peak_indices if signal_values[i] > threshold]
-        
-        if len(peak_indices) == 0:
-            return pd.DataFrame(columns=band_channels.columns)
-        
-        # Filter by prominence (peak must be X dB above surrounding valleys)
-        prominent_peaks = []
-        for idx in peak_indices:
-            # Find left valley
-            left_min = signal_values[idx]
-            for j in range(idx - 1, -1, -1):
-                if signal_values[j] < left_min:
-                    left_min = signal_values[j]
-                if signal_values[j] > signal_values[idx]:
-                    break
-            
-            # Find right valley
-            right_min = signal_values[idx]
-            for j in range(idx + 1, n):
-                if signal_values[j] < right_min:
-                    right_min = signal_values[j]
-                if signal_values[j] > signal_values[idx]:
-                    break
-            
-            # Calculate prominence (height above the higher of the two valleys)
-            valley_height = max(left_min, right_min)
-            peak_prominence = signal_values[idx] - valley_height
-            
-            if peak_prominence >= prominence:
-                prominent_peaks.append((idx, signal_values[idx], peak_prominence))
-        
-        if len(prominent_peaks) == 0:
-            return pd.DataFrame(columns=band_channels.columns)
-        
-        # Sort by signal strength descending
-        prominent_peaks.sort(key=lambda x: x[1], reverse=True)
-        
-        # Apply minimum distance filter (keep strongest peaks, remove nearby weaker ones)
-        final_peaks = []
-        for peak in prominent_peaks:
-            idx = peak[0]
-            # Check if too close to an already selected peak
-            too_close = False
-            for selected_idx in final_peaks:
-                if abs(idx - selected_idx) < min_distance:
-                    too_close = True
-                    break
-            if not too_close:
-                final_peaks.append(idx)
-        
-        if len(final_peaks) == 0:
-            return pd.DataFrame(columns=band_channels.columns)
-        
-        # Get the peak channels
-        peak_channels = sorted_channels.iloc[final_peaks].copy()
-        
-        # Sort by field strength descending
-        peak_channels = peak_channels.sort_values('avg_field_strength', ascending=False)
-        
-        return peak_channels
-    
-    def _match_station(self, frequency: float) -> Optional[Dict]:
-        for station in self.licensed_stations:
-            if abs(station.get('frequency', 0) - frequency) < 0.1:
-                return {
-                    'name': station.get('name', 'Unknown'),
-                    'clnt_name': station.get('clnt_name', ''),
-                    'callsign': station.get('callsign', ''),
-                    'latitude': station.get('latitude'),
-                    'longitude': station.get('longitude'),
-                    'eq_mfr': station.get('eq_mfr', ''),
-                    'eq_mdl': station.get('eq_mdl', ''),
-                    'emis_class_1': station.get('emis_class_1', ''),
-                    'licensed': True
-                }
-        return None
+        half_query = (bandwidth_khz or 0.0) / 2000.0
+        hits = self._station_index.overlap(frequency - half_query, frequency + half_query)
+        if len(hits) == 0:
+            return []
+        
+        offsets = np.abs(self._interval_center[hits] - frequency)
+        reach = self._interval_half[hits] + half_query
+        hit_freq_score = 1.0 - np.clip(offsets / reach, 0.0, 1.0)
+        
+        # A station can hit with both its frequency and its duplex pair:
+        # keep the better of the two
+        hit_stations = self._interval_station[hits]
+        order = np.lexsort((-hit_freq_score, hit_stations))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = hit_stations[order][1:] != hit_stations[order][:-1]
+        best = order[first]
+        
+        candidates = hit_stations[best]
+        freq_score = hit_freq_score[best]
+        matched_freqs = self._interval_center[hits][best]
+        
+        distances = self._station_distances[candidates]
+        radius_km = settings.LICENSE_MATCH_RADIUS_KM
+        distance_score = np.where(
+            np.isnan(distances), 0.5, 1.0 - np.clip(distances / radius_km, 0.0, 1.0)
+        )
+        
+        service_score = self._service_score(frequency, candidates)
+        
+        scores = (
+            MATCH_WEIGHTS['frequency'] * freq_score +
+            MATCH_WEIGHTS['distance'] * distance_score +
+            MATCH_WEIGHTS['service'] * service_score
+        )
+        
+        ranked = []
+        for k in np.argsort(-scores, kind='stable')[:limit]:
+            station = self.licensed_stations[candidates[k]]
+            distance = distances[k]
+            bandwidth = self._station_bandwidths[candidates[k]]
+            ranked.append({
+                'name': station.get('name', 'Unknown'),
+                'clnt_name': station.get('clnt_name', ''),
+                'callsign': station.get('callsign', ''),
+                'frequency': station.get('frequency'),
+                'matched_frequency': float(matched_freqs[k]),
+                'bandwidth_khz': None if np.isnan(bandwidth) else float(bandwidth),
+                'latitude': station.get('latitude'),
+                'longitude': station.get('longitude'),
+                'service': station.get('service', ''),
+                'distance_km': None if np.isnan(distance) else round(float(distance), 2),
+                'freq_offset_khz': round(abs(float(matched_freqs[k]) - frequency) * 1000, 2),
+                'match_score': round(float(scores[k]), 3),
+                'eq_mfr': station.get('eq_mfr', ''),
+                'eq_mdl': station.get('eq_mdl', ''),
+                'emis_class_1': station.get('emis_class_1', ''),
+                'licensed': True
+            })
+        return ranked
+    
+    def _match_station(self, frequency: float, bandwidth_khz: Optional[float] = None) -> Optional[Dict]:
+        ranked = self.rank_stations(frequency, bandwidth_khz=bandwidth_khz)
+        return ranked[0] if ranked else None
     
     def _detect_anomalies(self, band_channels: pd.DataFrame, band: Dict) -> List[Dict]:
-        anomalies = []
-        
-        high_power = band_channels[band_channels['avg_field_strength'] > 80]
-        for _, row in high_power.iterrows():
-            anomalies.append({
-                'type': 'high_power',
-                'frequency': float(row['frequency']),
-                'avg_field_strength': float(row['avg_field_strength']),
-                'description': f"Signal kuat tidak biasa: {row['avg_field_strength']:.1f} dBµV/m"
-            })
-        
-        return anomalies
+        return detect_anomalies(band_channels, band)
     
     def compare_analyses(self, other_channels_df: pd.DataFrame, band_number: int) -> Dict:
         band = self.bands[band_number - 1]
         
-        current_band = self.channels_df[
-            (self.channels_df['frequency'] >= band['start_freq']) &
-            (self.channels_df['frequency'] <= band['stop_freq'])
-        ]
+        # Align onto this measurement's grid instead of merging on exact
+        # frequencies, which drops channels that differ by float noise
+        frequencies, values = align_spectra(
+            [self.channels_df, other_channels_df], band['start_freq'], band['stop_freq']
+        )
+        both = ~np.isnan(values).any(axis=0)
+        
+        return {
+            'frequencies': frequencies[both].tolist(),
+            'current_values': values[0, both].tolist(),
+            'other_values': values[1, both].tolist()
+        }
+    
+    def detect_changes(self, baseline_channels_df: pd.DataFrame, band_number: int,
+                       threshold: Optional[float] = None, margin_db: float = 10.0,
+                       match_tolerance_khz: float = 100.0, shift_tolerance_khz: float = 10.0,
+                       level_change_db: float = 6.0) -> Dict:
+        """
+        Compare this (new) measurement against a baseline of the same station.
+        Without a threshold the higher of both noise floors + margin_db is used
+        so that a noisier sweep does not produce spurious new emissions.
+        """
+        if band_number < 1 or band_number > len(self.bands):
+            raise ValueError(f"Band {band_number} not found")
         
-        other_band = other_channels_df[
-            (other_channels_df['frequency'] >= band['start_freq']) &
-            (other_channels_df['frequency'] <= band['stop_freq'])
+        band = self.bands[band_number - 1]
+        frames = [baseline_channels_df, self.channels_df]
+        band_frames = [
+            df[(df['frequency'] >= band['start_freq']) & (df['frequency'] <= band['stop_freq'])]
+            for df in frames
         ]
         
-        merged = pd.merge(
-            current_band[['frequency', 'avg_field_strength']],
-            other_band[['frequency', 'avg_field_strength']],
-            on='frequency',
-            suffixes=('_current', '_other')
-        )
+        if any(len(df) == 0 for df in band_frames):
+            noise_floors = [None, None]
+        else:
+            noise_floors = [self._calculate_noise_floor(df) for df in band_frames]
+        if threshold is None:
+            threshold = max(noise_floors) + margin_db if noise_floors[0] is not None else 0.0
+        
+        peak_sets = []
+        for df in band_frames:
+            peaks = self._detect_peaks(df, threshold) if len(df) else df
+            peaks = peaks.sort_values('frequency')
+            peak_sets.append({
+                'frequency': peaks['frequency'].to_numpy(dtype=float),
+                'level': peaks['avg_field_strength'].to_numpy(dtype=float)
+            })
+        
+        events = classify_changes(peak_sets[0], peak_sets[1], match_tolerance_khz,
+                                  shift_tolerance_khz, level_change_db, threshold)
+        for event in events:
+            if event['type'] in ('new', 'shifted'):
+                event['station'] = self._match_station(event['frequency'], band.get('bandwidth'))
+        
+        frequencies, values = align_spectra(frames, band['start_freq'], band['stop_freq'])
+        deltas = values[1] - values[0]
+        valid = ~np.isnan(deltas)
+        
+        counts = {}
+        for event in events:
+            counts[event['type']] = counts.get(event['type'], 0) + 1
         
         return {
-            'frequencies': merged['frequency'].tolist(),
-            'current_values': merged['avg_field_strength_current'].tolist(),
-            'other_values': merged['avg_field_strength_other'].tolist()
+            'band_number': band_number,
+            'band_info': band,
+            'threshold_used': round(threshold, 2),
+            'baseline_noise_floor': round(noise_floors[0], 2) if noise_floors[0] is not None else None,
+            'noise_floor': round(noise_floors[1], 2) if noise_floors[1] is not None else None,
+            'baseline_peaks': len(peak_sets[0]['frequency']),
+            'peaks': len(peak_sets[1]['frequency']),
+            'mean_delta_db': round(float(deltas[valid].mean()), 2) if valid.any() else None,
+            'rms_delta_db': round(float(np.sqrt((deltas[valid] ** 2).mean())), 2) if valid.any() else None,
+            'changed_channels': int((np.abs(deltas[valid]) >= level_change_db).sum()),
+            'event_counts': counts,
+            'events': events,
+            'frequencies': frequencies[valid].tolist(),
+            'deltas': np.round(deltas[valid], 2).tolist()
         }
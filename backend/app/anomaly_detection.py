@@ -0,0 +1,159 @@
+"""
+Vectorized anomaly detection for one band.
+
+Every detector receives the band as frequency-sorted NumPy arrays plus the
+rolling noise floor, does a constant number of passes over them and returns
+the channel positions it flags with per-channel values. The engine merges
+the results so that each channel is reported once, by the first detector in
+DETECTORS that flagged it. New detectors are added with @detector.
+"""
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .noise_floor import rolling_noise_floor
+
+ANOMALY_PARAMS = {
+    'high_power_level': 80.0,     # dBµV/m, absolute level
+    'floor_margin_db': 30.0,      # peaks this far above the local floor
+    'burst_spread_db': 15.0,      # max - avg of bursty emitters ...
+    'burst_min_db': 20.0,         # ... whose maximum clears the floor by this
+    'strong_carrier_db': 40.0,    # carriers this far above the floor ...
+    'spurious_channels': 10,      # ... and peaks within this many channels
+    'spurious_min_db': 10.0,      # spurious peaks at least this far above the floor
+    'edge_fraction': 0.02,        # outer share of the band treated as edge
+    'edge_margin_db': 15.0,       # edge energy this far above the floor
+}
+
+class BandArrays:
+    """Frequency-sorted arrays of a band shared by all detectors"""
+
+    def __init__(self, band_channels: pd.DataFrame, band: Dict, params: Dict):
+        ordered = band_channels.sort_values('frequency', kind='stable')
+        self.band = band
+        self.params = params
+        self.frequency = ordered['frequency'].to_numpy(dtype=float)
+        self.level = ordered['avg_field_strength'].to_numpy(dtype=float)
+        if 'max_field_strength' in ordered:
+            self.max_level = ordered['max_field_strength'].to_numpy(dtype=float)
+        else:
+            self.max_level = self.level
+        if 'channel_no' in ordered:
+            self.channel_no = ordered['channel_no'].to_numpy()
+        else:
+            self.channel_no = np.full(len(ordered), None, dtype=object)
+
+        self.floor = rolling_noise_floor(self.frequency, self.level)
+        self.excess = self.level - self.floor
+
+        # Local maxima (plateaus count once, at their left end)
+        padded = np.r_[-np.inf, self.level, -np.inf]
+        self.is_peak = (self.level > padded[:-2]) & (self.level >= padded[2:])
+
+    def __len__(self) -> int:
+        return len(self.level)
+
+DETECTORS: List = []
+
+def detector(name: str):
+    """Register a detector function(arrays) -> (positions, values, descriptions)"""
+    def register(func: Callable):
+        DETECTORS.append((name, func))
+        return func
+    return register
+
+@detector('high_power')
+def _high_power(a: BandArrays):
+    hits = np.flatnonzero(a.level > a.params['high_power_level'])
+    return hits, a.level[hits], [
+        f"Signal kuat tidak biasa: {v:.1f} dBµV/m" for v in a.level[hits]
+    ]
+
+@detector('above_floor')
+def _above_floor(a: BandArrays):
+    hits = np.flatnonzero(a.is_peak & (a.excess >= a.params['floor_margin_db']))
+    return hits, a.excess[hits], [
+        f"Sinyal {v:.1f} dB di atas noise floor lokal" for v in a.excess[hits]
+    ]
+
+@detector('bursty')
+def _bursty(a: BandArrays):
+    spread = a.max_level - a.level
+    padded = np.r_[-np.inf, a.max_level, -np.inf]
+    max_peak = (a.max_level > padded[:-2]) & (a.max_level >= padded[2:])
+    loud = a.max_level - a.floor >= a.params['burst_min_db']
+    hits = np.flatnonzero((spread >= a.params['burst_spread_db']) & max_peak & loud)
+    return hits, spread[hits], [
+        f"Emisi intermiten: selisih max/avg {v:.1f} dB" for v in spread[hits]
+    ]
+
+@detector('spurious')
+def _spurious(a: BandArrays):
+    carriers = np.flatnonzero(a.is_peak & (a.excess >= a.params['strong_carrier_db']))
+    if len(carriers) == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0), []
+
+    candidates = np.flatnonzero(a.is_peak & (a.excess >= a.params['spurious_min_db']))
+    candidates = np.setdiff1d(candidates, carriers, assume_unique=True)
+
+    # Nearest strong carrier of every candidate by binary search
+    right = np.clip(np.searchsorted(carriers, candidates), 0, len(carriers) - 1)
+    left = np.clip(right - 1, 0, len(carriers) - 1)
+    nearest = np.where(np.abs(candidates - carriers[left]) <= np.abs(carriers[right] - candidates),
+                       carriers[left], carriers[right])
+    close = np.abs(candidates - nearest) <= a.params['spurious_channels']
+    hits, parents = candidates[close], nearest[close]
+    below = a.level[parents] - a.level[hits]
+    return hits, below, [
+        f"Kemungkinan emisi spurious {d:.1f} dB di bawah carrier {a.frequency[p]:.3f} MHz"
+        for d, p in zip(below, parents)
+    ]
+
+@detector('band_edge')
+def _band_edge(a: BandArrays):
+    start, stop = a.band['start_freq'], a.band['stop_freq']
+    guard = (stop - start) * a.params['edge_fraction']
+    at_edge = (a.frequency <= start + guard) | (a.frequency >= stop - guard)
+    hits = np.flatnonzero(at_edge & a.is_peak & (a.excess >= a.params['edge_margin_db']))
+    return hits, a.level[hits], [
+        f"Energi di tepi band: {v:.1f} dBµV/m" for v in a.level[hits]
+    ]
+
+def detect_anomalies(band_channels: pd.DataFrame, band: Dict, detectors: Optional[List[str]] = None,
+                     params: Optional[Dict] = None) -> List[Dict]:
+    """
+    Run the registered detectors (or the named subset) over a band.
+    Each channel is reported once, by the first detector that flags it.
+    """
+    merged = dict(ANOMALY_PARAMS, **(params or {}))
+    if len(band_channels) == 0:
+        return []
+
+    arrays = BandArrays(band_channels, band, merged)
+    seen = np.zeros(len(arrays), dtype=bool)
+    anomalies = []
+
+    for name, func in DETECTORS:
+        if detectors is not None and name not in detectors:
+            continue
+
+        positions, values, descriptions = func(arrays)
+        positions = np.asarray(positions, dtype=np.int64)
+        fresh = ~seen[positions]
+        seen[positions] = True
+
+        for position, value, description in zip(positions[fresh], np.asarray(values)[fresh],
+                                                 np.asarray(descriptions, dtype=object)[fresh]):
+            anomalies.append({
+                'type': name,
+                'channel_no': None if arrays.channel_no[position] is None else int(arrays.channel_no[position]),
+                'frequency': float(arrays.frequency[position]),
+                'avg_field_strength': float(arrays.level[position]),
+                'max_field_strength': float(arrays.max_level[position]),
+                'noise_floor': round(float(arrays.floor[position]), 2),
+                'value': round(float(value), 2),
+                'description': description
+            })
+
+    return anomalies
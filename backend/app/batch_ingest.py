@@ -0,0 +1,260 @@
+"""
+Parse pool for uploads, and batch ingest of many measurement CSVs or ZIP
+archives of them.
+
+Measurements are parsed in a process pool, the worker also writing the
+waterfall, so a multi-second parse neither blocks the event loop nor holds
+the GIL of the API process. At most twice as many parses as workers are
+queued; further uploads wait for a slot without blocking the loop. A batch
+spools each file to UPLOAD_DIR as it reaches it and keeps the same number
+of files in flight, which bounds disk and memory use when onboarding large
+archives. It inserts the Analysis rows in one transaction with a savepoint
+per file, so a file that fails to ingest is reported without losing the
+rest of the batch.
+"""
+import asyncio
+import glob
+import os
+import threading
+import time
+import uuid
+import weakref
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from typing import AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from .compression import MEASUREMENT_SUFFIXES, compress_file, file_compression, stored_name
+from .config import settings
+from .ingest import store_analysis
+from .parser import CSVParser
+from .storage import UploadSpool, spool_file
+from .waterfall_store import write_waterfall
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+# Queue slots per event loop (a semaphore belongs to the loop it first waits on)
+_parse_slots = weakref.WeakKeyDictionary()
+
+def _workers() -> int:
+    return settings.BATCH_PARSE_WORKERS or os.cpu_count()
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Shared parse pool; spawned workers so no server threads or connections are forked"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=_workers(),
+                                        mp_context=get_context('spawn'))
+        return _pool
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died so the next batch starts a new one"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+async def run_in_parse_pool(func, *args):
+    """Run a parse function in the pool once a queue slot is free"""
+    loop = asyncio.get_running_loop()
+    slots = _parse_slots.get(loop)
+    if slots is None:
+        slots = _parse_slots[loop] = asyncio.Semaphore(2 * _workers())
+    async with slots:
+        pool = get_parse_pool()
+        try:
+            return await asyncio.wrap_future(pool.submit(func, *args))
+        except BrokenProcessPool:
+            _discard_pool(pool)
+            raise
+
+def _spool_entry(name: str, source: BinaryIO) -> Tuple[str, Optional[UploadSpool], Optional[str]]:
+    try:
+        return name, spool_file(source), None
+    except HTTPException as e:
+        return name, None, e.detail
+
+def iter_measurement_files(filename: str, fileobj: BinaryIO) -> Iterator[Tuple[str, Optional[UploadSpool], Optional[str]]]:
+    """
+    (name, spool, error) for an uploaded CSV or for every CSV in a ZIP. Each
+    file is copied to a spool in UPLOAD_DIR only when the batch reaches it,
+    with the size limit enforced while copying (also for ZIP members, whose
+    declared size is not trusted).
+    """
+    if not filename.lower().endswith('.zip'):
+        if not filename.lower().endswith(MEASUREMENT_SUFFIXES):
+            yield filename, None, "Only CSV (optionally .gz or .zst compressed) and ZIP files are allowed"
+            return
+        yield _spool_entry(filename, fileobj)
+        return
+
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        yield filename, None, "Invalid ZIP archive"
+        return
+    with archive:
+        for info in archive.infolist():
+            base = os.path.basename(info.filename)
+            if info.is_dir() or not base.lower().endswith(MEASUREMENT_SUFFIXES) or base.startswith('._'):
+                continue
+            with archive.open(info) as member:
+                yield _spool_entry(f"{filename}/{info.filename}", member)
+
+def parse_stored_file(file_path: str) -> Dict:
+    """
+    Parse a measurement written to UPLOAD_DIR and write its waterfall next
+    to it. Runs in a pool worker; the sweep matrix stays in the worker and
+    only the channels DataFrame and small values are sent back.
+    """
+    started = time.perf_counter()
+    try:
+        parser = CSVParser.from_file(file_path)
+        parsed_data = parser.parse()
+    except ValueError as e:
+        return {'error': str(e), 'parse_seconds': time.perf_counter() - started}
+
+    waterfall_path = None
+    sweeps = parsed_data['sweeps']
+    if sweeps is not None:
+        # Stored names are {file_id}.csv[.gz|.zst]
+        file_id = os.path.basename(file_path).split('.')[0]
+        waterfall_path = os.path.join(os.path.dirname(file_path), f"{file_id}.wf")
+        write_waterfall(waterfall_path, sweeps['times'], sweeps['frequencies'], sweeps['levels'])
+        parsed_data['sweeps'] = {'times': sweeps['times']}
+
+    # Compressed after the parse, which read the raw file
+    if settings.STORE_COMPRESSED and file_compression(file_path) is None:
+        file_path = compress_file(file_path, settings.STORE_COMPRESSED)
+
+    # A DataFrame pickles far faster than the list of channel records
+    parsed_data['channels'] = parser.channels
+    return {
+        'parsed_data': parsed_data,
+        'file_path': file_path,
+        'waterfall_path': waterfall_path,
+        'parse_seconds': time.perf_counter() - started,
+    }
+
+def parse_file(filename: str, spool_path: str, upload_dir: str) -> Dict:
+    """Give a spooled batch file its stored name and parse it. Runs in a pool worker."""
+    file_id = str(uuid.uuid4())
+    file_path = os.path.join(upload_dir, stored_name(file_id, file_compression(spool_path)))
+    os.replace(spool_path, file_path)
+
+    try:
+        result = parse_stored_file(file_path)
+    except Exception:
+        # Stored copy, waterfall or partly compressed file
+        for path in glob.glob(os.path.join(upload_dir, f"{file_id}.*")):
+            os.remove(path)
+        raise
+    if 'error' in result:
+        os.remove(file_path)
+    result.update(filename=filename, file_id=file_id)
+    return result
+
+_DONE = object()
+
+async def _iterate_in_thread(iterable: Iterable) -> AsyncIterator:
+    """Advance a blocking iterator on a worker thread, one item at a time"""
+    iterator = iter(iterable)
+    while True:
+        item = await asyncio.to_thread(next, iterator, _DONE)
+        if item is _DONE:
+            return
+        yield item
+
+async def parse_files(entries: Iterator[Tuple[str, Optional[UploadSpool], Optional[str]]]) -> List[Dict]:
+    """
+    Parse entries in the pool, keeping a bounded number in flight. Results
+    keep input order. Entries are produced on a worker thread since spooling
+    and ZIP decompression are blocking disk I/O.
+    """
+    results, pending = {}, set()
+
+    async def parse(index, name, spool):
+        try:
+            result = await run_in_parse_pool(parse_file, name, spool.path, settings.UPLOAD_DIR)
+            results[index] = dict(result, content_sha256=spool.sha256)
+        except Exception as e:
+            # Every input gets a status, also when the worker or the pool fails
+            spool.discard()
+            error = "Parse worker stopped unexpectedly" if isinstance(e, BrokenProcessPool) else f"Parse failed: {e}"
+            results[index] = {'filename': name, 'error': error}
+
+    async for index, (name, spool, error) in _iterate_in_thread(enumerate(entries)):
+        if index >= settings.BATCH_MAX_FILES:
+            if spool is not None:
+                spool.discard()
+            results[index] = {'filename': name, 'error': f"Batch is limited to {settings.BATCH_MAX_FILES} files"}
+            break
+        if error:
+            results[index] = {'filename': name, 'error': error}
+            continue
+        if len(pending) >= 2 * _workers():
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        pending.add(asyncio.ensure_future(parse(index, name, spool)))
+
+    if pending:
+        await asyncio.wait(pending)
+    return [results[index] for index in sorted(results)]
+
+def _remove_files(result: Dict):
+    for path in (result.get('file_path'), result.get('waterfall_path')):
+        if path and os.path.exists(path):
+            os.remove(path)
+
+def _store_result(db: Session, result: Dict) -> Dict:
+    """Insert one parsed file under its own savepoint and return its status"""
+    entry = {'filename': result['filename'], 'parse_seconds': round(result.get('parse_seconds', 0.0), 3)}
+    if 'error' in result:
+        return dict(entry, status='failed', error=result['error'])
+
+    started = time.perf_counter()
+    try:
+        with db.begin_nested():
+            analysis = store_analysis(db, result['parsed_data'], os.path.basename(result['filename']),
+                                      result['file_path'], result['waterfall_path'], result['content_sha256'])
+    except Exception as e:
+        # Database, band plan or file errors fail this file only
+        _remove_files(result)
+        return dict(entry, status='failed', error=str(e) or type(e).__name__)
+
+    parsed_data = result['parsed_data']
+    return dict(
+        entry,
+        status='stored',
+        id=analysis.id,
+        file_id=result['file_id'],
+        task_id=analysis.task_id,
+        station_name=analysis.station_name,
+        channels_count=len(parsed_data['channels']),
+        sweeps_count=analysis.sweeps_count,
+        content_sha256=analysis.content_sha256,
+        store_seconds=round(time.perf_counter() - started, 3),
+    )
+
+def store_batch(db: Session, results: List[Dict]) -> List[Dict]:
+    """
+    Insert the parsed measurements in one transaction and return the status
+    of every file. Files whose ingest fails are rolled back to their savepoint.
+    """
+    statuses = []
+    try:
+        for result in results:
+            statuses.append(_store_result(db, result))
+        db.commit()
+    except Exception:
+        # Nothing of the batch is kept, so neither are its files
+        db.rollback()
+        for result in results:
+            _remove_files(result)
+        raise
+    return statuses
@@ -0,0 +1,106 @@
+"""
+Change detection between a baseline and a new measurement of a station.
+
+Peak sets of both sweeps are matched by mutual nearest frequency with two
+binary searches (O(n log n)); unmatched peaks become new or disappeared
+emissions and matched ones are checked for frequency shifts and level
+changes. Events are ranked so that new emissions come first.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Relative weight of each event type in the ranking score (score = dB x weight)
+EVENT_WEIGHTS = {
+    'new': 1.5,
+    'shifted': 1.2,
+    'disappeared': 1.0,
+    'level_increase': 1.0,
+    'level_decrease': 0.8,
+}
+
+def _nearest(sorted_freqs: np.ndarray, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index of and distance to the nearest sorted_freqs entry for each query"""
+    right = np.clip(np.searchsorted(sorted_freqs, queries), 0, len(sorted_freqs) - 1)
+    left = np.clip(right - 1, 0, len(sorted_freqs) - 1)
+    use_left = np.abs(queries - sorted_freqs[left]) < np.abs(sorted_freqs[right] - queries)
+    index = np.where(use_left, left, right)
+    return index, np.abs(sorted_freqs[index] - queries)
+
+def match_peaks(baseline_freqs, new_freqs, tolerance_mhz: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pair peaks that are each other's nearest neighbour within the tolerance.
+    Both inputs must be sorted. Returns (baseline_index, new_index) arrays.
+    """
+    baseline_freqs = np.asarray(baseline_freqs, dtype=float)
+    new_freqs = np.asarray(new_freqs, dtype=float)
+    if len(baseline_freqs) == 0 or len(new_freqs) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    to_baseline, distance = _nearest(baseline_freqs, new_freqs)
+    to_new, _ = _nearest(new_freqs, baseline_freqs)
+
+    new_index = np.arange(len(new_freqs))
+    mutual = (to_new[to_baseline] == new_index) & (distance <= tolerance_mhz + 1e-9)
+    return to_baseline[mutual], new_index[mutual]
+
+def classify_changes(
+    baseline_peaks: Dict[str, np.ndarray],
+    new_peaks: Dict[str, np.ndarray],
+    match_tolerance_khz: float = 100.0,
+    shift_tolerance_khz: float = 10.0,
+    level_change_db: float = 6.0,
+    threshold: Optional[float] = None
+) -> List[Dict]:
+    """
+    Change events between two peak sets given as {'frequency', 'level'}
+    arrays sorted by frequency, strongest-ranked first.
+    """
+    base_f, base_l = baseline_peaks['frequency'], baseline_peaks['level']
+    new_f, new_l = new_peaks['frequency'], new_peaks['level']
+    floor = threshold if threshold is not None else 0.0
+
+    matched_base, matched_new = match_peaks(base_f, new_f, match_tolerance_khz / 1000.0)
+    events = []
+
+    unmatched_new = np.setdiff1d(np.arange(len(new_f)), matched_new)
+    for i in unmatched_new:
+        events.append(_event('new', new_f[i], None, new_l[i], None, magnitude=new_l[i] - floor))
+
+    unmatched_base = np.setdiff1d(np.arange(len(base_f)), matched_base)
+    for j in unmatched_base:
+        events.append(_event('disappeared', None, base_f[j], None, base_l[j], magnitude=base_l[j] - floor))
+
+    offsets_khz = (new_f[matched_new] - base_f[matched_base]) * 1000.0
+    level_deltas = new_l[matched_new] - base_l[matched_base]
+    for j, i, offset, delta in zip(matched_base, matched_new, offsets_khz, level_deltas):
+        if abs(offset) > shift_tolerance_khz:
+            # A shifted carrier weighs like its level plus the size of the move
+            events.append(_event('shifted', new_f[i], base_f[j], new_l[i], base_l[j],
+                                 magnitude=max(abs(delta), 1.0) + abs(offset) / shift_tolerance_khz))
+        elif abs(delta) >= level_change_db:
+            kind = 'level_increase' if delta > 0 else 'level_decrease'
+            events.append(_event(kind, new_f[i], base_f[j], new_l[i], base_l[j], magnitude=abs(delta)))
+
+    events.sort(key=lambda e: e['score'], reverse=True)
+    for rank, event in enumerate(events, start=1):
+        event['rank'] = rank
+    return events
+
+def _event(kind, frequency, baseline_frequency, level, baseline_level, magnitude) -> Dict:
+    return {
+        'type': kind,
+        'frequency': _round(frequency, 6),
+        'baseline_frequency': _round(baseline_frequency, 6),
+        'offset_khz': _round((frequency - baseline_frequency) * 1000.0, 2)
+        if frequency is not None and baseline_frequency is not None else None,
+        'level': _round(level, 2),
+        'baseline_level': _round(baseline_level, 2),
+        'level_delta_db': _round(level - baseline_level, 2)
+        if level is not None and baseline_level is not None else None,
+        'score': round(float(max(magnitude, 0.0)) * EVENT_WEIGHTS[kind], 2),
+    }
+
+def _round(value, decimals):
+    return None if value is None else round(float(value), decimals)
@@ -234,35 +234,45 @@ class ChartGenerator:
     
     def create_frequency_occupancy_heatmap(self, channels_df: pd.DataFrame,
                                           band_info: Dict, threshold: float,
-                                          output_path: str) -> str:
-        """Create heatmap showing frequency occupancy over time/samples"""
-        band_channels = channels_df[
-            (channels_df['frequency'] >= band_info['start_freq']) &
-            (channels_df['frequency'] <= band_info['stop_freq'])
-        ].copy()
-        
-        band_channels['occupied'] = (band_channels['avg_field_strength'] > threshold).astype(int)
-        
-        freq_bins = 50
-        freq_range = np.linspace(band_info['start_freq'], band_info['stop_freq'], freq_bins)
-        
-        occupancy_matrix = []
-        for i in range(len(freq_range) - 1):
-            mask = (band_channels['frequency'] >= freq_range[i]) & \
-                   (band_channels['frequency'] < freq_range[i + 1])
-            occupancy = band_channels[mask]['occupied'].mean() * 100 if mask.any() else 0
-            occupancy_matrix.append(occupancy)
-        
-        occupancy_matrix = np.array(occupancy_matrix).reshape(-1, 1)
-        occupancy_matrix = np.tile(occupancy_matrix, (1, 10))
+                                          output_path: str, time_occupancy: Dict = None) -> str:
+        """
+        Create heatmap of frequency occupancy over time. time_occupancy is the
+        duty-cycle heatmap of a multi-sweep measurement; without it the single
+        max/avg trace only gives one row.
+        """
+        if time_occupancy is not None and len(time_occupancy['times']) > 0:
+            z = time_occupancy['occupancy']
+            x = time_occupancy['frequencies']
+            y = pd.to_datetime(time_occupancy['times'])
+            yaxis_title = "<b>Waktu</b>"
+        else:
+            band_channels = channels_df[
+                (channels_df['frequency'] >= band_info['start_freq']) &
+                (channels_df['frequency'] <= band_info['stop_freq'])
+            ]
+            
+            freq_bins = 50
+            freq_range = np.linspace(band_info['start_freq'], band_info['stop_freq'], freq_bins)
+            occupied = (band_channels['avg_field_strength'] > threshold).to_numpy()
+            bin_idx = np.clip(np.searchsorted(freq_range, band_channels['frequency'].to_numpy(), side='right') - 1,
+                              0, freq_bins - 2)
+            counts = np.bincount(bin_idx, minlength=freq_bins - 1)
+            hits = np.bincount(bin_idx, weights=occupied, minlength=freq_bins - 1)
+            
+            z = (np.where(counts > 0, hits / np.maximum(counts, 1) * 100, 0)).reshape(1, -1)
+            x = freq_range[:-1]
+            y = ['Rata-rata']
+            yaxis_title = ""
         
         fig = go.Figure(data=go.Heatmap(
-            z=occupancy_matrix.T,
-            x=freq_range[:-1],
-            y=list(range(10)),
+            z=z,
+            x=x,
+            y=y,
+            zmin=0,
+            zmax=100,
             colorscale='RdYlGn_r',
             colorbar=dict(title="Okupansi %"),
-            hovertemplate='Freq: %{x:.2f} MHz<br>Okupansi: %{z:.1f}%<extra></extra>'
+            hovertemplate='Freq: %{x:.2f} MHz<br>%{y}<br>Okupansi: %{z:.1f}%<extra></extra>'
         ))
         
         fig.update_layout(
@@ -272,7 +282,7 @@ class ChartGenerator:
                 xanchor='center'
             ),
             xaxis_title="<b>Frekuensi (MHz)</b>",
-            yaxis_title="<b>Sampling</b>",
+            yaxis_title=yaxis_title,
             width=900,
             height=400,
             template="plotly_white"
@@ -0,0 +1,127 @@
+"""
+N-way comparison of measurements on a common frequency grid.
+
+Sweeps of the same band rarely share bit-identical frequencies, so instead of
+merging on exact values every measurement is interpolated onto the grid of
+the baseline. Grid points farther than the tolerance from any channel of a
+measurement are left empty (NaN) rather than invented.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+def _sorted_band(channels_df: pd.DataFrame, start_freq: float, stop_freq: float, column: str):
+    freqs = channels_df['frequency'].to_numpy(dtype=float)
+    levels = channels_df[column].to_numpy(dtype=float)
+    inside = (freqs >= start_freq) & (freqs <= stop_freq) & ~np.isnan(levels)
+    freqs, levels = freqs[inside], levels[inside]
+    order = np.argsort(freqs, kind='stable')
+    return freqs[order], levels[order]
+
+def align_spectra(frames: List[pd.DataFrame], start_freq: float, stop_freq: float,
+                  tolerance_khz: Optional[float] = None, column: str = 'avg_field_strength'):
+    """
+    Interpolate every frame onto the channel grid of the first one.
+
+    Returns (grid, values) with values shaped (len(frames), len(grid)).
+    Without a tolerance, a point is kept when the nearest channel of the
+    frame is within 1.5 of that frame's median channel spacing.
+    """
+    grid, _ = _sorted_band(frames[0], start_freq, stop_freq, column)
+    grid = np.unique(grid)
+    values = np.full((len(frames), len(grid)), np.nan)
+
+    for row, frame in enumerate(frames):
+        freqs, levels = _sorted_band(frame, start_freq, stop_freq, column)
+        if len(freqs) == 0 or len(grid) == 0:
+            continue
+
+        if tolerance_khz is not None:
+            tolerance = tolerance_khz / 1000.0
+        elif len(freqs) > 1:
+            tolerance = 1.5 * float(np.median(np.diff(freqs)))
+        else:
+            tolerance = 0.0
+
+        # Distance from each grid point to the nearest channel of this frame
+        right = np.clip(np.searchsorted(freqs, grid), 0, len(freqs) - 1)
+        left = np.clip(right - 1, 0, len(freqs) - 1)
+        nearest = np.minimum(np.abs(freqs[right] - grid), np.abs(grid - freqs[left]))
+
+        covered = nearest <= tolerance + 1e-9
+        values[row, covered] = np.interp(grid[covered], freqs, levels)
+
+    return grid, values
+
+def compare_spectra(frames: List[pd.DataFrame], start_freq: float, stop_freq: float,
+                    tolerance_khz: Optional[float] = None, change_threshold_db: float = 6.0,
+                    top_changes: int = 20) -> Dict:
+    """
+    Deltas of every measurement against the first (baseline) one plus
+    per-channel spread across all of them.
+    """
+    grid, values = align_spectra(frames, start_freq, stop_freq, tolerance_khz)
+    deltas = values - values[0]
+
+    per_measurement = []
+    for row in range(len(frames)):
+        delta = deltas[row]
+        valid = ~np.isnan(delta)
+        stats = {
+            'coverage_percentage': round(float(valid.mean()) * 100, 2) if len(grid) else 0.0,
+            'mean_delta_db': None,
+            'rms_delta_db': None,
+            'max_increase_db': None,
+            'max_increase_frequency': None,
+            'max_decrease_db': None,
+            'max_decrease_frequency': None,
+            'changed_channels': 0,
+        }
+        if valid.any():
+            d = delta[valid]
+            f = grid[valid]
+            stats.update({
+                'mean_delta_db': round(float(d.mean()), 2),
+                'rms_delta_db': round(float(np.sqrt((d ** 2).mean())), 2),
+                'max_increase_db': round(float(d.max()), 2),
+                'max_increase_frequency': float(f[d.argmax()]),
+                'max_decrease_db': round(float(d.min()), 2),
+                'max_decrease_frequency': float(f[d.argmin()]),
+                'changed_channels': int((np.abs(d) >= change_threshold_db).sum()),
+            })
+        per_measurement.append(stats)
+
+    with np.errstate(all='ignore'):
+        present = ~np.isnan(values)
+        counts = present.sum(axis=0)
+        filled = np.where(present, values, 0.0)
+        mean = np.where(counts > 0, filled.sum(axis=0) / np.maximum(counts, 1), np.nan)
+        high = np.where(counts > 0, np.where(present, values, -np.inf).max(axis=0), np.nan)
+        low = np.where(counts > 0, np.where(present, values, np.inf).min(axis=0), np.nan)
+        spread = high - low
+
+    ranked = np.flatnonzero(counts > 1)
+    ranked = ranked[np.argsort(-spread[ranked], kind='stable')][:top_changes]
+
+    return {
+        'frequencies': grid,
+        'values': values,
+        'deltas': deltas,
+        'mean': mean,
+        'min': low,
+        'max': high,
+        'per_measurement': per_measurement,
+        'top_changes': [{
+            'frequency': float(grid[i]),
+            'range_db': round(float(spread[i]), 2),
+            'min_db': round(float(low[i]), 2),
+            'max_db': round(float(high[i]), 2),
+        } for i in ranked],
+    }
+
+def to_json_list(values: np.ndarray, decimals: int = 2) -> list:
+    """Round and replace NaN with None so arrays serialize as JSON"""
+    rounded = np.round(values, decimals).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
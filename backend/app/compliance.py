@@ -0,0 +1,277 @@
+"""
+Compliance of measurements with a band plan / mask table.
+
+The plan is a JSON table of frequency ranges with service, allocation and
+limit levels (avg and optionally max field strength). All channels of a
+measurement are stabbed into an interval index over the plan in one batch;
+where entries overlap the strictest limit applies. Contiguous channels over
+the same limit are reported as one violation.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import Analysis, ComplianceSummary, ComplianceViolation
+from .interval_index import IntervalIndex
+
+DEFAULT_PLAN_FILE = os.path.join(os.path.dirname(__file__), 'band_plan.json')
+
+class BandPlan:
+    """Band plan entries as arrays plus an interval index over their ranges"""
+
+    def __init__(self, entries: List[Dict], name: str = '', version: str = ''):
+        for entry in entries:
+            if entry['stop_freq'] < entry['start_freq']:
+                raise ValueError(f"Band plan entry {entry['start_freq']}-{entry['stop_freq']} ends before it starts")
+
+        self.name = name
+        self.version = version
+        self.entries = entries
+        self.starts = np.array([e['start_freq'] for e in entries], dtype=float)
+        self.stops = np.array([e['stop_freq'] for e in entries], dtype=float)
+        self.limits = np.array([e['limit_level'] for e in entries], dtype=float)
+        self.max_limits = np.array([e.get('max_limit_level', np.inf) for e in entries], dtype=float)
+        self.index = IntervalIndex(self.starts, self.stops)
+
+    @classmethod
+    def load(cls, path: str) -> 'BandPlan':
+        with open(path, 'rb') as f:
+            content = f.read()
+        data = json.loads(content)
+        entries = data['entries'] if isinstance(data, dict) else data
+        return cls(entries, data.get('name', '') if isinstance(data, dict) else '',
+                   hashlib.sha1(content).hexdigest()[:12])
+
+_plan_cache: Dict = {}
+_plan_lock = threading.Lock()
+
+def get_band_plan() -> BandPlan:
+    """Configured band plan, reloaded when the file changes"""
+    path = settings.BAND_PLAN_FILE or DEFAULT_PLAN_FILE
+    mtime = os.path.getmtime(path)
+    with _plan_lock:
+        cached = _plan_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = (mtime, BandPlan.load(path))
+            _plan_cache[path] = cached
+        return cached[1]
+
+def _strictest(point_ids: np.ndarray, entry_ids: np.ndarray, limits: np.ndarray, n: int):
+    """Lowest limit per channel and the entry it comes from (-1 if none)"""
+    limit = np.full(n, np.inf)
+    entry = np.full(n, -1, dtype=np.int64)
+    if len(point_ids):
+        order = np.lexsort((limits[entry_ids], point_ids))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = point_ids[order][1:] != point_ids[order][:-1]
+        chosen = order[first]
+        limit[point_ids[chosen]] = limits[entry_ids[chosen]]
+        entry[point_ids[chosen]] = entry_ids[chosen]
+    return limit, entry
+
+def _violation_runs(violating: np.ndarray, entry: np.ndarray) -> List[tuple]:
+    """(first, last) positions of runs of violating channels with the same entry"""
+    positions = np.flatnonzero(violating)
+    if len(positions) == 0:
+        return []
+    breaks = (np.diff(positions) != 1) | (np.diff(entry[positions]) != 0)
+    starts = positions[np.r_[True, breaks]]
+    ends = positions[np.r_[breaks, True]]
+    return list(zip(starts, ends))
+
+def check_compliance(channels_df: pd.DataFrame, bands: List[Dict], plan: Optional[BandPlan] = None) -> Dict:
+    """
+    Check every channel against the plan. Returns the plan identity and one
+    entry per measurement band with counts and violations (strongest first).
+    """
+    plan = plan or get_band_plan()
+    ordered = channels_df.sort_values('frequency', kind='stable')
+    freqs = ordered['frequency'].to_numpy(dtype=float)
+    avg = ordered['avg_field_strength'].to_numpy(dtype=float)
+    peak = ordered['max_field_strength'].to_numpy(dtype=float) if 'max_field_strength' in ordered else avg
+    n = len(freqs)
+
+    point_ids, entry_ids = plan.index.stab(freqs)
+    covered = np.zeros(n, dtype=bool)
+    covered[point_ids] = True
+    avg_limit, avg_entry = _strictest(point_ids, entry_ids, plan.limits, n)
+    max_limit, max_entry = _strictest(point_ids, entry_ids, plan.max_limits, n)
+
+    avg_excess = avg - avg_limit
+    max_excess = peak - max_limit
+    avg_violating = covered & (avg_excess > 0)
+    # A channel already over its avg limit is reported once, as avg
+    max_violating = covered & (max_excess > 0) & ~avg_violating
+
+    violations = []
+    for level_type, violating, excess, limit, entry, levels in (
+        ('avg', avg_violating, avg_excess, avg_limit, avg_entry, avg),
+        ('max', max_violating, max_excess, max_limit, max_entry, peak),
+    ):
+        for first, last in _violation_runs(violating, entry):
+            worst = first + int(np.argmax(excess[first:last + 1]))
+            plan_entry = plan.entries[entry[worst]]
+            violations.append({
+                'start_freq': float(freqs[first]),
+                'stop_freq': float(freqs[last]),
+                'peak_frequency': float(freqs[worst]),
+                'peak_level': float(levels[worst]),
+                'limit_level': float(limit[worst]),
+                'excess_db': round(float(excess[worst]), 2),
+                'channels': int(last - first + 1),
+                'level_type': level_type,
+                'service': plan_entry.get('service'),
+                'allocation': plan_entry.get('allocation'),
+            })
+
+    band_results = []
+    violation_freqs = np.array([v['peak_frequency'] for v in violations])
+    violating_any = avg_violating | max_violating
+    for number, band in enumerate(bands, start=1):
+        lo = np.searchsorted(freqs, band['start_freq'], side='left')
+        hi = np.searchsorted(freqs, band['stop_freq'], side='right')
+        in_band = np.flatnonzero((violation_freqs >= band['start_freq']) & (violation_freqs <= band['stop_freq'])) \
+            if len(violations) else []
+        band_violations = sorted((violations[i] for i in in_band), key=lambda v: v['excess_db'], reverse=True)
+        band_results.append({
+            'band_number': number,
+            'start_freq': band['start_freq'],
+            'stop_freq': band['stop_freq'],
+            'checked_channels': int(hi - lo),
+            'unallocated_channels': int((~covered[lo:hi]).sum()),
+            'violating_channels': int(violating_any[lo:hi].sum()),
+            'worst_excess_db': band_violations[0]['excess_db'] if band_violations else None,
+            'violations': band_violations,
+        })
+
+    return {
+        'plan_name': plan.name,
+        'plan_version': plan.version,
+        'bands': band_results,
+        'summary': summarize(band_results),
+    }
+
+def summarize(band_results: List[Dict]) -> Dict:
+    worst = [b['worst_excess_db'] for b in band_results if b['worst_excess_db'] is not None]
+    return {
+        'checked_channels': sum(b['checked_channels'] for b in band_results),
+        'unallocated_channels': sum(b['unallocated_channels'] for b in band_results),
+        'violating_channels': sum(b['violating_channels'] for b in band_results),
+        'violations': sum(len(b['violations']) for b in band_results),
+        'bands_with_violations': sum(1 for b in band_results if b['violations']),
+        'worst_excess_db': max(worst) if worst else None,
+    }
+
+def store_compliance(db: Session, analysis: Analysis, result: Dict):
+    """Replace the stored compliance results of an analysis. Does not commit."""
+    db.query(ComplianceViolation).filter(ComplianceViolation.analysis_id == analysis.id).delete(synchronize_session=False)
+    db.query(ComplianceSummary).filter(ComplianceSummary.analysis_id == analysis.id).delete(synchronize_session=False)
+
+    measured_at = analysis.start_time or analysis.upload_time
+    summaries, violations = [], []
+    for band in result['bands']:
+        summaries.append({
+            'analysis_id': analysis.id,
+            'band_number': band['band_number'],
+            'start_freq': band['start_freq'],
+            'stop_freq': band['stop_freq'],
+            'checked_channels': band['checked_channels'],
+            'unallocated_channels': band['unallocated_channels'],
+            'violating_channels': band['violating_channels'],
+            'violations': len(band['violations']),
+            'worst_excess_db': band['worst_excess_db'],
+            'plan_version': result['plan_version'],
+            'checked_at': datetime.utcnow(),
+        })
+        for violation in band['violations']:
+            violations.append(dict(
+                violation, analysis_id=analysis.id, band_number=band['band_number'],
+                station_name=analysis.station_name, measured_at=measured_at
+            ))
+
+    if summaries:
+        db.bulk_insert_mappings(ComplianceSummary, summaries)
+    if violations:
+        db.bulk_insert_mappings(ComplianceViolation, violations)
+
+def _violation_dict(v: ComplianceViolation) -> Dict:
+    return {
+        'analysis_id': v.analysis_id,
+        'band_number': v.band_number,
+        'start_freq': v.start_freq,
+        'stop_freq': v.stop_freq,
+        'peak_frequency': v.peak_frequency,
+        'peak_level': v.peak_level,
+        'limit_level': v.limit_level,
+        'excess_db': v.excess_db,
+        'channels': v.channels,
+        'level_type': v.level_type,
+        'service': v.service,
+        'allocation': v.allocation,
+        'station_name': v.station_name,
+        'measured_at': v.measured_at,
+    }
+
+def stored_compliance(db: Session, analysis_id: int) -> Optional[Dict]:
+    """Compliance results saved at ingest, in the check_compliance shape"""
+    summaries = db.query(ComplianceSummary).filter(
+        ComplianceSummary.analysis_id == analysis_id
+    ).order_by(ComplianceSummary.band_number).all()
+    if not summaries:
+        return None
+
+    by_band = {}
+    for v in db.query(ComplianceViolation).filter(ComplianceViolation.analysis_id == analysis_id).order_by(
+        ComplianceViolation.band_number, ComplianceViolation.excess_db.desc()
+    ):
+        by_band.setdefault(v.band_number, []).append(_violation_dict(v))
+
+    bands = [{
+        'band_number': s.band_number,
+        'start_freq': s.start_freq,
+        'stop_freq': s.stop_freq,
+        'checked_channels': s.checked_channels,
+        'unallocated_channels': s.unallocated_channels,
+        'violating_channels': s.violating_channels,
+        'worst_excess_db': s.worst_excess_db,
+        'violations': by_band.get(s.band_number, []),
+    } for s in summaries]
+
+    return {
+        'plan_version': summaries[0].plan_version,
+        'checked_at': summaries[0].checked_at,
+        'bands': bands,
+        'summary': summarize(bands),
+    }
+
+def find_violations(
+    db: Session,
+    service: Optional[str] = None,
+    station: Optional[str] = None,
+    min_excess_db: Optional[float] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = 500
+) -> List[Dict]:
+    """Stored violations across all measurements, largest excess first"""
+    query = db.query(ComplianceViolation)
+    if service:
+        query = query.filter(ComplianceViolation.service == service)
+    if station:
+        query = query.filter(ComplianceViolation.station_name.ilike(f"%{station}%"))
+    if min_excess_db is not None:
+        query = query.filter(ComplianceViolation.excess_db >= min_excess_db)
+    if date_from:
+        query = query.filter(ComplianceViolation.measured_at >= date_from)
+    if date_to:
+        query = query.filter(ComplianceViolation.measured_at <= date_to)
+
+    return [_violation_dict(v) for v in query.order_by(ComplianceViolation.excess_db.desc()).limit(limit)]
@@ -0,0 +1,101 @@
+"""
+Compressed measurement files.
+
+Measurement CSVs may be uploaded gzip- or zstd-compressed (zstd needs the
+optional `zstandard` package) and can be kept compressed in UPLOAD_DIR
+(STORE_COMPRESSED). The format is recognised from the magic bytes, not the
+file name, and content is always decompressed as a stream, so the parser
+reads compressed files in a single pass without a temporary raw copy.
+"""
+import gzip
+import io
+import os
+import shutil
+from typing import BinaryIO, Optional
+
+from .config import settings
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for .zst files
+    zstandard = None
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+MEASUREMENT_SUFFIXES = ('.csv', '.csv.gz', '.csv.zst')
+COPY_CHUNK_SIZE = 1024 * 1024
+
+def detect_compression(head: bytes) -> Optional[str]:
+    """'gzip', 'zstd' or None from the first bytes of a file"""
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head.startswith(ZSTD_MAGIC):
+        return 'zstd'
+    return None
+
+def file_compression(file_path: str) -> Optional[str]:
+    with open(file_path, 'rb') as f:
+        return detect_compression(f.read(4))
+
+def stored_name(file_id: str, compression: Optional[str]) -> str:
+    return f"{file_id}.csv{SUFFIXES.get(compression, '')}"
+
+class _LimitedReader(io.RawIOBase):
+    """Decompressed stream that stops at the measurement size limit"""
+
+    def __init__(self, stream: BinaryIO, limit: int):
+        self._stream = stream
+        self._limit = limit
+        self._read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._stream.read(len(buffer))
+        self._read += len(data)
+        if self._read > self._limit:
+            raise ValueError(f"Decompressed file exceeds {settings.MAX_DECOMPRESSED_SIZE_MB}MB")
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        self._stream.close()
+        super().close()
+
+def open_decompressed(file_path: str) -> BinaryIO:
+    """Binary stream of the content of a compressed or raw measurement file"""
+    compression = file_compression(file_path)
+    if compression is None:
+        return open(file_path, 'rb')
+    if compression == 'gzip':
+        stream = gzip.open(file_path, 'rb')
+    elif zstandard is None:
+        raise ValueError("zstd-compressed files need the zstandard package")
+    else:
+        stream = zstandard.ZstdDecompressor().stream_reader(open(file_path, 'rb'), read_across_frames=True,
+                                                            closefd=True)
+    return io.BufferedReader(_LimitedReader(stream, settings.MAX_DECOMPRESSED_SIZE_MB * 1024 * 1024),
+                             COPY_CHUNK_SIZE)
+
+def compress_file(file_path: str, compression: str) -> str:
+    """
+    Replace a raw file with its compressed form (streamed chunk by chunk).
+    Returns the new path.
+    """
+    if compression not in SUFFIXES:
+        raise ValueError(f"Unsupported compression: {compression}")
+    target = file_path + SUFFIXES[compression]
+    with open(file_path, 'rb') as source:
+        if compression == 'gzip':
+            with gzip.open(target, 'wb', compresslevel=settings.STORE_COMPRESSION_LEVEL) as out:
+                shutil.copyfileobj(source, out, COPY_CHUNK_SIZE)
+        else:
+            if zstandard is None:
+                raise ValueError("zstd compression needs the zstandard package")
+            compressor = zstandard.ZstdCompressor(level=settings.STORE_COMPRESSION_LEVEL)
+            with open(target, 'wb') as out:
+                compressor.copy_stream(source, out, read_size=COPY_CHUNK_SIZE)
+    os.remove(file_path)
+    return target
@@ -17,6 +17,76 @@ class Settings(BaseSettings):
     RATE_LIMIT_PER_MINUTE: int = 60
     ENABLE_AUTH: bool = False  # Set to True in production
     
+    # SQLite storage profile (applied to every new connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE_MB: int = 256
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    
+    # Licensed stations farther than this from the measurement site are not matched
+    LICENSE_MATCH_RADIUS_KM: float = 100.0
+    
+    # Bin width of the cross-measurement frequency index
+    FREQ_INDEX_BIN_KHZ: float = 100.0
+    
+    # Margin above the noise floor counted as occupied in the fleet rollups
+    ROLLUP_MARGIN_DB: float = 10.0
+    
+    # Points per band in the spectrum fingerprints used for similarity search
+    FINGERPRINT_BINS: int = 64
+    
+    # Adaptive noise floor: rolling window across frequency and low percentile.
+    # The window must be wider than the widest emission (8 MHz TV channels)
+    NOISE_FLOOR_WINDOW_MHZ: float = 20.0
+    NOISE_FLOOR_PERCENTILE: float = 10.0
+    
+    # Emission measurements per peak: x-dB bandwidth, power share of the
+    # occupied bandwidth and how far from the peak an emission may extend
+    EMISSION_X_DB: float = 26.0
+    EMISSION_POWER_FRACTION: float = 0.99
+    EMISSION_MAX_HALF_SPAN_MHZ: float = 5.0
+    
+    # Band plan / mask table for compliance checks (empty: app/band_plan.json)
+    BAND_PLAN_FILE: str = ""
+    
+    # Waterfall store of multi-sweep files: uint8 (quantized in
+    # WATERFALL_QUANT_STEP_DB steps from WATERFALL_QUANT_OFFSET_DB) or float16,
+    # compressed in tiles of sweeps x channels
+    WATERFALL_DTYPE: str = "uint8"
+    WATERFALL_QUANT_STEP_DB: float = 0.5
+    WATERFALL_QUANT_OFFSET_DB: float = -20.0
+    WATERFALL_TILE_SWEEPS: int = 64
+    WATERFALL_TILE_CHANNELS: int = 4096
+    WATERFALL_COMPRESSION_LEVEL: int = 6
+    
+    # Live streaming: sweeps kept per station, points per dashboard update,
+    # updates queued per slow client and rise rate of the tracked noise floor
+    LIVE_BUFFER_SWEEPS: int = 240
+    LIVE_MAX_POINTS: int = 2000
+    LIVE_QUEUE_SIZE: int = 8
+    LIVE_FLOOR_RISE: float = 0.02
+    # Bound the ring buffers (LIVE_BUFFER_SWEEPS x channels float32 per station)
+    LIVE_MAX_CHANNELS: int = 65536
+    LIVE_MAX_STATIONS: int = 16
+    
+    # Directory tailed for growing measurement CSVs (disabled when empty)
+    INGEST_WATCH_DIR: str = ""
+    INGEST_POLL_SECONDS: float = 5.0
+    
+    # Batch upload: parse processes (0 = one per CPU) and files per request
+    BATCH_PARSE_WORKERS: int = 0
+    BATCH_MAX_FILES: int = 2000
+    
+    # Keep stored measurement CSVs compressed: "" (as uploaded), "gzip" or
+    # "zstd"; decompressed uploads may not exceed MAX_DECOMPRESSED_SIZE_MB
+    STORE_COMPRESSED: str = ""
+    STORE_COMPRESSION_LEVEL: int = 6
+    MAX_DECOMPRESSED_SIZE_MB: int = 500
+    
     @field_validator('CORS_ORIGINS', mode='before')
     @classmethod
     def parse_cors_origins(cls, v):
@@ -1,13 +1,86 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Text, JSON
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Float, DateTime, Text, JSON, Boolean, ForeignKey, LargeBinary, Index, UniqueConstraint
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.pool import QueuePool, StaticPool
 from datetime import datetime
 from .config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
-)
+SQLITE_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+SQLITE_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+def _is_memory_sqlite(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+def _sqlite_pragmas() -> list:
+    """
+    Build the PRAGMA statements of the configured SQLite storage profile.
+    Values are validated here because PRAGMA arguments cannot be bound.
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {settings.SQLITE_JOURNAL_MODE}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {settings.SQLITE_SYNCHRONOUS}")
+    
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        # Negative cache_size is interpreted by SQLite as KiB instead of pages
+        f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}",
+        f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE_MB) * 1024 * 1024}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        "PRAGMA temp_store=MEMORY",
+        # Lets ON DELETE CASCADE clean up result rows on bulk deletes
+        "PRAGMA foreign_keys=ON",
+    ]
+
+def create_db_engine(database_url: str):
+    """
+    Create the SQLAlchemy engine for the given URL.
+    
+    For SQLite the storage profile (WAL journaling, synchronous level, page
+    cache, mmap and busy timeout) is applied to every pooled connection on
+    connect, so readers keep working while an upload commits.
+    """
+    if "sqlite" not in database_url:
+        return create_engine(database_url, pool_pre_ping=True)
+    
+    if _is_memory_sqlite(database_url):
+        # A private in-memory database only exists on a single connection
+        engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+    else:
+        engine = create_engine(
+            database_url,
+            connect_args={
+                "check_same_thread": False,
+                "timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+            },
+            poolclass=QueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT
+        )
+    
+    pragmas = _sqlite_pragmas()
+    
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+    
+    return engine
+
+engine = create_db_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
@@ -28,8 +101,22 @@ class Analysis(Base):
     operator_id = Column(String)
     analysis_metadata = Column(JSON)
     bands = Column(JSON)
+    bands_count = Column(Integer, default=0)
     occupancy_results = Column(JSON)
     report_path = Column(String, nullable=True)
+    waterfall_path = Column(String, nullable=True)
+    sweeps_count = Column(Integer, nullable=True)
+    content_sha256 = Column(String, nullable=True, index=True)
+    
+    band_results = relationship("BandResult", back_populates="analysis", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # Covers the history list: keyset order plus every listed column
+        Index('ix_analyses_list', 'upload_time', 'id', 'task_id', 'station_name',
+              'filename', 'location_lat', 'location_lon', 'bands_count'),
+        Index('ix_analyses_station_upload', 'station_name', 'upload_time', 'id'),
+        Index('ix_analyses_task_upload', 'task_id', 'upload_time', 'id'),
+    )
 
 class LicensedStation(Base):
     __tablename__ = "licensed_stations"
@@ -59,8 +146,262 @@ class LicensedStation(Base):
     upload_time = Column(DateTime, default=datetime.utcnow)
     source_file = Column(String)
 
+class BandResult(Base):
+    """Summary of one analyze_band run, kept for every band and threshold"""
+    __tablename__ = "band_results"
+    
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="CASCADE"), nullable=False, index=True)
+    band_number = Column(Integer, nullable=False)
+    start_freq = Column(Float)
+    stop_freq = Column(Float)
+    threshold = Column(Float)
+    is_auto_threshold = Column(Boolean, default=False)
+    noise_floor = Column(Float)
+    total_channels = Column(Integer)
+    occupied_channels = Column(Integer)
+    occupancy_percentage = Column(Float)
+    licensed_count = Column(Integer)
+    anomalies_count = Column(Integer)
+    station_name = Column(String)
+    measured_at = Column(DateTime)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    analysis = relationship("Analysis", back_populates="band_results")
+    peaks = relationship("PeakResult", back_populates="band_result", cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        Index('ix_band_results_band_time', 'band_number', 'measured_at'),
+        Index('ix_band_results_station_band_time', 'station_name', 'band_number', 'measured_at'),
+    )
+
+class PeakResult(Base):
+    """One detected peak of a BandResult"""
+    __tablename__ = "peak_results"
+    
+    id = Column(Integer, primary_key=True)
+    band_result_id = Column(Integer, ForeignKey("band_results.id", ondelete="CASCADE"), nullable=False, index=True)
+    analysis_id = Column(Integer, nullable=False, index=True)
+    band_number = Column(Integer, nullable=False)
+    channel_no = Column(Integer)
+    frequency = Column(Float, nullable=False)
+    avg_field_strength = Column(Float)
+    max_field_strength = Column(Float)
+    center_frequency = Column(Float)
+    bandwidth_khz = Column(Float)  # 99 % occupied bandwidth
+    licensed = Column(Boolean, default=False)
+    callsign = Column(String, nullable=True)
+    matched_station = Column(String, nullable=True)
+    measured_at = Column(DateTime)
+    
+    band_result = relationship("BandResult", back_populates="peaks")
+    
+    __table_args__ = (
+        Index('ix_peak_results_freq_time', 'frequency', 'measured_at'),
+    )
+
+class FrequencyPosting(Base):
+    """
+    Inverted index entry: strongest levels of one analysis within one coarse
+    frequency bin. Levels are stored in tenths of a dB to keep rows small.
+    """
+    __tablename__ = "frequency_postings"
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    bin_id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="CASCADE"), primary_key=True, index=True)
+    max_level = Column(Integer, nullable=False)  # highest maximum field strength, dB x10
+    avg_level = Column(Integer, nullable=False)  # highest average field strength, dB x10
+
+class MeasurementBandSummary(Base):
+    """
+    Per-band occupancy of one measurement computed at ingest with the noise
+    floor + ROLLUP_MARGIN_DB threshold; the unit the fleet rollups add up.
+    """
+    __tablename__ = "measurement_band_summaries"
+    
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="CASCADE"), nullable=False, index=True)
+    band_number = Column(Integer, nullable=False)
+    start_freq = Column(Float)
+    stop_freq = Column(Float)
+    total_channels = Column(Integer, nullable=False, default=0)
+    occupied_channels = Column(Integer, nullable=False, default=0)
+    occupancy_percentage = Column(Float, nullable=False, default=0)
+    noise_floor = Column(Float)
+    threshold = Column(Float)
+    peak_count = Column(Integer, nullable=False, default=0)
+    max_level = Column(Float)
+    station_name = Column(String, nullable=False, default='')
+    measured_at = Column(DateTime, nullable=False)
+    
+    __table_args__ = (
+        Index('ix_band_summaries_station_band_time', 'station_name', 'band_number', 'measured_at'),
+    )
+
+class OccupancyRollup(Base):
+    """Band summaries of one station added up per hour or day"""
+    __tablename__ = "occupancy_rollups"
+    __table_args__ = (
+        UniqueConstraint('granularity', 'station_name', 'band_number', 'bucket_start', name='uq_occupancy_rollups_bucket'),
+        Index('ix_occupancy_rollups_series', 'granularity', 'band_number', 'bucket_start'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    granularity = Column(String, nullable=False)  # 'hour' or 'day'
+    station_name = Column(String, nullable=False, default='')
+    band_number = Column(Integer, nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    measurements = Column(Integer, nullable=False, default=0)
+    occupancy_sum = Column(Float, nullable=False, default=0)
+    occupancy_max = Column(Float)
+    noise_floor_sum = Column(Float, nullable=False, default=0)
+    noise_floor_min = Column(Float)
+    peak_count_sum = Column(Integer, nullable=False, default=0)
+    peak_count_max = Column(Integer)
+    max_level = Column(Float)
+
+class SpectrumFingerprint(Base):
+    """
+    Average field strength of one band of a measurement resampled onto
+    FINGERPRINT_BINS equal-width points, stored as float32 bytes.
+    """
+    __tablename__ = "spectrum_fingerprints"
+    __table_args__ = (
+        UniqueConstraint('analysis_id', 'band_number', name='uq_spectrum_fingerprints_band'),
+        Index('ix_spectrum_fingerprints_range', 'start_freq', 'stop_freq'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="CASCADE"), nullable=False, index=True)
+    band_number = Column(Integer, nullable=False)
+    start_freq = Column(Float, nullable=False)
+    stop_freq = Column(Float, nullable=False)
+    mean_level = Column(Float)
+    vector = Column(LargeBinary, nullable=False)
+    station_name = Column(String, nullable=False, default='')
+    measured_at = Column(DateTime)
+
+class ComplianceSummary(Base):
+    """Band plan check of one band of a measurement"""
+    __tablename__ = "compliance_summaries"
+    __table_args__ = (UniqueConstraint('analysis_id', 'band_number', name='uq_compliance_summaries_band'),)
+    
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="CASCADE"), nullable=False, index=True)
+    band_number = Column(Integer, nullable=False)
+    start_freq = Column(Float)
+    stop_freq = Column(Float)
+    checked_channels = Column(Integer, nullable=False, default=0)
+    unallocated_channels = Column(Integer, nullable=False, default=0)
+    violating_channels = Column(Integer, nullable=False, default=0)
+    violations = Column(Integer, nullable=False, default=0)
+    worst_excess_db = Column(Float)
+    plan_version = Column(String)
+    checked_at = Column(DateTime, default=datetime.utcnow)
+
+class ComplianceViolation(Base):
+    """Contiguous run of channels above the band plan limit"""
+    __tablename__ = "compliance_violations"
+    
+    id = Column(Integer, primary_key=True)
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="CASCADE"), nullable=False, index=True)
+    band_number = Column(Integer, nullable=False)
+    start_freq = Column(Float, nullable=False)
+    stop_freq = Column(Float, nullable=False)
+    peak_frequency = Column(Float, nullable=False)
+    peak_level = Column(Float, nullable=False)
+    limit_level = Column(Float, nullable=False)
+    excess_db = Column(Float, nullable=False)
+    channels = Column(Integer, nullable=False)
+    level_type = Column(String, nullable=False)  # 'avg' or 'max'
+    service = Column(String)
+    allocation = Column(String)
+    station_name = Column(String)
+    measured_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('ix_compliance_violations_freq', 'peak_frequency'),
+        Index('ix_compliance_violations_time', 'measured_at'),
+    )
+
+class LicenseStatistic(Base):
+    """Per-value station counts, maintained with every license write"""
+    __tablename__ = "license_statistics"
+    __table_args__ = (UniqueConstraint('dimension', 'value', name='uq_license_statistics_dimension_value'),)
+    
+    id = Column(Integer, primary_key=True)
+    dimension = Column(String, nullable=False)  # 'service' or 'province'
+    value = Column(String, nullable=False, default='')
+    count = Column(Integer, nullable=False, default=0)
+
+class LicenseStatsState(Base):
+    """Single row holding the station total and the license data generation"""
+    __tablename__ = "license_stats_state"
+    
+    id = Column(Integer, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class WatchedFile(Base):
+    """Read position of a CSV file tailed from the ingest directory"""
+    __tablename__ = "watched_files"
+    
+    id = Column(Integer, primary_key=True)
+    path = Column(String, nullable=False, unique=True)
+    # Null once the analysis is deleted or when the file cannot be tailed
+    analysis_id = Column(Integer, ForeignKey("analyses.id", ondelete="SET NULL"), nullable=True, index=True)
+    stored_path = Column(String, nullable=True)
+    offset = Column(Integer, nullable=False, default=0)
+    size = Column(Integer, nullable=False, default=0)
+    mtime = Column(Float, nullable=True)
+    note = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+def _migrate_sqlite_schema(engine):
+    """
+    Add columns introduced after a table was created (SQLite only), backfill
+    derived values and create indexes that create_all skips on existing tables.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c['name'] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+        
+        conn.execute(text(
+            "UPDATE analyses SET bands_count = COALESCE(json_array_length(bands), 0) "
+            "WHERE bands_count IS NULL"
+        ))
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _migrate_sqlite_schema(engine)
+    
+    from .license_search import create_license_search_index
+    from .spatial_index import create_spatial_index
+    create_license_search_index(engine)
+    create_spatial_index(engine)
+    
+    from .license_stats import ensure_license_stats
+    db = SessionLocal()
+    try:
+        ensure_license_stats(db)
+    finally:
+        db.close()
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,159 @@
+"""
+Time-resolved (duty-cycle) occupancy from a waterfall store.
+
+Channel occupancy in the ITU-R SM.1880 sense: the share of sweeps in which a
+channel is above threshold. The store is streamed one tile row of sweeps at a
+time and every statistic is a running reduction over the time axis (counts,
+bincount per hour and per heatmap bucket, per-channel level histograms), so
+memory does not grow with the length of the session.
+"""
+from datetime import datetime
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from .waterfall_store import WaterfallStore
+
+LEVEL_BIN_DB = 2.0
+LEVEL_MIN_DB = -20.0
+LEVEL_MAX_DB = 110.0
+DUTY_CYCLE_BINS = 10
+BUSY_HOUR = np.timedelta64(1, 'h')
+
+def compute_duty_cycle(
+    store: WaterfallStore,
+    start_freq: Optional[float],
+    stop_freq: Optional[float],
+    threshold: Union[float, np.ndarray],
+    time_from: Optional[datetime] = None,
+    time_to: Optional[datetime] = None,
+    time_bins: int = 60,
+    freq_bins: int = 100,
+    histograms: bool = False
+) -> Dict:
+    """
+    Duty cycle per channel, band occupancy over time, busy hour and an
+    occupancy heatmap (time buckets x frequency bins) in one pass.
+    threshold is a level or one level per channel of the range.
+    """
+    s_lo, s_hi = store.sweep_range(time_from, time_to)
+    c_lo, c_hi = store.channel_range(start_freq, stop_freq)
+    n_sweeps, n_channels = max(s_hi - s_lo, 0), max(c_hi - c_lo, 0)
+    frequencies = np.array(store.frequencies[c_lo:c_hi])
+    times = store.times[s_lo:s_hi]
+    threshold = np.broadcast_to(np.asarray(threshold, dtype=np.float32), (n_channels,))
+
+    occupied_count = np.zeros(n_channels, dtype=np.int64)
+    valid_count = np.zeros(n_channels, dtype=np.int64)
+    sweep_occupancy = np.full(n_sweeps, np.nan)
+    n_level_bins = int((LEVEL_MAX_DB - LEVEL_MIN_DB) / LEVEL_BIN_DB)
+    level_hist = np.zeros(n_channels * n_level_bins, dtype=np.int64) if histograms else None
+
+    time_bins = max(1, min(time_bins, n_sweeps)) if n_sweeps else 1
+    freq_bins = max(1, min(freq_bins, n_channels)) if n_channels else 1
+    freq_edges = np.linspace(0, n_channels, freq_bins + 1).astype(np.int64)[:-1]
+    span = (times[-1] - times[0]).astype(np.int64) + 1 if n_sweeps else 1
+    heat_occupied = np.zeros((time_bins, freq_bins))
+    heat_valid = np.zeros((time_bins, freq_bins))
+
+    for rows, block in store.iter_blocks(c_lo, c_hi, s_lo, s_hi):
+        valid = ~np.isnan(block)
+        occupied = valid & (block > threshold)
+        occupied_count += occupied.sum(axis=0)
+        valid_count += valid.sum(axis=0)
+
+        with np.errstate(invalid='ignore'):
+            sweep_occupancy[rows.start - s_lo:rows.stop - s_lo] = occupied.sum(axis=1) / valid.sum(axis=1)
+
+        # Heatmap: channels into frequency bins, sweeps into time buckets
+        block_times = times[rows.start - s_lo:rows.stop - s_lo]
+        bucket = np.minimum((block_times - times[0]).astype(np.int64) * time_bins // span, time_bins - 1)
+        np.add.at(heat_occupied, bucket, np.add.reduceat(occupied.astype(np.int32), freq_edges, axis=1))
+        np.add.at(heat_valid, bucket, np.add.reduceat(valid.astype(np.int32), freq_edges, axis=1))
+
+        if histograms:
+            level_bin = np.clip(((block - LEVEL_MIN_DB) // LEVEL_BIN_DB), 0, n_level_bins - 1)
+            keys = (np.arange(n_channels) * n_level_bins + level_bin)[valid].astype(np.int64)
+            level_hist += np.bincount(keys, minlength=len(level_hist))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        duty_cycle = np.where(valid_count > 0, occupied_count / np.maximum(valid_count, 1) * 100.0, np.nan)
+        heatmap = np.where(heat_valid > 0, heat_occupied / heat_valid * 100.0, np.nan)
+
+    result = {
+        'sweeps': n_sweeps,
+        'channels': n_channels,
+        'time_from': str(times[0].astype('datetime64[s]')) if n_sweeps else None,
+        'time_to': str(times[-1].astype('datetime64[s]')) if n_sweeps else None,
+        'mean_duty_cycle': _round(np.nanmean(duty_cycle)) if n_channels and valid_count.any() else None,
+        'frequencies': frequencies,
+        'duty_cycle': duty_cycle,
+        'duty_cycle_histogram': np.histogram(duty_cycle[~np.isnan(duty_cycle)], bins=DUTY_CYCLE_BINS, range=(0, 100))[0],
+        'busy_hour': busy_hour(times, sweep_occupancy),
+        'hourly_profile': hourly_profile(times, sweep_occupancy),
+        'heatmap': {
+            'times': times[0] + (np.arange(time_bins) * span // time_bins).astype('timedelta64[ns]') if n_sweeps else times,
+            'frequencies': frequencies[freq_edges] if n_channels else frequencies,
+            'occupancy': heatmap,
+        },
+    }
+    if histograms:
+        result['level_histograms'] = {
+            'bin_edges': LEVEL_MIN_DB + np.arange(n_level_bins + 1) * LEVEL_BIN_DB,
+            'counts': level_hist.reshape(n_channels, n_level_bins),
+        }
+    return result
+
+def channel_average(store: WaterfallStore, start_freq: Optional[float], stop_freq: Optional[float],
+                    time_from: Optional[datetime] = None, time_to: Optional[datetime] = None) -> np.ndarray:
+    """Linear mean field strength of every channel in range, streamed like compute_duty_cycle"""
+    s_lo, s_hi = store.sweep_range(time_from, time_to)
+    c_lo, c_hi = store.channel_range(start_freq, stop_freq)
+    total = np.zeros(max(c_hi - c_lo, 0))
+    count = np.zeros(max(c_hi - c_lo, 0))
+    for _, block in store.iter_blocks(c_lo, c_hi, s_lo, s_hi):
+        linear = np.power(10.0, block.astype(np.float64) / 20.0)
+        total += np.nansum(linear, axis=0)
+        count += (~np.isnan(block)).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return 20.0 * np.log10(total / count)
+
+def busy_hour(times: np.ndarray, sweep_occupancy: np.ndarray) -> Optional[Dict]:
+    """
+    The one-hour window (starting at a sweep) with the highest mean band
+    occupancy, from running sums and a binary search per window start.
+    """
+    valid = ~np.isnan(sweep_occupancy)
+    times, occupancy = times[valid], sweep_occupancy[valid]
+    if len(times) == 0:
+        return None
+
+    ends = np.searchsorted(times, times + BUSY_HOUR, side='left')
+    cumulative = np.r_[0.0, np.cumsum(occupancy)]
+    means = (cumulative[ends] - cumulative[:len(times)]) / (ends - np.arange(len(times)))
+
+    # Only windows that fit in the session compete; shorter sessions are one window
+    step = np.median(np.diff(times)) if len(times) > 1 else np.timedelta64(0, 'ns')
+    complete = times + BUSY_HOUR <= times[-1] + step
+    means = np.where(complete, means, -np.inf) if complete.any() else np.r_[means[0], np.full(len(times) - 1, -np.inf)]
+    best = int(np.argmax(means))
+    return {
+        'start': str(times[best].astype('datetime64[s]')),
+        'end': str(times[ends[best] - 1].astype('datetime64[s]')),
+        'sweeps': int(ends[best] - best),
+        'occupancy_percentage': _round(means[best] * 100.0),
+    }
+
+def hourly_profile(times: np.ndarray, sweep_occupancy: np.ndarray) -> list:
+    """Mean band occupancy per hour of day (0-23) over all days"""
+    valid = ~np.isnan(sweep_occupancy)
+    hours = (times[valid].astype('datetime64[h]').astype(np.int64) % 24)
+    counts = np.bincount(hours, minlength=24)
+    sums = np.bincount(hours, weights=sweep_occupancy[valid], minlength=24)
+    return [
+        {'hour': hour, 'sweeps': int(counts[hour]), 'occupancy_percentage': _round(sums[hour] / counts[hour] * 100.0)}
+        for hour in range(24) if counts[hour]
+    ]
+
+def _round(value, decimals: int = 2):
+    return None if value is None or np.isnan(value) else round(float(value), decimals)
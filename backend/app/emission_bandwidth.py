@@ -0,0 +1,106 @@
+"""
+Occupied bandwidth, centre frequency and integrated level of emissions.
+
+All peaks of a band are measured at once. Each peak owns the channels up to
+halfway to its neighbouring peaks, capped at EMISSION_MAX_HALF_SPAN_MHZ.
+Power above the noise floor is accumulated once with cumsum over the band,
+so the 99 % bandwidth edges of every peak are two searchsorted calls and the
+integrated power and centroid are differences of the running sums. The
+x-dB edges are found on a fixed-width window matrix, never per peak in
+Python.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+from .config import settings
+
+def _db_to_power(level_db: np.ndarray) -> np.ndarray:
+    return np.power(10.0, level_db / 10.0)
+
+def measure_emissions(
+    frequencies,
+    levels,
+    peak_positions,
+    noise_floor=None,
+    x_db: Optional[float] = None,
+    power_fraction: Optional[float] = None,
+    max_half_span_mhz: Optional[float] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Measure the emissions around peak_positions of a frequency-sorted band.
+
+    noise_floor may be a scalar or one value per channel; power below it is
+    ignored. Returns arrays aligned with peak_positions: bandwidth_xdb_khz,
+    bandwidth_99_khz, center_frequency (power centroid) and integrated_level
+    (dB sum of the channel levels in the emission).
+    """
+    x_db = settings.EMISSION_X_DB if x_db is None else x_db
+    power_fraction = settings.EMISSION_POWER_FRACTION if power_fraction is None else power_fraction
+    max_half_span_mhz = settings.EMISSION_MAX_HALF_SPAN_MHZ if max_half_span_mhz is None else max_half_span_mhz
+
+    freqs = np.asarray(frequencies, dtype=float)
+    levels = np.asarray(levels, dtype=float)
+    peaks = np.asarray(peak_positions, dtype=np.int64)
+    n, k = len(levels), len(peaks)
+    empty = {name: np.empty(0) for name in ('bandwidth_xdb_khz', 'bandwidth_99_khz', 'center_frequency', 'integrated_level')}
+    if k == 0 or n == 0:
+        return empty
+
+    spacing = float(np.median(np.diff(freqs))) if n > 1 else 0.0
+    resolution_khz = spacing * 1000.0
+    half_span = int(np.ceil(max_half_span_mhz / spacing)) if spacing > 0 else 0
+
+    # Region of each peak: halfway to its neighbours, capped at half_span
+    order = np.argsort(peaks, kind='stable')
+    sorted_peaks = peaks[order]
+    lower = np.r_[0, (sorted_peaks[:-1] + sorted_peaks[1:]) // 2 + 1]
+    upper = np.r_[(sorted_peaks[:-1] + sorted_peaks[1:]) // 2, n - 1]
+    lower = np.maximum(lower, sorted_peaks - half_span)
+    upper = np.minimum(upper, sorted_peaks + half_span)
+    region_lo = np.empty(k, dtype=np.int64)
+    region_hi = np.empty(k, dtype=np.int64)
+    region_lo[order], region_hi[order] = lower, upper
+
+    # Power above the floor, accumulated once for the whole band
+    floor = np.broadcast_to(np.asarray(noise_floor if noise_floor is not None else -np.inf, dtype=float), (n,))
+    power = np.clip(_db_to_power(levels) - _db_to_power(floor), 0.0, None)
+    cum_power = np.r_[0.0, np.cumsum(power)]
+    cum_freq_power = np.r_[0.0, np.cumsum(power * freqs)]
+    cum_raw = np.r_[0.0, np.cumsum(_db_to_power(levels))]
+
+    base = cum_power[region_lo]
+    total = cum_power[region_hi + 1] - base
+    tail = (1.0 - power_fraction) / 2.0
+    # searchsorted on the running sum gives the channel where each share is reached
+    edge_lo = np.searchsorted(cum_power, base + tail * total, side='left') - 1
+    edge_hi = np.searchsorted(cum_power, base + (1.0 - tail) * total, side='left') - 1
+    edge_lo = np.clip(edge_lo, region_lo, region_hi)
+    edge_hi = np.clip(edge_hi, region_lo, region_hi)
+    bandwidth_99 = np.where(total > 0, (freqs[edge_hi] - freqs[edge_lo]) * 1000.0 + resolution_khz, 0.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        centroid = np.where(total > 0, (cum_freq_power[region_hi + 1] - cum_freq_power[region_lo]) / total, freqs[peaks])
+        integrated = 10.0 * np.log10(cum_raw[region_hi + 1] - cum_raw[region_lo])
+
+    # x-dB edges: first channel on each side that drops x dB below the peak
+    bandwidth_xdb = np.full(k, resolution_khz)
+    if half_span > 0:
+        offsets = np.arange(1, half_span + 1)
+        target = levels[peaks] - x_db
+        left_idx = peaks[:, None] - offsets[None, :]
+        right_idx = peaks[:, None] + offsets[None, :]
+        left_below = (left_idx >= region_lo[:, None]) & (levels[np.clip(left_idx, 0, n - 1)] < target[:, None])
+        right_below = (right_idx <= region_hi[:, None]) & (levels[np.clip(right_idx, 0, n - 1)] < target[:, None])
+
+        # Channels kept on each side; without a crossing the emission fills its region
+        left_steps = np.where(left_below.any(axis=1), left_below.argmax(axis=1), peaks - region_lo)
+        right_steps = np.where(right_below.any(axis=1), right_below.argmax(axis=1), region_hi - peaks)
+        bandwidth_xdb = (left_steps + right_steps + 1) * resolution_khz
+
+    return {
+        'bandwidth_xdb_khz': np.round(bandwidth_xdb, 3),
+        'bandwidth_99_khz': np.round(bandwidth_99, 3),
+        'center_frequency': np.round(centroid, 6),
+        'integrated_level': np.round(integrated, 2),
+    }
@@ -6,6 +6,7 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from datetime import datetime
 import pandas as pd
+import numpy as np
 import os
 from typing import Dict, List
 from .chart_generator import ChartGenerator
@@ -409,7 +410,10 @@ class EnhancedReportGenerator:
         
         try:
             heatmap_path = os.path.join(base_path, f"heatmap_{task_id}_{timestamp}.png")
-            self.chart_gen.create_frequency_occupancy_heatmap(channels_df, band_info, threshold, heatmap_path)
+            self.chart_gen.create_frequency_occupancy_heatmap(
+                channels_df, band_info, threshold, heatmap_path,
+                (results.get('duty_cycle') or {}).get('heatmap')
+            )
             charts.append(('Peta Okupansi Frekuensi', heatmap_path))
         except Exception as e:
             print(f"Error creating heatmap: {e}")
@@ -467,6 +471,10 @@ class EnhancedReportGenerator:
         self._add_occupied_channels_table(results)
         
         self._add_anomalies_section(results)
+        
+        self._add_duty_cycle_section(results)
+        
+        self._add_compliance_section(results)
     
     def _add_top_signals_table(self, results: Dict):
         """Add top signals table"""
@@ -535,9 +543,9 @@ class EnhancedReportGenerator:
             subheading = Paragraph(f"<b>Daftar Channel Terisi ({total_count})</b>", self.styles['SectionHeading'])
         self.story.append(subheading)
         
-        col_widths = [0.8*cm, 2.2*cm, 1.8*cm, 1.8*cm, 2*cm, self.page_width - 8.6*cm]
+        col_widths = [0.8*cm, 2.2*cm, 1.6*cm, 1.6*cm, 1.6*cm, 2*cm, self.page_width - 9.8*cm]
         
-        data = [['No.', 'Frekuensi', 'Avg (dB)', 'Max (dB)', 'Status', 'Stasiun / Client']]
+        data = [['No.', 'Frekuensi', 'Avg (dB)', 'Max (dB)', 'BW (kHz)', 'Status', 'Stasiun / Client']]
         
         for i, channel in enumerate(display_list, 1):
             station = channel.get('station')
@@ -555,6 +563,7 @@ class EnhancedReportGenerator:
                 f"{channel.get('frequency', 0):.3f}",
                 f"{channel.get('avg_field_strength', 0):.1f}",
                 f"{channel.get('max_field_strength', 0):.1f}",
+                f"{channel['bandwidth_khz']:.1f}" if channel.get('bandwidth_khz') else '-',
                 status,
                 station_name
             ])
@@ -564,8 +573,8 @@ class EnhancedReportGenerator:
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5282')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-            ('ALIGN', (1, 0), (4, -1), 'CENTER'),
-            ('ALIGN', (5, 0), (5, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (5, -1), 'CENTER'),
+            ('ALIGN', (6, 0), (6, -1), 'LEFT'),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
             ('FONTSIZE', (0, 0), (-1, 0), 8),
@@ -605,6 +614,119 @@ class EnhancedReportGenerator:
         
         self.story.append(Spacer(1, 0.3*inch))
     
+    def _add_duty_cycle_section(self, results: Dict):
+        """Add time-based occupancy (multi-sweep measurements only)"""
+        duty = results.get('duty_cycle')
+        
+        if not duty or not duty.get('sweeps'):
+            return
+        
+        subheading = Paragraph("<b>Okupansi Berbasis Waktu (Duty Cycle)</b>", self.styles['SectionHeading'])
+        self.story.append(subheading)
+        
+        busy = duty.get('busy_hour') or {}
+        # None when the band has no channels in the per-sweep data
+        mean_duty = duty.get('mean_duty_cycle')
+        mean_text = f"{mean_duty:.1f}%" if mean_duty is not None else 'N/A'
+        summary_text = (
+            f"{duty['sweeps']} sweep dari {duty['time_from']} sampai {duty['time_to']}. "
+            f"Rata-rata duty cycle channel: {mean_text}. "
+        )
+        if busy:
+            summary_text += (
+                f"Jam sibuk: {busy['start']} - {busy['end']} "
+                f"dengan okupansi band {busy['occupancy_percentage']:.1f}%."
+            )
+        self.story.append(Paragraph(summary_text, self.styles['Normal']))
+        self.story.append(Spacer(1, 0.1*inch))
+        
+        duty_cycle = np.nan_to_num(duty['duty_cycle'], nan=-1.0)
+        top = np.argsort(-duty_cycle, kind='stable')[:10]
+        top = top[duty_cycle[top] > 0]
+        if len(top) == 0:
+            self.story.append(Spacer(1, 0.2*inch))
+            return
+        
+        col_widths = [0.8*cm, 3*cm, 3*cm]
+        data = [['No.', 'Frekuensi', 'Duty Cycle (%)']]
+        for i, position in enumerate(top, 1):
+            data.append([str(i), f"{duty['frequencies'][position]:.3f}", f"{duty_cycle[position]:.1f}"])
+        
+        table = Table(data, colWidths=col_widths, repeatRows=1, hAlign='LEFT')
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5282')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('FONTSIZE', (0, 1), (-1, -1), 7),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f7fafc')])
+        ]))
+        
+        self.story.append(table)
+        self.story.append(Spacer(1, 0.3*inch))
+    
+    def _add_compliance_section(self, results: Dict):
+        """Add band plan compliance table (only when requested)"""
+        compliance = results.get('compliance')
+        
+        if not compliance:
+            return
+        
+        subheading = Paragraph("<b>Kepatuhan Rencana Pita (Band Plan)</b>", self.styles['SectionHeading'])
+        self.story.append(subheading)
+        
+        violations = compliance.get('violations', [])
+        summary_text = (
+            f"{compliance.get('checked_channels', 0)} channel diperiksa, "
+            f"{compliance.get('violating_channels', 0)} channel melebihi batas, "
+            f"{compliance.get('unallocated_channels', 0)} channel di luar alokasi."
+        )
+        self.story.append(Paragraph(summary_text, self.styles['Normal']))
+        self.story.append(Spacer(1, 0.1*inch))
+        
+        if not violations:
+            self.story.append(Spacer(1, 0.2*inch))
+            return
+        
+        col_widths = [0.8*cm, 3.4*cm, 1.8*cm, 1.8*cm, 1.6*cm, 1.2*cm, self.page_width - 10.6*cm]
+        
+        data = [['No.', 'Rentang (MHz)', 'Level (dB)', 'Batas (dB)', 'Lebih (dB)', 'Tipe', 'Layanan']]
+        
+        for i, violation in enumerate(violations[:30], 1):
+            data.append([
+                str(i),
+                f"{violation['start_freq']:.3f} - {violation['stop_freq']:.3f}",
+                f"{violation['peak_level']:.1f}",
+                f"{violation['limit_level']:.1f}",
+                f"{violation['excess_db']:.1f}",
+                violation['level_type'],
+                violation.get('service') or '-'
+            ])
+        
+        table = Table(data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5282')),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (5, -1), 'CENTER'),
+            ('ALIGN', (6, 0), (6, -1), 'LEFT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('FONTSIZE', (0, 1), (-1, -1), 7),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 4),
+            ('TOPPADDING', (0, 0), (-1, -1), 4),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f7fafc')])
+        ]))
+        
+        self.story.append(table)
+        self.story.append(Spacer(1, 0.3*inch))
+    
     def _add_recommendations(self, results: Dict):
         """Add recommendations section"""
         self.story.append(PageBreak())
@@ -0,0 +1,235 @@
+"""
+Spectrum fingerprints and similarity search across the archive.
+
+At ingest every band of a measurement is resampled onto FINGERPRINT_BINS
+equal-width points. Fingerprints of the same frequency range are kept in an
+in-memory matrix per range, reloaded only when that range gained or lost
+fingerprints, so a nearest-neighbour query is one matrix-vector product
+instead of re-reading and merging raw files.
+"""
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import Analysis, SpectrumFingerprint
+
+def compute_fingerprint(frequencies: np.ndarray, levels: np.ndarray, start_freq: float, stop_freq: float,
+                        bins: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    Mean level per equal-width bin of [start_freq, stop_freq]. Bins without
+    channels are interpolated from their neighbours.
+    """
+    bins = bins or settings.FINGERPRINT_BINS
+    if len(levels) == 0 or stop_freq <= start_freq:
+        return None
+
+    position = ((frequencies - start_freq) / (stop_freq - start_freq) * bins).astype(np.int64)
+    position = np.clip(position, 0, bins - 1)
+    sums = np.bincount(position, weights=levels, minlength=bins)
+    counts = np.bincount(position, minlength=bins)
+
+    filled = counts > 0
+    fingerprint = np.empty(bins, dtype=float)
+    fingerprint[filled] = sums[filled] / counts[filled]
+    if not filled.all():
+        x = np.arange(bins)
+        fingerprint[~filled] = np.interp(x[~filled], x[filled], fingerprint[filled])
+    return fingerprint.astype(np.float32)
+
+def fingerprint_measurement(db: Session, analysis: Analysis, channels_df: pd.DataFrame, bands: List[Dict]) -> int:
+    """
+    Replace the fingerprints of an analysis, one per band with channels.
+    Does not commit. Returns the number of fingerprints written.
+    """
+    db.query(SpectrumFingerprint).filter(SpectrumFingerprint.analysis_id == analysis.id).delete(synchronize_session=False)
+    if len(channels_df) == 0:
+        return 0
+
+    ordered = channels_df.sort_values('frequency', kind='stable')
+    freqs = ordered['frequency'].to_numpy(dtype=float)
+    levels = ordered['avg_field_strength'].to_numpy(dtype=float)
+    measured_at = analysis.start_time or analysis.upload_time
+
+    written = 0
+    for number, band in enumerate(bands, start=1):
+        lo = np.searchsorted(freqs, band['start_freq'], side='left')
+        hi = np.searchsorted(freqs, band['stop_freq'], side='right')
+        vector = compute_fingerprint(freqs[lo:hi], levels[lo:hi], band['start_freq'], band['stop_freq'])
+        if vector is None:
+            continue
+
+        db.add(SpectrumFingerprint(
+            analysis_id=analysis.id,
+            band_number=number,
+            start_freq=band['start_freq'],
+            stop_freq=band['stop_freq'],
+            mean_level=float(vector.mean()),
+            vector=vector.tobytes(),
+            station_name=analysis.station_name or '',
+            measured_at=measured_at
+        ))
+        written += 1
+    return written
+
+class FingerprintIndex:
+    """
+    All fingerprints of one frequency range as a matrix. Rows are also kept
+    centred and unit-length so that cosine similarity of the rows, i.e. the
+    correlation of the spectrum shapes, is a single matrix product.
+    """
+
+    def __init__(self, rows: List[SpectrumFingerprint]):
+        self.ids = np.array([r.id for r in rows], dtype=np.int64)
+        self.analysis_ids = np.array([r.analysis_id for r in rows], dtype=np.int64)
+        self.band_numbers = [r.band_number for r in rows]
+        self.stations = [r.station_name for r in rows]
+        self.measured_at = [r.measured_at for r in rows]
+        self.start_freq = rows[0].start_freq if rows else None
+        self.stop_freq = rows[0].stop_freq if rows else None
+
+        if rows:
+            self.vectors = np.vstack([np.frombuffer(r.vector, dtype=np.float32) for r in rows])
+        else:
+            self.vectors = np.empty((0, settings.FINGERPRINT_BINS), dtype=np.float32)
+        self.normalized = self._normalize(self.vectors)
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        centred = vectors - vectors.mean(axis=-1, keepdims=True)
+        norms = np.linalg.norm(centred, axis=-1, keepdims=True)
+        return centred / np.where(norms == 0, 1, norms)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position(self, analysis_id: int) -> Optional[int]:
+        found = np.flatnonzero(self.analysis_ids == analysis_id)
+        return int(found[0]) if len(found) else None
+
+    def nearest(self, position: int, limit: int, mask: Optional[np.ndarray] = None) -> List[Dict]:
+        """Rows most similar to the row at `position`, best first"""
+        similarity = self.normalized @ self.normalized[position]
+        candidates = np.ones(len(self), dtype=bool) if mask is None else mask.copy()
+        candidates[position] = False
+
+        ids = np.flatnonzero(candidates)
+        if len(ids) == 0:
+            return []
+        if len(ids) > limit:
+            ids = ids[np.argpartition(-similarity[ids], limit - 1)[:limit]]
+        ids = ids[np.argsort(-similarity[ids], kind='stable')]
+
+        difference = self.vectors[ids] - self.vectors[position]
+        rms = np.sqrt((difference ** 2).mean(axis=1))
+        return [{
+            'analysis_id': int(self.analysis_ids[i]),
+            'band_number': self.band_numbers[i],
+            'station_name': self.stations[i],
+            'measured_at': self.measured_at[i],
+            'similarity': round(float(similarity[i]), 4),
+            'rms_difference_db': round(float(d), 2),
+            'mean_level_delta_db': round(float(self.vectors[i].mean() - self.vectors[position].mean()), 2),
+        } for i, d in zip(ids, rms)]
+
+_indexes: Dict = {}
+_indexes_lock = threading.Lock()
+
+def get_index(db: Session, start_freq: float, stop_freq: float) -> FingerprintIndex:
+    """
+    Cached index of one frequency range, rebuilt when the count or the
+    highest id of its fingerprints changed.
+    """
+    in_range = (SpectrumFingerprint.start_freq == start_freq, SpectrumFingerprint.stop_freq == stop_freq)
+    count, max_id = db.query(func.count(SpectrumFingerprint.id), func.max(SpectrumFingerprint.id)).filter(*in_range).one()
+    key = (id(db.get_bind()), start_freq, stop_freq)
+
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and cached[0] == (count, max_id):
+            return cached[1]
+
+    rows = db.query(SpectrumFingerprint).filter(*in_range).order_by(SpectrumFingerprint.id).all()
+    index = FingerprintIndex(rows)
+    with _indexes_lock:
+        _indexes[key] = ((count, max_id), index)
+    return index
+
+def similar_measurements(db: Session, analysis_id: int, band_number: int, limit: int = 10,
+                         same_station: bool = False) -> List[Dict]:
+    """Measurements whose spectrum over the same band range looks most like this one"""
+    fingerprint = db.query(SpectrumFingerprint).filter(
+        SpectrumFingerprint.analysis_id == analysis_id,
+        SpectrumFingerprint.band_number == band_number
+    ).first()
+    if fingerprint is None:
+        raise LookupError(f"No fingerprint for analysis {analysis_id} band {band_number}")
+
+    index = get_index(db, fingerprint.start_freq, fingerprint.stop_freq)
+    position = index.position(analysis_id)
+    mask = None
+    if same_station:
+        mask = np.array([s == fingerprint.station_name for s in index.stations], dtype=bool)
+    return index.nearest(position, limit, mask)
+
+def biggest_changes(db: Session, band_number: Optional[int] = None, station: Optional[str] = None,
+                    limit: int = 20) -> List[Dict]:
+    """
+    Largest spectrum changes between consecutive measurements of the same
+    station and band range across the archive, by RMS difference in dB.
+    """
+    ranges = db.query(SpectrumFingerprint.start_freq, SpectrumFingerprint.stop_freq).distinct()
+    if band_number is not None:
+        ranges = ranges.filter(SpectrumFingerprint.band_number == band_number)
+
+    changes = []
+    for start_freq, stop_freq in ranges.all():
+        index = get_index(db, start_freq, stop_freq)
+        if len(index) < 2:
+            continue
+
+        stations = np.array(index.stations, dtype=object)
+        times = np.array([t.timestamp() if t else 0.0 for t in index.measured_at])
+        keep = np.ones(len(index), dtype=bool)
+        if station:
+            keep = np.array([station.lower() in s.lower() for s in index.stations], dtype=bool)
+        rows = np.flatnonzero(keep)
+        if len(rows) < 2:
+            continue
+
+        # Consecutive rows of the same station after sorting by station, time
+        rows = rows[np.lexsort((times[rows], stations[rows].astype(str)))]
+        previous, current = rows[:-1], rows[1:]
+        pairs = stations[previous] == stations[current]
+        previous, current = previous[pairs], current[pairs]
+        if len(current) == 0:
+            continue
+
+        difference = index.vectors[current] - index.vectors[previous]
+        rms = np.sqrt((difference ** 2).mean(axis=1))
+        worst_bin = np.abs(difference).argmax(axis=1)
+        correlation = (index.normalized[current] * index.normalized[previous]).sum(axis=1)
+        bin_width = (stop_freq - start_freq) / index.vectors.shape[1]
+
+        for k in range(len(current)):
+            changes.append({
+                'station_name': index.stations[current[k]],
+                'band_number': index.band_numbers[current[k]],
+                'start_freq': start_freq,
+                'stop_freq': stop_freq,
+                'previous_analysis_id': int(index.analysis_ids[previous[k]]),
+                'previous_measured_at': index.measured_at[previous[k]],
+                'analysis_id': int(index.analysis_ids[current[k]]),
+                'measured_at': index.measured_at[current[k]],
+                'rms_change_db': round(float(rms[k]), 2),
+                'max_change_db': round(float(difference[k, worst_bin[k]]), 2),
+                'max_change_frequency': round(start_freq + (worst_bin[k] + 0.5) * bin_width, 4),
+                'similarity': round(float(correlation[k]), 4),
+            })
+
+    changes.sort(key=lambda c: c['rms_change_db'], reverse=True)
+    return changes[:limit]
@@ -0,0 +1,263 @@
+"""
+Fleet-wide occupancy rollups.
+
+At ingest every band of a measurement is summarized once (occupancy, noise
+floor and peak count as the analyzer computes them with an automatic
+threshold of noise floor + ROLLUP_MARGIN_DB) and the summary is added to
+hourly and daily buckets per station and band. Dashboards read the buckets
+only; raw channel data is never touched after ingest.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .analyzer import band_noise_floor, detect_peaks
+from .config import settings
+from .database import Analysis, MeasurementBandSummary, OccupancyRollup
+
+GRANULARITIES = ('hour', 'day')
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    if granularity == 'hour':
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == 'day':
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"granularity must be one of {list(GRANULARITIES)}")
+
+def _bucket_end(start: datetime, granularity: str) -> datetime:
+    return start + (timedelta(hours=1) if granularity == 'hour' else timedelta(days=1))
+
+def summarize_bands(channels_df: pd.DataFrame, bands: List[Dict], margin_db: Optional[float] = None) -> List[Dict]:
+    """
+    Occupancy, noise floor and peak count of every band with channels, with
+    the definitions of SpectrumAnalyzer.analyze_band at an automatic
+    threshold: peaks above noise floor + margin_db over the band's channels.
+    The channels are sorted once and each band is a searchsorted slice.
+    """
+    if margin_db is None:
+        margin_db = settings.ROLLUP_MARGIN_DB
+
+    ordered = channels_df.sort_values('frequency', kind='stable') if len(channels_df) else channels_df
+    freqs = ordered['frequency'].to_numpy(dtype=float) if len(ordered) else np.empty(0)
+    max_column = 'max_field_strength' if 'max_field_strength' in ordered else 'avg_field_strength'
+    peaks_level = ordered[max_column].to_numpy(dtype=float) if len(ordered) else np.empty(0)
+
+    summaries = []
+    for number, band in enumerate(bands, start=1):
+        lo = np.searchsorted(freqs, band['start_freq'], side='left')
+        hi = np.searchsorted(freqs, band['stop_freq'], side='right')
+        if hi <= lo:
+            continue
+
+        band_channels = ordered.iloc[lo:hi]
+        noise_floor = band_noise_floor(band_channels)
+        threshold = noise_floor + margin_db
+        peaks = detect_peaks(band_channels, threshold)
+
+        summary = {
+            'band_number': number,
+            'start_freq': band['start_freq'],
+            'stop_freq': band['stop_freq'],
+            'total_channels': int(len(band_channels)),
+            'occupied_channels': int(len(peaks)),
+            'occupancy_percentage': round(len(peaks) / len(band_channels) * 100, 2),
+            'noise_floor': round(noise_floor, 2),
+            'threshold': round(threshold, 2),
+            'peak_count': int(len(peaks)),
+            'max_level': float(np.nanmax(peaks_level[lo:hi])),
+        }
+        summaries.append(summary)
+
+    return summaries
+
+def _measured_at(analysis: Analysis) -> datetime:
+    return analysis.start_time or analysis.upload_time or datetime.utcnow()
+
+def _bucket_rows(db: Session, station_name: str, keys) -> Dict:
+    """Existing rollup rows for (granularity, band_number, bucket_start) keys"""
+    if not keys:
+        return {}
+    starts = {start for _, _, start in keys}
+    rows = db.query(OccupancyRollup).filter(
+        OccupancyRollup.station_name == station_name,
+        OccupancyRollup.bucket_start.in_(list(starts))
+    )
+    return {(r.granularity, r.band_number, r.bucket_start): r for r in rows}
+
+def _add_to_buckets(db: Session, summaries: List[MeasurementBandSummary]):
+    if not summaries:
+        return
+    station_name = summaries[0].station_name
+    keys = [(g, s.band_number, bucket_start(s.measured_at, g)) for s in summaries for g in GRANULARITIES]
+    existing = _bucket_rows(db, station_name, keys)
+
+    for summary in summaries:
+        for granularity in GRANULARITIES:
+            key = (granularity, summary.band_number, bucket_start(summary.measured_at, granularity))
+            row = existing.get(key)
+            if row is None:
+                row = OccupancyRollup(
+                    granularity=granularity, station_name=station_name,
+                    band_number=summary.band_number, bucket_start=key[2],
+                    measurements=0, occupancy_sum=0, noise_floor_sum=0, peak_count_sum=0
+                )
+                db.add(row)
+                existing[key] = row
+
+            row.measurements += 1
+            row.occupancy_sum += summary.occupancy_percentage
+            row.noise_floor_sum += summary.noise_floor
+            row.peak_count_sum += summary.peak_count
+            row.occupancy_max = _max(row.occupancy_max, summary.occupancy_percentage)
+            row.noise_floor_min = _min(row.noise_floor_min, summary.noise_floor)
+            row.peak_count_max = _max(row.peak_count_max, summary.peak_count)
+            row.max_level = _max(row.max_level, summary.max_level)
+
+def _max(current, value):
+    if value is None:
+        return current
+    return value if current is None else max(current, value)
+
+def _min(current, value):
+    if value is None:
+        return current
+    return value if current is None else min(current, value)
+
+def remove_measurement_rollups(db: Session, analysis_id: int):
+    """
+    Subtract an analysis from its buckets and drop its band summaries.
+    Buckets left empty are deleted; the extrema of the others are recomputed
+    from their remaining summaries. Does not commit.
+    """
+    summaries = db.query(MeasurementBandSummary).filter(MeasurementBandSummary.analysis_id == analysis_id).all()
+    if not summaries:
+        return
+
+    station_name = summaries[0].station_name
+    keys = [(g, s.band_number, bucket_start(s.measured_at, g)) for s in summaries for g in GRANULARITIES]
+    existing = _bucket_rows(db, station_name, keys)
+
+    for summary in summaries:
+        db.delete(summary)
+    db.flush()
+
+    for summary in summaries:
+        for granularity in GRANULARITIES:
+            row = existing.get((granularity, summary.band_number, bucket_start(summary.measured_at, granularity)))
+            if row is None:
+                continue
+            row.measurements -= 1
+            row.occupancy_sum -= summary.occupancy_percentage
+            row.noise_floor_sum -= summary.noise_floor
+            row.peak_count_sum -= summary.peak_count
+
+    for key in set(keys):
+        row = existing.get(key)
+        if row is None:
+            continue
+        if row.measurements <= 0:
+            db.delete(row)
+            continue
+
+        extrema = db.query(
+            func.max(MeasurementBandSummary.occupancy_percentage),
+            func.min(MeasurementBandSummary.noise_floor),
+            func.max(MeasurementBandSummary.peak_count),
+            func.max(MeasurementBandSummary.max_level)
+        ).filter(
+            MeasurementBandSummary.station_name == row.station_name,
+            MeasurementBandSummary.band_number == row.band_number,
+            MeasurementBandSummary.measured_at >= row.bucket_start,
+            MeasurementBandSummary.measured_at < _bucket_end(row.bucket_start, row.granularity)
+        ).one()
+        row.occupancy_max, row.noise_floor_min, row.peak_count_max, row.max_level = extrema
+
+def rollup_measurement(db: Session, analysis: Analysis, channels_df: pd.DataFrame, bands: List[Dict]) -> List[MeasurementBandSummary]:
+    """
+    Summarize the bands of an analysis and add them to the rollups,
+    replacing any earlier contribution of the same analysis. Does not commit.
+    """
+    remove_measurement_rollups(db, analysis.id)
+
+    measured_at = _measured_at(analysis)
+    station_name = analysis.station_name or ''
+    summaries = [
+        MeasurementBandSummary(analysis_id=analysis.id, station_name=station_name, measured_at=measured_at, **summary)
+        for summary in summarize_bands(channels_df, bands)
+    ]
+    db.add_all(summaries)
+    _add_to_buckets(db, summaries)
+    return summaries
+
+def reset_rollups(db: Session):
+    """Clear all summaries and buckets after all analyses were deleted. Does not commit."""
+    db.query(MeasurementBandSummary).delete(synchronize_session=False)
+    db.query(OccupancyRollup).delete(synchronize_session=False)
+
+def occupancy_series(
+    db: Session,
+    band_number: int,
+    granularity: str = 'day',
+    station: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    combine: bool = False
+) -> List[Dict]:
+    """
+    Time series of one band per station, or one fleet-wide series with
+    combine. `station` matches part of the name.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {list(GRANULARITIES)}")
+
+    columns = [
+        OccupancyRollup.bucket_start,
+        func.sum(OccupancyRollup.measurements),
+        func.sum(OccupancyRollup.occupancy_sum),
+        func.max(OccupancyRollup.occupancy_max),
+        func.sum(OccupancyRollup.noise_floor_sum),
+        func.min(OccupancyRollup.noise_floor_min),
+        func.sum(OccupancyRollup.peak_count_sum),
+        func.max(OccupancyRollup.peak_count_max),
+        func.max(OccupancyRollup.max_level),
+        func.count(OccupancyRollup.id)
+    ]
+    group_by = [OccupancyRollup.bucket_start]
+    if not combine:
+        columns.insert(0, OccupancyRollup.station_name)
+        group_by.insert(0, OccupancyRollup.station_name)
+
+    query = db.query(*columns).filter(
+        OccupancyRollup.granularity == granularity,
+        OccupancyRollup.band_number == band_number
+    )
+    if station:
+        query = query.filter(OccupancyRollup.station_name.ilike(f"%{station}%"))
+    if date_from:
+        query = query.filter(OccupancyRollup.bucket_start >= bucket_start(date_from, granularity))
+    if date_to:
+        query = query.filter(OccupancyRollup.bucket_start <= date_to)
+
+    series = {}
+    for row in query.group_by(*group_by).order_by(*group_by):
+        name = None if combine else row[0]
+        values = row if combine else row[1:]
+        measurements = values[1]
+        series.setdefault(name, []).append({
+            'bucket_start': values[0],
+            'measurements': measurements,
+            'stations': values[9],
+            'avg_occupancy_percentage': round(values[2] / measurements, 2),
+            'max_occupancy_percentage': values[3],
+            'avg_noise_floor': round(values[4] / measurements, 2),
+            'min_noise_floor': values[5],
+            'avg_peak_count': round(values[6] / measurements, 2),
+            'max_peak_count': values[7],
+            'max_level': values[8]
+        })
+
+    return [{'station_name': name, 'points': points} for name, points in series.items()]
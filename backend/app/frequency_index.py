@@ -0,0 +1,191 @@
+"""
+Cross-measurement frequency search.
+
+At ingest every measurement is reduced to one posting per coarse frequency
+bin holding its strongest maximum and average levels. A search first prunes
+by bin and level on the postings table, and only the surviving candidate
+measurements have their raw channel data read for the exact check.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import Analysis, FrequencyPosting
+from .storage import load_measurement
+
+LEVEL_COLUMNS = {
+    'max': ('max_level', 'max_field_strength'),
+    'avg': ('avg_level', 'avg_field_strength'),
+}
+
+def frequency_bins(frequencies) -> np.ndarray:
+    """Bin id of each frequency (MHz); changing FREQ_INDEX_BIN_KHZ needs a reindex"""
+    # Rounding to micro-kHz first keeps e.g. 98.3 MHz from landing in bin 982
+    khz = np.round(np.asarray(frequencies, dtype=float) * 1000.0, 6)
+    return np.floor(khz / settings.FREQ_INDEX_BIN_KHZ).astype(np.int64)
+
+def build_postings(analysis_id: int, channels_df: pd.DataFrame) -> List[Dict]:
+    """
+    Reduce a measurement to per-bin maxima with one sort and reduceat,
+    without grouping in Python.
+    """
+    if len(channels_df) == 0:
+        return []
+
+    freqs = channels_df['frequency'].to_numpy(dtype=float)
+    avg = channels_df['avg_field_strength'].to_numpy(dtype=float)
+    if 'max_field_strength' in channels_df:
+        peak = channels_df['max_field_strength'].to_numpy(dtype=float)
+        peak = np.where(np.isnan(peak), avg, peak)
+    else:
+        peak = avg
+
+    bins = frequency_bins(freqs)
+    order = np.argsort(bins, kind='stable')
+    bins, avg, peak = bins[order], avg[order], peak[order]
+
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]])
+    max_levels = np.round(np.maximum.reduceat(peak, starts) * 10).astype(int)
+    avg_levels = np.round(np.maximum.reduceat(avg, starts) * 10).astype(int)
+
+    return [
+        {'bin_id': int(b), 'analysis_id': analysis_id, 'max_level': int(m), 'avg_level': int(a)}
+        for b, m, a in zip(bins[starts], max_levels, avg_levels)
+    ]
+
+def index_measurement(db: Session, analysis_id: int, channels_df: pd.DataFrame) -> int:
+    """
+    Replace the postings of one analysis. Does not commit.
+    Returns the number of postings written.
+    """
+    db.query(FrequencyPosting).filter(FrequencyPosting.analysis_id == analysis_id).delete(synchronize_session=False)
+    postings = build_postings(analysis_id, channels_df)
+    if postings:
+        db.bulk_insert_mappings(FrequencyPosting, postings)
+    return len(postings)
+
+def merge_postings(db: Session, analysis_id: int, channels_df: pd.DataFrame) -> int:
+    """
+    Fold newly appended channels into the existing postings of an analysis,
+    keeping the per-bin maxima. Does not commit.
+    """
+    postings = build_postings(analysis_id, channels_df)
+    if not postings:
+        return 0
+
+    bins = [p['bin_id'] for p in postings]
+    existing = {
+        p.bin_id: p for p in db.query(FrequencyPosting).filter(
+            FrequencyPosting.analysis_id == analysis_id,
+            FrequencyPosting.bin_id.in_(bins)
+        )
+    }
+
+    for posting in postings:
+        current = existing.get(posting['bin_id'])
+        if current is None:
+            db.add(FrequencyPosting(**posting))
+        else:
+            current.max_level = max(current.max_level, posting['max_level'])
+            current.avg_level = max(current.avg_level, posting['avg_level'])
+    return len(postings)
+
+def find_candidates(db: Session, freq_min: float, freq_max: float,
+                    min_level: float, level: str = 'max') -> Dict[int, float]:
+    """
+    Analyses whose postings in the bins covering [freq_min, freq_max] reach
+    min_level, with their best indexed level in dB.
+    """
+    column = getattr(FrequencyPosting, LEVEL_COLUMNS[level][0])
+    first_bin, last_bin = (int(b) for b in frequency_bins([freq_min, freq_max]))
+
+    rows = db.query(FrequencyPosting.analysis_id, func.max(column)).filter(
+        FrequencyPosting.bin_id >= first_bin,
+        FrequencyPosting.bin_id <= last_bin,
+        column >= int(np.floor(min_level * 10))
+    ).group_by(FrequencyPosting.analysis_id).all()
+
+    return {analysis_id: best / 10.0 for analysis_id, best in rows}
+
+def search_frequency(
+    db: Session,
+    frequency: float,
+    tolerance_khz: float = 25.0,
+    min_level: float = 60.0,
+    level: str = 'max',
+    verify: bool = True,
+    limit: int = 100
+) -> List[Dict]:
+    """
+    Measurements in which frequency +/- tolerance_khz exceeded min_level.
+
+    Candidates come from the postings; with verify the raw channels of each
+    candidate are checked and the exceeding channels returned. Without it
+    the indexed bin maxima are returned as-is, which may include channels
+    just outside the tolerance that share a bin.
+    """
+    if level not in LEVEL_COLUMNS:
+        raise ValueError(f"level must be one of {sorted(LEVEL_COLUMNS)}")
+
+    freq_min = frequency - tolerance_khz / 1000.0
+    freq_max = frequency + tolerance_khz / 1000.0
+    candidates = find_candidates(db, freq_min, freq_max, min_level, level)
+    if not candidates:
+        return []
+
+    analyses = db.query(Analysis).filter(Analysis.id.in_(list(candidates.keys()))).order_by(
+        Analysis.upload_time.desc(), Analysis.id.desc()
+    ).all()
+
+    matches = []
+    for analysis in analyses:
+        match = {
+            'analysis_id': analysis.id,
+            'task_id': analysis.task_id,
+            'station_name': analysis.station_name,
+            'start_time': analysis.start_time,
+            'indexed_level': candidates[analysis.id],
+        }
+
+        if verify:
+            channels = _exceeding_channels(analysis, freq_min, freq_max, min_level, LEVEL_COLUMNS[level][1])
+            if channels is None:
+                match['verified'] = False
+            elif not channels:
+                continue
+            else:
+                match['verified'] = True
+                match['peak_level'] = max(c[LEVEL_COLUMNS[level][1]] for c in channels)
+                match['channels'] = channels
+
+        matches.append(match)
+        if len(matches) >= limit:
+            break
+
+    return matches
+
+def _exceeding_channels(analysis: Analysis, freq_min: float, freq_max: float,
+                        min_level: float, level_column: str) -> Optional[List[Dict]]:
+    try:
+        _, channels_df = load_measurement(analysis.file_path)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    if level_column not in channels_df:
+        level_column = 'avg_field_strength'
+
+    freqs = channels_df['frequency'].to_numpy(dtype=float)
+    levels = channels_df[level_column].to_numpy(dtype=float)
+    mask = (freqs >= freq_min) & (freqs <= freq_max) & (levels >= min_level)
+
+    hits = channels_df[mask]
+    return [{
+        'channel_no': int(row.channel_no) if 'channel_no' in hits else None,
+        'frequency': float(row.frequency),
+        'avg_field_strength': float(row.avg_field_strength),
+        'max_field_strength': float(getattr(row, 'max_field_strength', row.avg_field_strength)),
+    } for row in hits.itertuples(index=False)]
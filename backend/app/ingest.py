@@ -0,0 +1,79 @@
+"""
+Derived data maintained for every ingested measurement.
+
+Upload paths call ingest_measurement after the Analysis row has been flushed
+so that the indexes built from its channels commit in the same transaction.
+Measurements that grow after their first ingest (tailed files) are kept up
+to date with update_measurement.
+"""
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from .database import Analysis
+from .frequency_index import index_measurement, merge_postings
+from .fleet_rollups import rollup_measurement
+from .fingerprints import fingerprint_measurement
+from .compliance import check_compliance, store_compliance
+
+def ingest_measurement(db: Session, analysis: Analysis, parsed_data: dict, channels_df: pd.DataFrame):
+    """
+    Build the per-measurement indexes for a newly stored analysis.
+    Does not commit.
+    """
+    index_measurement(db, analysis.id, channels_df)
+    rollup_measurement(db, analysis, channels_df, parsed_data['bands'])
+    fingerprint_measurement(db, analysis, channels_df, parsed_data['bands'])
+    store_compliance(db, analysis, check_compliance(channels_df, parsed_data['bands']))
+
+def store_analysis(db: Session, parsed_data: dict, filename: str, file_path: str,
+                   waterfall_path: Optional[str] = None, content_sha256: Optional[str] = None) -> Analysis:
+    """
+    Create the Analysis row of a parsed measurement and ingest its channels.
+    Does not commit.
+    """
+    # Datetime objects are stored as strings in the JSON metadata
+    metadata_for_json = parsed_data['metadata'].copy()
+    for key in ('Start Time', 'Stop Time'):
+        if isinstance(metadata_for_json.get(key), datetime):
+            metadata_for_json[key] = metadata_for_json[key].isoformat()
+
+    sweeps = parsed_data.get('sweeps')
+    analysis = Analysis(
+        task_id=parsed_data['metadata'].get('Task ID', 'Unknown'),
+        filename=filename,
+        file_path=file_path,
+        location_lat=parsed_data['metadata'].get('Location (lat)'),
+        location_lon=parsed_data['metadata'].get('Location (lon)'),
+        start_time=parsed_data['metadata'].get('Start Time'),
+        stop_time=parsed_data['metadata'].get('Stop Time'),
+        station_name=parsed_data['metadata'].get('Station Name'),
+        operator_id=parsed_data['metadata'].get('Operator ID'),
+        analysis_metadata=metadata_for_json,
+        bands=parsed_data['bands'],
+        bands_count=len(parsed_data['bands']),
+        waterfall_path=waterfall_path,
+        sweeps_count=len(sweeps['times']) if sweeps is not None else None,
+        content_sha256=content_sha256
+    )
+
+    db.add(analysis)
+    db.flush()
+    ingest_measurement(db, analysis, parsed_data, pd.DataFrame(parsed_data['channels']))
+    return analysis
+
+def update_measurement(db: Session, analysis: Analysis, bands: list, channels_df: pd.DataFrame,
+                       new_channels: pd.DataFrame):
+    """
+    Bring the derived data of a grown measurement up to date. The frequency
+    index only merges the new channels; band summaries, fingerprints and
+    compliance are refreshed from the accumulated channels. Does not commit.
+    """
+    if len(new_channels) == 0:
+        return
+    merge_postings(db, analysis.id, new_channels)
+    rollup_measurement(db, analysis, channels_df, bands)
+    fingerprint_measurement(db, analysis, channels_df, bands)
+    store_compliance(db, analysis, check_compliance(channels_df, bands))
@@ -0,0 +1,207 @@
+"""
+Tail-and-append ingestion of measurement CSVs written into a directory.
+
+Receivers exporting while they measure keep appending channel rows to the
+same file. The watcher polls the directory and reads only the bytes past the
+offset stored for each file, up to the last complete line:
+
+- the first read with a channel header and at least one channel parses the
+  file, copies it to UPLOAD_DIR and creates the Analysis like an upload;
+- later reads parse just the appended rows, append them to the stored copy
+  and update the derived data of the analysis in place.
+
+Offsets are kept in watched_files so a restart resumes where it stopped. A
+file that shrinks is taken as a new measurement. Per-sweep exports are not
+tailed since their waterfall store cannot be appended.
+"""
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import SessionLocal, Analysis, WatchedFile
+from .ingest import store_analysis, update_measurement
+from .parser import CSVParser
+from .storage import load_measurement, read_measurement_bytes
+
+def _channel_header(content: str) -> Optional[Tuple[str, str]]:
+    """Separator and channel header line of a file, None until both are written"""
+    lines = content.split('\n')
+    if not lines[0].strip().startswith('sep='):
+        return None
+    for line in lines:
+        if 'Channel No.' in line:
+            return lines[0].strip().split('=')[1], line
+    return None
+
+class _Tail:
+    """Channels accumulated so far for a tailed file"""
+
+    def __init__(self, sep: str, header_line: str, bands: List[Dict], channels_df: pd.DataFrame):
+        self.sep = sep
+        self.header_line = header_line
+        self.bands = bands
+        self.channels_df = channels_df
+
+class IngestWatcher:
+    """Polls a directory and keeps one Analysis per CSV file up to date"""
+
+    def __init__(self, directory: str, session_factory: Callable[[], Session] = SessionLocal,
+                 upload_dir: Optional[str] = None):
+        self.directory = directory
+        self.session_factory = session_factory
+        self.upload_dir = upload_dir or settings.UPLOAD_DIR
+        self._tails: Dict[str, _Tail] = {}
+
+    def poll(self) -> List[Dict]:
+        """One pass over the directory. Returns an event per file that was ingested or failed."""
+        events = []
+        db = self.session_factory()
+        try:
+            watched = {w.path: w for w in db.query(WatchedFile)}
+            seen = set()
+            for entry in sorted(os.scandir(self.directory), key=lambda e: e.name):
+                if not entry.is_file() or not entry.name.lower().endswith('.csv'):
+                    continue
+                path = os.path.abspath(entry.path)
+                stat = entry.stat()
+                seen.add(path)
+                record = watched.get(path)
+                if record is not None and record.size == stat.st_size and record.mtime == stat.st_mtime:
+                    continue
+
+                try:
+                    event = self._update_file(db, path, stat, record)
+                    db.commit()
+                except Exception as e:
+                    # Also I/O and database errors, so one file cannot stall the directory
+                    db.rollback()
+                    self._tails.pop(path, None)
+                    self._record_error(db, path, stat, str(e))
+                    event = {'path': path, 'status': 'error', 'detail': str(e)}
+                if event:
+                    events.append(event)
+
+            # Files that left the directory no longer need their channels in memory
+            self._tails = {path: tail for path, tail in self._tails.items() if path in seen}
+        finally:
+            db.close()
+        return events
+
+    def run(self, interval: Optional[float] = None, stop_event: Optional[threading.Event] = None):
+        """Poll until stop_event is set"""
+        interval = interval or settings.INGEST_POLL_SECONDS
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                for event in self.poll():
+                    print(f"Ingest watcher: {event}")
+            except Exception as e:
+                print(f"Ingest watcher error: {e}")
+            stop_event.wait(interval)
+
+    def _update_file(self, db: Session, path: str, stat: os.stat_result, record: Optional[WatchedFile]) -> Optional[Dict]:
+        if record is not None and stat.st_size < record.offset:
+            # Truncated or rewritten: start over as a new measurement
+            self._tails.pop(path, None)
+            record.analysis_id, record.stored_path, record.offset, record.note = None, None, 0, None
+        if record is not None and record.offset and record.analysis_id is None:
+            # Analysis deleted, or the file cannot be tailed
+            return None
+
+        offset = record.offset if record is not None else 0
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(stat.st_size - offset)
+        data = data[:data.rfind(b'\n') + 1]
+        if not data:
+            return None
+
+        if offset == 0:
+            return self._start(db, path, stat, record, data)
+        return self._append(db, record, stat, data)
+
+    def _start(self, db: Session, path: str, stat: os.stat_result, record: Optional[WatchedFile],
+               data: bytes) -> Optional[Dict]:
+        header = _channel_header(data.decode('utf-8'))
+        if header is None:
+            return None
+
+        parsed_data = CSVParser(data).parse()
+        if parsed_data['sweeps'] is None and parsed_data['channels_count'] == 0:
+            return None
+        record = record or self._new_record(db, path)
+        if parsed_data['sweeps'] is not None:
+            self._advance(record, stat, len(data), note="Per-sweep exports are not tailed; upload the finished file")
+            return {'path': path, 'status': 'skipped', 'detail': record.note}
+
+        stored_path = os.path.join(self.upload_dir, f"{uuid.uuid4()}.csv")
+        analysis = store_analysis(db, parsed_data, os.path.basename(path), stored_path)
+        with open(stored_path, 'wb') as f:
+            f.write(data)
+
+        record.analysis_id = analysis.id
+        record.stored_path = stored_path
+        self._advance(record, stat, len(data))
+        self._tails[path] = _Tail(header[0], header[1], parsed_data['bands'], pd.DataFrame(parsed_data['channels']))
+        return {'path': path, 'status': 'created', 'analysis_id': analysis.id,
+                'channels': parsed_data['channels_count']}
+
+    def _append(self, db: Session, record: WatchedFile, stat: os.stat_result, data: bytes) -> Optional[Dict]:
+        analysis = db.get(Analysis, record.analysis_id)
+        if analysis is None:
+            record.analysis_id = None
+            return None
+
+        tail = self._tails.get(record.path) or self._restore(record)
+        new_channels = CSVParser(b'').parse_channel_rows(tail.header_line, data.decode('utf-8').split('\n'), tail.sep)
+        channels_df = pd.concat([tail.channels_df, new_channels], ignore_index=True)
+        update_measurement(db, analysis, tail.bands, channels_df, new_channels)
+
+        with open(record.stored_path, 'ab') as f:
+            f.write(data)
+        tail.channels_df = channels_df
+        self._tails[record.path] = tail
+        self._advance(record, stat, record.offset + len(data))
+        return {'path': record.path, 'status': 'appended', 'analysis_id': analysis.id,
+                'channels': len(new_channels), 'total_channels': len(channels_df)}
+
+    def _restore(self, record: WatchedFile) -> _Tail:
+        """Rebuild the channels of a file tailed before a restart from its stored copy"""
+        parsed_data, channels_df = load_measurement(record.stored_path)
+        sep, header_line = _channel_header(read_measurement_bytes(record.stored_path).decode('utf-8'))
+        return _Tail(sep, header_line, parsed_data['bands'], channels_df)
+
+    def _new_record(self, db: Session, path: str) -> WatchedFile:
+        record = WatchedFile(path=path, offset=0, size=0)
+        db.add(record)
+        return record
+
+    def _advance(self, record: WatchedFile, stat: os.stat_result, offset: int, note: Optional[str] = None):
+        record.offset = offset
+        record.size = stat.st_size
+        record.mtime = stat.st_mtime
+        record.note = note
+        record.updated_at = datetime.utcnow()
+
+    def _record_error(self, db: Session, path: str, stat: os.stat_result, message: str):
+        """Remember the failure so the file is retried only once it changes again"""
+        record = db.query(WatchedFile).filter(WatchedFile.path == path).first() or self._new_record(db, path)
+        record.size = stat.st_size
+        record.mtime = stat.st_mtime
+        record.note = message[:500]
+        record.updated_at = datetime.utcnow()
+        db.commit()
+
+def start_ingest_watcher(directory: str, interval: Optional[float] = None) -> threading.Thread:
+    """Run a watcher on a daemon thread"""
+    os.makedirs(directory, exist_ok=True)
+    watcher = IngestWatcher(directory)
+    thread = threading.Thread(target=watcher.run, args=(interval,), name="ingest-watcher", daemon=True)
+    thread.start()
+    return thread
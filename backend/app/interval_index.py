@@ -0,0 +1,163 @@
+"""
+Static interval index (centered interval tree) over NumPy arrays.
+
+Built once from arrays of closed intervals [start, stop], it answers overlap
+queries for a range in O(log n + k) and stabbing queries for a whole array
+of points in one batched pass down the tree.
+"""
+from typing import Tuple
+
+import numpy as np
+
+class _Node:
+    __slots__ = ('center', 'by_start', 'starts', 'by_stop', 'stops', 'left', 'right')
+
+class IntervalIndex:
+    """
+    Centered interval tree. Every node stores the intervals that contain its
+    center, once sorted by start and once sorted by stop, so the overlapping
+    part of a node is always a prefix or suffix found with searchsorted.
+    """
+
+    def __init__(self, starts, stops, leaf_size: int = 64):
+        self.starts = np.asarray(starts, dtype=float)
+        self.stops = np.asarray(stops, dtype=float)
+
+        if self.starts.shape != self.stops.shape:
+            raise ValueError("starts and stops must have the same length")
+        if np.any(self.stops < self.starts):
+            raise ValueError("Interval stop must not be before its start")
+
+        self.leaf_size = leaf_size
+        self.root = self._build(np.arange(len(self.starts)))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build(self, ids: np.ndarray):
+        if len(ids) == 0:
+            return None
+
+        node = _Node()
+        starts = self.starts[ids]
+        stops = self.stops[ids]
+
+        if len(ids) <= self.leaf_size:
+            # Small nodes keep everything; the center only routes queries
+            node.center = float(np.median((starts + stops) / 2))
+            here = np.ones(len(ids), dtype=bool)
+        else:
+            node.center = float(np.median(np.concatenate([starts, stops])))
+            here = (starts <= node.center) & (stops >= node.center)
+
+        left = stops < node.center
+        right = starts > node.center
+        if len(ids) <= self.leaf_size:
+            left[:] = False
+            right[:] = False
+
+        here_ids = ids[here]
+        order = np.argsort(self.starts[here_ids], kind='stable')
+        node.by_start = here_ids[order]
+        node.starts = self.starts[node.by_start]
+        order = np.argsort(self.stops[here_ids], kind='stable')
+        node.by_stop = here_ids[order]
+        node.stops = self.stops[node.by_stop]
+
+        node.left = self._build(ids[left])
+        node.right = self._build(ids[right])
+        return node
+
+    def overlap(self, lo: float, hi: float) -> np.ndarray:
+        """
+        Indices of intervals overlapping the closed range [lo, hi].
+        """
+        found = []
+        stack = [self.root]
+
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+
+            # Exact test within the node also covers leaf nodes, whose
+            # intervals do not necessarily contain the center
+            first = np.searchsorted(node.stops, lo, side='left')
+            last = np.searchsorted(node.starts, hi, side='right')
+            if first < len(node.stops) and last > 0:
+                if hi < node.center:
+                    found.append(node.by_start[:last])
+                elif lo > node.center:
+                    found.append(node.by_stop[first:])
+                else:
+                    candidates = node.by_start[:last]
+                    found.append(candidates[self.stops[candidates] >= lo])
+
+            if lo < node.center:
+                stack.append(node.left)
+            if hi > node.center:
+                stack.append(node.right)
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+
+        ids = np.concatenate(found)
+        return ids[(self.starts[ids] <= hi) & (self.stops[ids] >= lo)]
+
+    def stab(self, points) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        All (point index, interval index) pairs where the interval contains
+        the point, for an array of points at once.
+        """
+        points = np.asarray(points, dtype=float)
+        point_out = []
+        interval_out = []
+        stack = [(self.root, np.arange(len(points)))]
+
+        while stack:
+            node, pids = stack.pop()
+            if node is None or len(pids) == 0:
+                continue
+
+            values = points[pids]
+
+            # Intervals with start <= p form a prefix of by_start, those
+            # with stop >= p a suffix of by_stop; the exact check below
+            # discards leaf intervals that do not contain the center
+            left_side = values <= node.center
+            counts = np.searchsorted(node.starts, values[left_side], side='right')
+            self._expand_prefix(pids[left_side], counts, node.by_start, point_out, interval_out)
+
+            right_side = ~left_side
+            firsts = np.searchsorted(node.stops, values[right_side], side='left')
+            counts = len(node.stops) - firsts
+            self._expand_suffix(pids[right_side], firsts, counts, node.by_stop, point_out, interval_out)
+
+            stack.append((node.left, pids[values < node.center]))
+            stack.append((node.right, pids[values > node.center]))
+
+        if not point_out:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+
+        pids = np.concatenate(point_out)
+        iids = np.concatenate(interval_out)
+        keep = (self.starts[iids] <= points[pids]) & (self.stops[iids] >= points[pids])
+        return pids[keep], iids[keep]
+
+    @staticmethod
+    def _expand_prefix(pids, counts, ordered, point_out, interval_out):
+        IntervalIndex._expand_suffix(pids, np.zeros_like(counts), counts, ordered, point_out, interval_out)
+
+    @staticmethod
+    def _expand_suffix(pids, firsts, counts, ordered, point_out, interval_out):
+        total = int(counts.sum()) if len(counts) else 0
+        if total == 0:
+            return
+
+        # Offsets 0..count-1 for every point, without a Python loop
+        ends = np.cumsum(counts)
+        offsets = np.arange(total) - np.repeat(ends - counts, counts)
+
+        point_out.append(np.repeat(pids, counts))
+        interval_out.append(ordered[np.repeat(firsts, counts) + offsets])
@@ -1,8 +1,30 @@
 import pandas as pd
-from typing import Dict, List
+import re
+from typing import Dict, List, Optional
 from datetime import datetime
 from io import BytesIO
 
+# ITU emission designator: necessary bandwidth as 3 digits with the decimal
+# point replaced by a unit letter, e.g. 16K0 = 16 kHz, 6M00 = 6 MHz. A bare
+# class such as G3E has no bandwidth.
+_EMISSION_BANDWIDTH_RE = re.compile(r'^\s*(?=[\dHKMG]{4})(\d{1,3})([HKMG])(\d{0,2})', re.IGNORECASE)
+_EMISSION_UNITS_KHZ = {'H': 1e-3, 'K': 1.0, 'M': 1e3, 'G': 1e6}
+
+def parse_emission_bandwidth_khz(emission_class: Optional[str]) -> Optional[float]:
+    """Necessary bandwidth in kHz from an emission class such as 16K0F3E"""
+    if not emission_class:
+        return None
+    
+    match = _EMISSION_BANDWIDTH_RE.match(str(emission_class))
+    if not match or len(match.group(1)) + len(match.group(3)) != 3:
+        return None
+    
+    whole, unit, fraction = match.groups()
+    value = float(f"{whole}.{fraction or '0'}")
+    if value <= 0:
+        return None
+    return value * _EMISSION_UNITS_KHZ[unit.upper()]
+
 class LicenseParser:
     def __init__(self, file_content: bytes, filename: str):
         self.file_content = file_content
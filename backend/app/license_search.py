@@ -0,0 +1,176 @@
+"""
+Full-text and prefix search over licensed stations.
+
+On SQLite an external-content FTS5 table mirrors the searchable text columns
+of licensed_stations and is kept in sync by triggers, so every insert, update
+and delete on LicensedStation (ORM or bulk) updates the index in the same
+transaction. Other databases fall back to ILIKE filtering.
+"""
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import text, column, func, Integer
+from sqlalchemy.orm import Session
+
+from .database import LicensedStation
+
+FTS_TABLE = "licensed_stations_fts"
+FTS_COLUMNS = ["clnt_name", "callsign", "stn_name", "city", "province"]
+
+# Counting stops here; larger result sets report an estimated total
+COUNT_CAP = 1000
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+def _fts_ddl() -> List[str]:
+    cols = ", ".join(FTS_COLUMNS)
+    new_cols = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+    old_cols = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {cols},
+            content='licensed_stations', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON licensed_stations BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON licensed_stations BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON licensed_stations BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {FTS_TABLE}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END""",
+    ]
+
+def create_license_search_index(engine):
+    """
+    Create the FTS5 table and sync triggers (SQLite only).
+    An index created over an existing table is rebuilt from its content.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": FTS_TABLE}
+        ).first()
+
+        for statement in _fts_ddl():
+            conn.execute(text(statement))
+
+        if not exists:
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+def build_match_expression(q: Optional[str] = None, province: Optional[str] = None) -> Optional[str]:
+    """
+    Turn free text into an FTS5 MATCH expression.
+    Every token becomes a quoted prefix term; terms are AND-ed together.
+    The province filter is restricted to the province column.
+    """
+    terms = []
+
+    for token in _TOKEN_RE.findall(q or ""):
+        terms.append(f'"{token}"*')
+
+    province_tokens = _TOKEN_RE.findall(province or "")
+    if province_tokens:
+        province_terms = " ".join(f'"{token}"*' for token in province_tokens)
+        terms.append(f"province : ({province_terms})")
+
+    return " ".join(terms) if terms else None
+
+def _uses_fts(db: Session) -> bool:
+    return db.get_bind().dialect.name == "sqlite"
+
+def search_licenses(
+    db: Session,
+    q: Optional[str] = None,
+    province: Optional[str] = None,
+    service: Optional[str] = None,
+    freq_min: Optional[float] = None,
+    freq_max: Optional[float] = None,
+    after_id: Optional[int] = None,
+    limit: int = 100
+) -> Dict:
+    """
+    Search licensed stations with keyset pagination on id.
+
+    Returns the page of stations, the cursor for the next page and a total
+    that is exact up to COUNT_CAP and estimated beyond it.
+    """
+    query = db.query(LicensedStation)
+
+    if _uses_fts(db):
+        match = build_match_expression(q, province)
+        if match:
+            fts_ids = text(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+            ).bindparams(match=match).columns(column("rowid", Integer))
+            query = query.filter(LicensedStation.id.in_(fts_ids))
+    else:
+        for token in _TOKEN_RE.findall(q or ""):
+            pattern = f"%{token}%"
+            query = query.filter(
+                LicensedStation.clnt_name.ilike(pattern) |
+                LicensedStation.callsign.ilike(pattern) |
+                LicensedStation.stn_name.ilike(pattern) |
+                LicensedStation.city.ilike(pattern) |
+                LicensedStation.province.ilike(pattern)
+            )
+        if province:
+            query = query.filter(LicensedStation.province.ilike(f"%{province}%"))
+
+    if service:
+        # Substring match for the free-text service filter ("mobile" finds "Land Mobile")
+        query = query.filter(LicensedStation.service.ilike(f"%{service}%"))
+
+    if freq_min is not None:
+        query = query.filter(LicensedStation.freq >= freq_min)
+
+    if freq_max is not None:
+        query = query.filter(LicensedStation.freq <= freq_max)
+
+    total, is_estimate = _estimate_total(db, query)
+
+    if after_id is not None:
+        query = query.filter(LicensedStation.id > after_id)
+
+    stations = query.order_by(LicensedStation.id).limit(limit).all()
+    next_after_id = stations[-1].id if len(stations) == limit else None
+
+    return {
+        "stations": stations,
+        "next_after_id": next_after_id,
+        "total": total,
+        "total_is_estimate": is_estimate
+    }
+
+def _estimate_total(db: Session, query) -> tuple:
+    """
+    Count matching rows up to COUNT_CAP. When the cap is reached the total is
+    extrapolated from the id of the COUNT_CAP-th match, i.e. from the density
+    of matches in the id range scanned so far, instead of scanning the rest.
+    """
+    capped = (
+        query.with_entities(LicensedStation.id)
+        .order_by(LicensedStation.id)
+        .limit(COUNT_CAP)
+        .subquery()
+    )
+    count, last_id = db.query(func.count(), func.max(capped.c.id)).select_from(capped).one()
+    count = count or 0
+
+    if count < COUNT_CAP:
+        return count, False
+
+    # Separate queries: SQLite only answers a lone min()/max() from the index
+    first_id = db.query(func.min(LicensedStation.id)).scalar()
+    max_id = db.query(func.max(LicensedStation.id)).scalar()
+    scanned = max(int(last_id) - int(first_id) + 1, 1)
+    id_range = int(max_id) - int(first_id) + 1
+
+    return int(round(count * id_range / scanned)), True
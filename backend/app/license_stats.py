@@ -0,0 +1,115 @@
+"""
+Incrementally maintained statistics for licensed stations.
+
+Counts per service and per province plus the station total live in small
+rollup tables that are updated inside the same transaction as every license
+upload or delete, so the stats endpoint never scans licensed_stations. Each
+change bumps a generation number that clients can use for caching.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .database import LicensedStation, LicenseStatistic, LicenseStatsState
+
+DIMENSIONS = ('service', 'province')
+STATE_ID = 1
+
+def _state(db: Session) -> LicenseStatsState:
+    state = db.get(LicenseStatsState, STATE_ID)
+    if state is None:
+        state = LicenseStatsState(id=STATE_ID, total=0, generation=0)
+        db.add(state)
+        db.flush()
+    return state
+
+def _key(value) -> str:
+    return '' if value is None else str(value)
+
+def apply_license_delta(db: Session, licenses: Iterable[Dict], sign: int = 1):
+    """
+    Add (sign=1) or remove (sign=-1) a batch of license records from the
+    rollup. Does not commit; call it inside the transaction that writes them.
+    """
+    licenses = list(licenses)
+    if not licenses:
+        return
+
+    for dimension in DIMENSIONS:
+        counts = Counter(_key(record.get(dimension)) for record in licenses)
+        existing = {
+            row.value: row for row in db.query(LicenseStatistic).filter(
+                LicenseStatistic.dimension == dimension,
+                LicenseStatistic.value.in_(list(counts.keys()))
+            )
+        }
+
+        for value, count in counts.items():
+            row = existing.get(value)
+            if row is None:
+                if sign < 0:
+                    continue
+                db.add(LicenseStatistic(dimension=dimension, value=value, count=count))
+                continue
+            row.count += sign * count
+            if row.count <= 0:
+                db.delete(row)
+
+    state = _state(db)
+    state.total = max(0, state.total + sign * len(licenses))
+    state.generation += 1
+    state.updated_at = datetime.utcnow()
+
+def reset_license_stats(db: Session):
+    """Clear the rollup after all licenses were deleted. Does not commit."""
+    db.query(LicenseStatistic).delete(synchronize_session=False)
+    state = _state(db)
+    state.total = 0
+    state.generation += 1
+    state.updated_at = datetime.utcnow()
+
+def rebuild_license_stats(db: Session):
+    """Recompute the rollup from licensed_stations. Does not commit."""
+    db.query(LicenseStatistic).delete(synchronize_session=False)
+
+    for dimension in DIMENSIONS:
+        column = getattr(LicensedStation, dimension)
+        for value, count in db.query(column, func.count(LicensedStation.id)).group_by(column):
+            db.add(LicenseStatistic(dimension=dimension, value=_key(value), count=count))
+
+    state = _state(db)
+    state.total = db.query(func.count(LicensedStation.id)).scalar() or 0
+    state.generation += 1
+    state.updated_at = datetime.utcnow()
+
+def ensure_license_stats(db: Session):
+    """Build the rollup once for databases created before it existed."""
+    if db.get(LicenseStatsState, STATE_ID) is None:
+        rebuild_license_stats(db)
+        db.commit()
+
+def get_license_stats(db: Session, top_provinces: int = 10) -> Dict:
+    """
+    Read the rollup. Cost depends on the number of distinct services and
+    provinces, not on the number of licensed stations.
+    """
+    state = db.get(LicenseStatsState, STATE_ID)
+
+    services = db.query(LicenseStatistic.value, LicenseStatistic.count).filter(
+        LicenseStatistic.dimension == 'service'
+    ).order_by(LicenseStatistic.value).all()
+
+    provinces = db.query(LicenseStatistic.value, LicenseStatistic.count).filter(
+        LicenseStatistic.dimension == 'province'
+    ).order_by(LicenseStatistic.count.desc(), LicenseStatistic.value).limit(top_provinces).all()
+
+    return {
+        "total_stations": state.total if state else 0,
+        "by_service": [{"service": s[0], "count": s[1]} for s in services],
+        "top_provinces": [{"province": p[0], "count": p[1]} for p in provinces],
+        "generation": state.generation if state else 0,
+        "updated_at": state.updated_at if state else None
+    }
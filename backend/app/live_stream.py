@@ -0,0 +1,189 @@
+"""
+Live sweeps pushed by monitoring receivers.
+
+Each station keeps a fixed-size ring buffer of recent sweeps and running
+accumulators (max-hold, linear average, per-channel noise floor) that are
+updated with a constant number of vector operations per sweep, whatever the
+length of the session. Every sweep is published to the dashboard clients of
+the station as one decimated update shared by all of them; a client that
+cannot keep up loses its oldest updates instead of slowing down ingestion.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from .config import settings
+
+class LiveSweep(BaseModel):
+    """One sweep as pushed by a receiver; frequencies are required on the first"""
+    levels: List[Optional[float]]
+    frequencies: Optional[List[float]] = None
+    time: Optional[datetime] = None
+
+class LiveStation:
+    """Ring buffer and running accumulators of one station's live sweeps"""
+
+    def __init__(self, name: str, frequencies, capacity: Optional[int] = None):
+        self.name = name
+        self.frequencies = np.asarray(frequencies, dtype=np.float64)
+        self.capacity = capacity or settings.LIVE_BUFFER_SWEEPS
+        n = len(self.frequencies)
+
+        self.buffer = np.full((self.capacity, n), np.nan, dtype=np.float32)
+        self.times = np.zeros(self.capacity, dtype='datetime64[ms]')
+        self.position = 0
+        self.sweeps = 0
+        self.started_at = None
+        self.updated_at = None
+
+        self.max_hold = np.full(n, -np.inf)
+        self._linear_sum = np.zeros(n)
+        self._count = np.zeros(n, dtype=np.int64)
+        self.noise_floor = np.full(n, np.nan)
+
+    @property
+    def average(self) -> np.ndarray:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 20.0 * np.log10(self._linear_sum / self._count)
+
+    def add_sweep(self, levels, time: Optional[datetime] = None):
+        """Append one sweep and update the accumulators"""
+        levels = np.asarray(levels, dtype=np.float64)
+        if levels.shape != self.frequencies.shape:
+            raise ValueError(f"Sweep has {levels.size} levels, station {self.name} has {self.frequencies.size} channels")
+
+        time = time or datetime.utcnow()
+        self.buffer[self.position] = levels
+        self.times[self.position] = np.datetime64(time, 'ms')
+        self.position = (self.position + 1) % self.capacity
+        self.sweeps += 1
+        self.started_at = self.started_at or time
+        self.updated_at = time
+
+        valid = ~np.isnan(levels)
+        np.fmax(self.max_hold, levels, out=self.max_hold)
+        self._linear_sum[valid] += np.power(10.0, levels[valid] / 20.0)
+        self._count += valid
+
+        # Minimum-tracking floor: follows drops at once, rises slowly so
+        # intermittent carriers do not lift it
+        floor = self.noise_floor
+        first = np.isnan(floor) & valid
+        floor[first] = levels[first]
+        below = valid & (levels < floor)
+        floor[below] = levels[below]
+        above = valid & ~below & ~first
+        floor[above] += settings.LIVE_FLOOR_RISE * (levels[above] - floor[above])
+
+    def recent(self, sweeps: Optional[int] = None):
+        """The latest sweeps in time order as (times, levels)"""
+        available = min(self.sweeps, self.capacity)
+        sweeps = available if sweeps is None else min(sweeps, available)
+        order = (self.position - sweeps + np.arange(sweeps)) % self.capacity
+        return self.times[order], self.buffer[order]
+
+    def update(self, points: int, last_sweep: bool = True) -> Dict:
+        """Decimated view of the station for dashboards"""
+        edges = np.arange(0, len(self.frequencies), max(1, -(-len(self.frequencies) // points)))
+        latest = self.buffer[(self.position - 1) % self.capacity] if self.sweeps else np.full(len(self.frequencies), np.nan)
+
+        def reduce(values, func=np.fmax):
+            if len(values) == 0:
+                return []
+            reduced = func.reduceat(np.where(np.isinf(values), np.nan, values), edges)
+            return np.where(np.isnan(reduced), None, np.round(reduced, 1)).tolist()
+
+        payload = {
+            'station': self.name,
+            'sweeps': self.sweeps,
+            'time': str(self.times[(self.position - 1) % self.capacity]) if self.sweeps else None,
+            'frequencies': self.frequencies[edges].tolist(),
+            'max_hold': reduce(self.max_hold),
+            'average': reduce(self.average),
+            'noise_floor': reduce(self.noise_floor, np.fmin),
+        }
+        if last_sweep:
+            payload['levels'] = reduce(latest)
+        return payload
+
+class LiveRegistry:
+    """Live stations and their dashboard subscribers by station name"""
+
+    def __init__(self):
+        self.stations: Dict[str, LiveStation] = {}
+        self.subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    def ingest(self, name: str, sweep: LiveSweep) -> LiveStation:
+        """
+        Add a sweep for a station. The first sweep must carry the frequencies;
+        a sweep with a different channel list starts the station over. The
+        sweep is checked before that, so a malformed one keeps the buffer.
+        """
+        levels = np.array(sweep.levels, dtype=np.float64)
+        frequencies = sweep.frequencies
+        station = self.stations.get(name)
+        if frequencies is not None and (station is None or len(frequencies) != len(station.frequencies)
+                                        or not np.allclose(frequencies, station.frequencies)):
+            if len(levels) != len(frequencies):
+                raise ValueError(f"Sweep has {len(levels)} levels for {len(frequencies)} frequencies")
+            if len(frequencies) > settings.LIVE_MAX_CHANNELS:
+                raise ValueError(f"Live sweeps are limited to {settings.LIVE_MAX_CHANNELS} channels")
+            if station is None and len(self.stations) >= settings.LIVE_MAX_STATIONS:
+                raise ValueError(f"Live data is limited to {settings.LIVE_MAX_STATIONS} stations")
+            station = LiveStation(name, frequencies)
+            self.stations[name] = station
+        if station is None:
+            raise LookupError(f"Station {name} has no channel list yet; send frequencies with the first sweep")
+
+        station.add_sweep(levels, sweep.time)
+        self.publish(station)
+        return station
+
+    def subscribe(self, name: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        self.subscribers.setdefault(name, []).append(queue)
+        return queue
+
+    def unsubscribe(self, name: str, queue: asyncio.Queue):
+        queues = self.subscribers.get(name, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self.subscribers.pop(name, None)
+
+    def publish(self, station: LiveStation):
+        """Queue the decimated update for every subscriber, dropping its oldest if full"""
+        queues = self.subscribers.get(station.name)
+        if not queues:
+            return
+        update = station.update(settings.LIVE_MAX_POINTS)
+        for queue in queues:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(update)
+
+    def get(self, name: str) -> LiveStation:
+        station = self.stations.get(name)
+        if station is None:
+            raise LookupError(f"No live data for station {name}")
+        return station
+
+    def reset(self, name: str):
+        station = self.stations.pop(name, None)
+        if station is None:
+            raise LookupError(f"No live data for station {name}")
+
+    def summary(self) -> List[Dict]:
+        return [{
+            'station': s.name,
+            'channels': len(s.frequencies),
+            'sweeps': s.sweeps,
+            'started_at': s.started_at,
+            'updated_at': s.updated_at,
+            'subscribers': len(self.subscribers.get(s.name, [])),
+        } for s in self.stations.values()]
+
+live_registry = LiveRegistry()
@@ -1,13 +1,18 @@
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Form, Request
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Form, Request, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, tuple_
 from typing import List, Optional
-import pandas as pd
+from pydantic import ValidationError
+import numpy as np
 import os
 import uuid
-from datetime import datetime
+import json
+import asyncio
+import time
+from datetime import date, datetime, timedelta
 
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -15,12 +20,29 @@ from slowapi.errors import RateLimitExceeded
 
 from .config import settings
 from .database import get_db, init_db, Analysis, LicensedStation
-from .parser import CSVParser
+from .storage import load_measurement, spool_upload
+from .compression import MEASUREMENT_SUFFIXES, file_compression, stored_name
+from .ingest import store_analysis
+from .ingest_watcher import start_ingest_watcher
+from .batch_ingest import iter_measurement_files, parse_files, parse_stored_file, run_in_parse_pool, store_batch
+from .frequency_index import search_frequency
+from .fleet_rollups import occupancy_series, remove_measurement_rollups, reset_rollups
+from .fingerprints import similar_measurements, biggest_changes
+from .comparison import compare_spectra, to_json_list
+from .noise_floor import rolling_noise_floor
+from .waterfall_store import WaterfallStore, decimate_max
+from .duty_cycle import compute_duty_cycle, channel_average
+from .live_stream import LiveSweep, live_registry
+from .compliance import get_band_plan, check_compliance, store_compliance, stored_compliance, find_violations
 from .license_parser import LicenseParser
+from .license_search import search_licenses
+from .results_store import store_band_result, band_result_history, occupancy_by_station, find_peaks
+from .license_stats import apply_license_delta, reset_license_stats, get_license_stats as read_license_stats
+from .spatial_index import stations_within_radius, stations_in_bbox
 from .analyzer import SpectrumAnalyzer
 from .report_generator import ReportGenerator, create_chart_image
 from .enhanced_report_generator import EnhancedReportGenerator
-from .security import verify_credentials, validate_file_size, sanitize_string, get_client_ip
+from .security import verify_credentials, verify_websocket_credentials, validate_file_size, sanitize_string, get_client_ip
 
 # Rate limiter setup
 limiter = Limiter(key_func=get_remote_address)
@@ -42,11 +64,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "DELETE", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# /api/upload reads its multipart body itself; documented here for the docs UI
+UPLOAD_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "properties": {"file": {"type": "string", "format": "binary"}},
+            "required": ["file"],
+        }}},
+    }
+}
+
 @app.on_event("startup")
 def startup_event():
     init_db()
+    if settings.INGEST_WATCH_DIR:
+        start_ingest_watcher(settings.INGEST_WATCH_DIR)
 
 @app.get("/")
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
@@ -57,76 +94,150 @@ def read_root(request: Request):
         "status": "running"
     }
 
-@app.post("/api/upload")
+@app.post("/api/upload", openapi_extra=UPLOAD_REQUEST_BODY)
 @limiter.limit("10/minute")
 async def upload_file(
     request: Request,
-    file: UploadFile = File(...),
     db: Session = Depends(get_db),
     auth: bool = Depends(verify_credentials)
 ):
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+    # The file part is spooled to UPLOAD_DIR, size-checked and hashed while
+    # it is received; parsed in the parse pool and stored on a worker thread
+    # so the event loop stays responsive
+    filename, spool = await spool_upload(request, allowed_suffixes=MEASUREMENT_SUFFIXES)
+    file_id = str(uuid.uuid4())
+    file_path = spool.keep(os.path.join(settings.UPLOAD_DIR, stored_name(file_id, file_compression(spool.path))))
+    size, content_sha256 = spool.size, spool.sha256
+    waterfall_path = None
     
-    try:
-        content = await file.read()
-        
-        # Validate file size
-        validate_file_size(content)
-        
-        parser = CSVParser(content)
-        parsed_data = parser.parse()
-        
-        file_id = str(uuid.uuid4())
-        file_path = os.path.join(settings.UPLOAD_DIR, f"{file_id}.csv")
-        
-        with open(file_path, 'wb') as f:
-            f.write(content)
-        
-        # Convert datetime objects to strings for JSON serialization
-        metadata_for_json = parsed_data['metadata'].copy()
-        if 'Start Time' in metadata_for_json and isinstance(metadata_for_json['Start Time'], datetime):
-            metadata_for_json['Start Time'] = metadata_for_json['Start Time'].isoformat()
-        if 'Stop Time' in metadata_for_json and isinstance(metadata_for_json['Stop Time'], datetime):
-            metadata_for_json['Stop Time'] = metadata_for_json['Stop Time'].isoformat()
-        
-        analysis = Analysis(
-            task_id=parsed_data['metadata'].get('Task ID', 'Unknown'),
-            filename=file.filename,
-            file_path=file_path,
-            location_lat=parsed_data['metadata'].get('Location (lat)'),
-            location_lon=parsed_data['metadata'].get('Location (lon)'),
-            start_time=parsed_data['metadata'].get('Start Time'),
-            stop_time=parsed_data['metadata'].get('Stop Time'),
-            station_name=parsed_data['metadata'].get('Station Name'),
-            operator_id=parsed_data['metadata'].get('Operator ID'),
-            analysis_metadata=metadata_for_json,
-            bands=parsed_data['bands']
-        )
-        
-        db.add(analysis)
+    def store(parsed_data, waterfall_path):
+        analysis = store_analysis(db, parsed_data, filename, file_path, waterfall_path, content_sha256)
         db.commit()
         db.refresh(analysis)
+        return analysis
+    
+    try:
+        result = await run_in_parse_pool(parse_stored_file, file_path)
+        if 'error' in result:
+            raise ValueError(result['error'])
+        parsed_data = result['parsed_data']
+        file_path, waterfall_path = result['file_path'], result['waterfall_path']
+        analysis = await run_in_threadpool(store, parsed_data, waterfall_path)
         
         return {
             "id": analysis.id,
             "file_id": file_id,
-            "filename": file.filename,
+            "filename": filename,
             "metadata": parsed_data['metadata'],
             "bands": parsed_data['bands'],
             "channels_count": parsed_data['channels_count'],
+            "sweeps_count": analysis.sweeps_count,
+            "size": size,
+            "content_sha256": content_sha256,
             "message": "File uploaded and parsed successfully"
         }
         
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        for path in (file_path, waterfall_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+        if isinstance(e, ValueError):
+            raise HTTPException(status_code=400, detail=str(e))
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+@app.post("/api/upload/batch")
+@limiter.limit("10/minute")
+async def upload_batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+    auth: bool = Depends(verify_credentials)
+):
+    """
+    Upload many measurement CSVs and/or ZIP archives of them at once. Files
+    are parsed in parallel and stored in one transaction; the response has
+    the status and timings of every file.
+    """
+    started = time.perf_counter()
+
+    def entries():
+        for file in files:
+            yield from iter_measurement_files(file.filename or '', file.file)
+
+    results = await parse_files(entries())
+    parsed_seconds = time.perf_counter() - started
+    statuses = await run_in_threadpool(store_batch, db, results)
+
+    stored = sum(1 for s in statuses if s['status'] == 'stored')
+    return {
+        "files": statuses,
+        "stored": stored,
+        "failed": len(statuses) - stored,
+        "parse_seconds": round(parsed_seconds, 3),
+        "total_seconds": round(time.perf_counter() - started, 3)
+    }
+
+def _encode_cursor(analysis: Analysis) -> str:
+    return f"{analysis.upload_time.isoformat()}_{analysis.id}"
+
+def _decode_cursor(cursor: str):
+    try:
+        upload_time, analysis_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(upload_time), int(analysis_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _is_bare_date(value: Optional[str]) -> bool:
+    try:
+        date.fromisoformat(value or '')
+        return True
+    except ValueError:
+        return False
+
 @app.get("/api/analyses")
 @limiter.limit(f"{settings.RATE_LIMIT_PER_MINUTE}/minute")
-def get_analyses(request: Request, db: Session = Depends(get_db)):
-    analyses = db.query(Analysis).order_by(Analysis.upload_time.desc()).limit(50).all()
+def get_analyses(
+    request: Request,
+    response: Response,
+    station: Optional[str] = None,
+    task_id: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    List analyses newest first without loading their JSON columns.
+    Filters apply to station name, task ID and upload date; a date_to
+    without a time includes that whole day. Pass the X-Next-Cursor response
+    header as `cursor` to fetch the next page.
+    """
+    query = db.query(Analysis).options(load_only(
+        Analysis.id, Analysis.task_id, Analysis.filename, Analysis.upload_time,
+        Analysis.location_lat, Analysis.location_lon, Analysis.station_name,
+        Analysis.bands_count
+    ))
+    
+    if station:
+        query = query.filter(Analysis.station_name == station)
+    if task_id:
+        query = query.filter(Analysis.task_id == task_id)
+    if date_from:
+        query = query.filter(Analysis.upload_time >= date_from)
+    if date_to and _is_bare_date(request.query_params.get('date_to')):
+        query = query.filter(Analysis.upload_time < date_to + timedelta(days=1))
+    elif date_to:
+        query = query.filter(Analysis.upload_time <= date_to)
+    
+    if cursor:
+        cursor_time, cursor_id = _decode_cursor(cursor)
+        query = query.filter(tuple_(Analysis.upload_time, Analysis.id) < tuple_(cursor_time, cursor_id))
+    
+    analyses = query.order_by(Analysis.upload_time.desc(), Analysis.id.desc()).limit(limit).all()
+    
+    if len(analyses) == limit:
+        response.headers["X-Next-Cursor"] = _encode_cursor(analyses[-1])
     
     return [{
         "id": a.id,
@@ -138,7 +249,7 @@ def get_analyses(request: Request, db: Session = Depends(get_db)):
             "lon": a.location_lon
         },
         "station_name": a.station_name,
-        "bands_count": len(a.bands) if a.bands else 0
+        "bands_count": a.bands_count or 0
     } for a in analyses]
 
 @app.delete("/api/analyses/{analysis_id}")
@@ -158,12 +269,13 @@ def delete_analysis(
         if not analysis:
             raise HTTPException(status_code=404, detail="Analysis not found")
         
-        # Clean up uploaded CSV file
-        if analysis.file_path and os.path.exists(analysis.file_path):
-            try:
-                os.remove(analysis.file_path)
-            except Exception as e:
-                print(f"Warning: Could not delete file {analysis.file_path}: {e}")
+        # Clean up uploaded CSV file and its waterfall
+        for path in (analysis.file_path, analysis.waterfall_path):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except Exception as e:
+                    print(f"Warning: Could not delete file {path}: {e}")
         
         # Clean up report PDF and chart PNG files
         if analysis.report_path and os.path.exists(analysis.report_path):
@@ -176,6 +288,7 @@ def delete_analysis(
             except Exception as e:
                 print(f"Warning: Could not delete report files: {e}")
         
+        remove_measurement_rollups(db, analysis.id)
         db.delete(analysis)
         db.commit()
         
@@ -205,12 +318,13 @@ def delete_all_analyses(
         
         # Clean up all associated files
         for analysis in analyses:
-            # Clean up uploaded CSV file
-            if analysis.file_path and os.path.exists(analysis.file_path):
-                try:
-                    os.remove(analysis.file_path)
-                except Exception as e:
-                    print(f"Warning: Could not delete file {analysis.file_path}: {e}")
+            # Clean up uploaded CSV file and its waterfall
+            for path in (analysis.file_path, analysis.waterfall_path):
+                if path and os.path.exists(path):
+                    try:
+                        os.remove(path)
+                    except Exception as e:
+                        print(f"Warning: Could not delete file {path}: {e}")
             
             # Clean up report PDF and chart PNG files
             if analysis.report_path and os.path.exists(analysis.report_path):
@@ -223,6 +337,7 @@ def delete_all_analyses(
                 except Exception as e:
                     print(f"Warning: Could not delete report files: {e}")
         
+        reset_rollups(db)
         db.query(Analysis).delete()
         db.commit()
         
@@ -256,6 +371,74 @@ def get_analysis(analysis_id: int, db: Session = Depends(get_db)):
         "report_path": analysis.report_path
     }
 
+def _load_analysis_data(analysis: Analysis):
+    """
+    Parse the stored measurement file of an analysis.
+    Returns (parsed_data, channels_df); 404 if the file is missing.
+    """
+    try:
+        return load_measurement(analysis.file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="CSV file not found")
+
+@app.get("/api/compare")
+def compare_measurements(
+    analysis_ids: List[int] = Query(...),
+    band_number: int = 1,
+    tolerance_khz: Optional[float] = Query(None, ge=0),
+    change_threshold_db: float = Query(6.0, ge=0),
+    include_values: bool = True,
+    db: Session = Depends(get_db)
+):
+    """
+    Compare 2-31 measurements over one band of the first (baseline) analysis.
+    All measurements are interpolated onto the baseline's channel grid.
+    """
+    if not 2 <= len(analysis_ids) <= 31:
+        raise HTTPException(status_code=400, detail="Provide between 2 and 31 analysis ids")
+    
+    found = {a.id: a for a in db.query(Analysis).filter(Analysis.id.in_(analysis_ids))}
+    missing = [i for i in analysis_ids if i not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Analysis not found: {missing}")
+    
+    baseline = found[analysis_ids[0]]
+    if band_number < 1 or band_number > len(baseline.bands or []):
+        raise HTTPException(status_code=400, detail=f"Band {band_number} not found")
+    band = baseline.bands[band_number - 1]
+    
+    frames = [_load_analysis_data(found[i])[1] for i in analysis_ids]
+    result = compare_spectra(frames, band['start_freq'], band['stop_freq'], tolerance_khz, change_threshold_db)
+    
+    measurements = []
+    for row, analysis_id in enumerate(analysis_ids):
+        analysis = found[analysis_id]
+        entry = {
+            "analysis_id": analysis_id,
+            "station_name": analysis.station_name,
+            "start_time": analysis.start_time,
+            **result['per_measurement'][row]
+        }
+        if include_values:
+            entry["values"] = to_json_list(result['values'][row])
+            entry["deltas"] = to_json_list(result['deltas'][row])
+        measurements.append(entry)
+    
+    response = {
+        "band_number": band_number,
+        "band_info": band,
+        "baseline_id": analysis_ids[0],
+        "channels": len(result['frequencies']),
+        "measurements": measurements,
+        "top_changes": result['top_changes']
+    }
+    if include_values:
+        response["frequencies"] = result['frequencies'].tolist()
+        response["mean"] = to_json_list(result['mean'])
+        response["min"] = to_json_list(result['min'])
+        response["max"] = to_json_list(result['max'])
+    return response
+
 @app.get("/api/analyses/{analysis_id}/auto-threshold")
 def get_auto_threshold(
     analysis_id: int,
@@ -272,18 +455,7 @@ def get_auto_threshold(
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     try:
-        if not analysis.file_path or not os.path.exists(analysis.file_path):
-            raise HTTPException(status_code=404, detail="CSV file not found")
-        
-        file_path = analysis.file_path
-        
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        parser = CSVParser(content)
-        parsed_data = parser.parse()
-        
-        channels_df = pd.DataFrame(parsed_data['channels'])
+        parsed_data, channels_df = _load_analysis_data(analysis)
         
         analyzer = SpectrumAnalyzer(
             channels_df,
@@ -300,6 +472,160 @@ def get_auto_threshold(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error calculating auto threshold: {str(e)}")
 
+@app.get("/api/analyses/{analysis_id}/noise-floor")
+def get_noise_floor_profile(
+    analysis_id: int,
+    band_number: int = 1,
+    window_mhz: Optional[float] = Query(None, gt=0),
+    percentile: Optional[float] = Query(None, ge=0, le=100),
+    max_points: int = Query(1000, ge=10, le=20000),
+    db: Session = Depends(get_db)
+):
+    """
+    Rolling low-percentile noise floor across the band, for plotting
+    """
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if band_number < 1 or band_number > len(analysis.bands or []):
+        raise HTTPException(status_code=400, detail=f"Band {band_number} not found")
+    
+    band = analysis.bands[band_number - 1]
+    _, channels_df = _load_analysis_data(analysis)
+    band_channels = channels_df[
+        (channels_df['frequency'] >= band['start_freq']) &
+        (channels_df['frequency'] <= band['stop_freq'])
+    ].sort_values('frequency', kind='stable')
+    
+    frequencies = band_channels['frequency'].to_numpy()
+    floor = rolling_noise_floor(frequencies, band_channels['avg_field_strength'].to_numpy(), window_mhz, percentile)
+    step = max(1, -(-len(frequencies) // max_points))
+    
+    return {
+        "band_number": band_number,
+        "window_mhz": window_mhz or settings.NOISE_FLOOR_WINDOW_MHZ,
+        "percentile": settings.NOISE_FLOOR_PERCENTILE if percentile is None else percentile,
+        "frequencies": frequencies[::step].tolist(),
+        "noise_floor": [round(float(v), 2) for v in floor[::step]]
+    }
+
+@app.get("/api/analyses/{analysis_id}/waterfall")
+def get_waterfall(
+    analysis_id: int,
+    band_number: Optional[int] = None,
+    start_freq: Optional[float] = None,
+    stop_freq: Optional[float] = None,
+    time_from: Optional[datetime] = None,
+    time_to: Optional[datetime] = None,
+    max_sweeps: int = Query(300, ge=1, le=5000),
+    max_channels: int = Query(1000, ge=10, le=20000),
+    db: Session = Depends(get_db)
+):
+    """
+    Time x frequency levels of a multi-sweep measurement, max-hold decimated
+    to at most max_sweeps x max_channels for plotting
+    """
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if not analysis.waterfall_path or not os.path.exists(analysis.waterfall_path):
+        raise HTTPException(status_code=404, detail="Analysis has no per-sweep data")
+    if band_number is not None:
+        if band_number < 1 or band_number > len(analysis.bands or []):
+            raise HTTPException(status_code=400, detail=f"Band {band_number} not found")
+        band = analysis.bands[band_number - 1]
+        start_freq, stop_freq = band['start_freq'], band['stop_freq']
+    
+    with WaterfallStore(analysis.waterfall_path) as store:
+        times, frequencies, levels = store.read(start_freq, stop_freq, time_from, time_to)
+    
+    reduced, rows, cols = decimate_max(levels, max_sweeps, max_channels)
+    return {
+        "band_number": band_number,
+        "sweeps": len(times),
+        "channels": len(frequencies),
+        "times": [str(t) for t in times[rows].astype('datetime64[s]')],
+        "frequencies": frequencies[cols].tolist(),
+        "levels": np.where(np.isnan(reduced), None, np.round(reduced, 1)).tolist()
+    }
+
+@app.get("/api/analyses/{analysis_id}/duty-cycle")
+def get_duty_cycle(
+    analysis_id: int,
+    band_number: int = 1,
+    threshold: Optional[float] = None,
+    margin_db: float = 10.0,
+    time_from: Optional[datetime] = None,
+    time_to: Optional[datetime] = None,
+    time_bins: int = Query(60, ge=1, le=1000),
+    freq_bins: int = Query(100, ge=1, le=2000),
+    histograms: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Share of sweeps each channel is above threshold, busy hour, hourly profile
+    and an occupancy heatmap over time. Without a threshold the rolling noise
+    floor of the mean sweep plus margin_db is used per channel.
+    """
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if not analysis.waterfall_path or not os.path.exists(analysis.waterfall_path):
+        raise HTTPException(status_code=404, detail="Analysis has no per-sweep data")
+    if band_number < 1 or band_number > len(analysis.bands or []):
+        raise HTTPException(status_code=400, detail=f"Band {band_number} not found")
+    
+    band = analysis.bands[band_number - 1]
+    with WaterfallStore(analysis.waterfall_path) as store:
+        duty_threshold = threshold
+        if duty_threshold is None:
+            c_lo, c_hi = store.channel_range(band['start_freq'], band['stop_freq'])
+            average = channel_average(store, band['start_freq'], band['stop_freq'], time_from, time_to)
+            valid = ~np.isnan(average)
+            frequencies = store.frequencies[c_lo:c_hi]
+            if valid.any():
+                floor = rolling_noise_floor(frequencies[valid], average[valid])
+                duty_threshold = np.interp(frequencies, frequencies[valid], floor) + margin_db
+            else:
+                # No channels or no levels in the band: nothing to count as occupied
+                duty_threshold = np.nan
+        duty = compute_duty_cycle(
+            store, band['start_freq'], band['stop_freq'], duty_threshold,
+            time_from, time_to, time_bins, freq_bins, histograms
+        )
+    
+    heatmap = duty['heatmap']
+    response = {
+        "band_number": band_number,
+        "threshold": threshold,
+        "margin_db": margin_db if threshold is None else None,
+        "sweeps": duty['sweeps'],
+        "time_from": duty['time_from'],
+        "time_to": duty['time_to'],
+        "mean_duty_cycle": duty['mean_duty_cycle'],
+        "busy_hour": duty['busy_hour'],
+        "hourly_profile": duty['hourly_profile'],
+        "duty_cycle_histogram": duty['duty_cycle_histogram'].tolist(),
+        "channels": [
+            {"frequency": float(f), "duty_cycle": None if np.isnan(d) else round(float(d), 2)}
+            for f, d in zip(duty['frequencies'], duty['duty_cycle'])
+        ],
+        "heatmap": {
+            "times": [str(t) for t in heatmap['times'].astype('datetime64[s]')],
+            "frequencies": heatmap['frequencies'].tolist(),
+            "occupancy": np.where(np.isnan(heatmap['occupancy']), None, np.round(heatmap['occupancy'], 1)).tolist()
+        }
+    }
+    if histograms:
+        response["level_histograms"] = {
+            "bin_edges": duty['level_histograms']['bin_edges'].tolist(),
+            "counts": duty['level_histograms']['counts'].tolist()
+        }
+    return response
+
 @app.post("/api/analyses/{analysis_id}/analyze")
 def analyze_spectrum(
     analysis_id: int,
@@ -307,6 +633,8 @@ def analyze_spectrum(
     threshold: float = Form(50.0),
     use_auto_threshold: bool = Form(False),
     margin_db: float = Form(10.0),
+    adaptive_noise_floor: bool = Form(False),
+    noise_window_mhz: Optional[float] = Form(None),
     db: Session = Depends(get_db)
 ):
     analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
@@ -315,18 +643,7 @@ def analyze_spectrum(
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     try:
-        if not analysis.file_path or not os.path.exists(analysis.file_path):
-            raise HTTPException(status_code=404, detail="CSV file not found")
-        
-        file_path = analysis.file_path
-        
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        parser = CSVParser(content)
-        parsed_data = parser.parse()
-        
-        channels_df = pd.DataFrame(parsed_data['channels'])
+        parsed_data, channels_df = _load_analysis_data(analysis)
         
         analyzer = SpectrumAnalyzer(
             channels_df,
@@ -335,9 +652,14 @@ def analyze_spectrum(
             db
         )
         
-        results = analyzer.analyze_band(band_number, threshold, use_auto_threshold, margin_db)
+        results = analyzer.analyze_band(
+            band_number, threshold, use_auto_threshold, margin_db, adaptive_noise_floor, noise_window_mhz
+        )
         
+        # Latest result stays on the analysis for the detail view; every run
+        # is also kept in the normalized results tables
         analysis.occupancy_results = results
+        store_band_result(db, analysis, results)
         db.commit()
         
         return results
@@ -347,6 +669,241 @@ def analyze_spectrum(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error analyzing spectrum: {str(e)}")
 
+@app.get("/api/analyses/{analysis_id}/changes")
+def detect_changes(
+    analysis_id: int,
+    baseline_id: Optional[int] = None,
+    band_number: int = 1,
+    threshold: Optional[float] = None,
+    margin_db: float = 10.0,
+    match_tolerance_khz: float = Query(100.0, gt=0),
+    shift_tolerance_khz: float = Query(10.0, ge=0),
+    level_change_db: float = Query(6.0, gt=0),
+    db: Session = Depends(get_db)
+):
+    """
+    New, disappeared, shifted and changed emissions against a baseline of the
+    same station; defaults to the station's previous measurement
+    """
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    if baseline_id is None:
+        moment = analysis.start_time or analysis.upload_time
+        baseline = db.query(Analysis).filter(
+            Analysis.station_name == analysis.station_name,
+            Analysis.id != analysis.id,
+            func.coalesce(Analysis.start_time, Analysis.upload_time) <= moment
+        ).order_by(func.coalesce(Analysis.start_time, Analysis.upload_time).desc(), Analysis.id.desc()).first()
+        if not baseline:
+            raise HTTPException(status_code=404, detail="No earlier measurement of this station to compare with")
+    else:
+        baseline = db.query(Analysis).filter(Analysis.id == baseline_id).first()
+        if not baseline:
+            raise HTTPException(status_code=404, detail="Baseline analysis not found")
+        if baseline.station_name != analysis.station_name:
+            raise HTTPException(status_code=400, detail="Baseline must be a measurement of the same station")
+    
+    parsed_data, channels_df = _load_analysis_data(analysis)
+    _, baseline_df = _load_analysis_data(baseline)
+    
+    analyzer = SpectrumAnalyzer(channels_df, parsed_data['bands'], parsed_data['metadata'], db)
+    try:
+        changes = analyzer.detect_changes(
+            baseline_df, band_number, threshold, margin_db,
+            match_tolerance_khz, shift_tolerance_khz, level_change_db
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {
+        "analysis_id": analysis.id,
+        "baseline_id": baseline.id,
+        "station_name": analysis.station_name,
+        "start_time": analysis.start_time,
+        "baseline_start_time": baseline.start_time,
+        **changes
+    }
+
+@app.get("/api/analyses/{analysis_id}/results")
+def get_analysis_results(
+    analysis_id: int,
+    band_number: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    History of stored band analysis runs for one measurement
+    """
+    if not db.query(Analysis.id).filter(Analysis.id == analysis_id).first():
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    return {
+        "analysis_id": analysis_id,
+        "results": band_result_history(db, analysis_id, band_number)
+    }
+
+@app.get("/api/results/occupancy")
+def get_occupancy_summary(
+    band_number: int,
+    station: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Band occupancy aggregated per station across stored results
+    """
+    return {
+        "band_number": band_number,
+        "stations": occupancy_by_station(db, band_number, station, date_from, date_to)
+    }
+
+@app.get("/api/results/peaks")
+def get_stored_peaks(
+    freq_min: float,
+    freq_max: float,
+    min_level: Optional[float] = None,
+    licensed: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Stored peaks within a frequency range across all measurements
+    """
+    if freq_min > freq_max:
+        raise HTTPException(status_code=400, detail="freq_min must not exceed freq_max")
+    
+    peaks = find_peaks(db, freq_min, freq_max, min_level, licensed, date_from, date_to, limit)
+    return {"count": len(peaks), "peaks": peaks}
+
+@app.get("/api/rollups/occupancy")
+def get_occupancy_rollups(
+    band_number: int,
+    granularity: str = Query('day', pattern='^(hour|day)$'),
+    station: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    combine: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Hourly or daily occupancy, noise floor and peak counts of one band per
+    station (or fleet-wide with combine), read from the ingest rollups
+    """
+    series = occupancy_series(db, band_number, granularity, station, date_from, date_to, combine)
+    return {
+        "band_number": band_number,
+        "granularity": granularity,
+        "margin_db": settings.ROLLUP_MARGIN_DB,
+        "series": series
+    }
+
+@app.get("/api/analyses/{analysis_id}/similar")
+def get_similar_analyses(
+    analysis_id: int,
+    band_number: int = 1,
+    limit: int = Query(10, ge=1, le=100),
+    same_station: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Archived measurements whose spectrum over the same band range is most
+    similar to this one
+    """
+    try:
+        similar = similar_measurements(db, analysis_id, band_number, limit, same_station)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"analysis_id": analysis_id, "band_number": band_number, "similar": similar}
+
+@app.get("/api/similarity/changes")
+def get_biggest_changes(
+    band_number: Optional[int] = None,
+    station: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    Largest spectrum changes between consecutive measurements of a station
+    """
+    changes = biggest_changes(db, band_number, station, limit)
+    return {"count": len(changes), "changes": changes}
+
+@app.get("/api/search/frequency")
+def search_frequency_archive(
+    frequency: float = Query(..., gt=0),
+    tolerance_khz: float = Query(25.0, ge=0, le=10000),
+    min_level: float = 60.0,
+    level: str = Query('max', pattern='^(max|avg)$'),
+    verify: bool = True,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    Find measurements in which frequency +/- tolerance exceeded min_level (dBµV/m)
+    """
+    matches = search_frequency(db, frequency, tolerance_khz, min_level, level, verify, limit)
+    return {
+        "frequency": frequency,
+        "tolerance_khz": tolerance_khz,
+        "min_level": min_level,
+        "level": level,
+        "count": len(matches),
+        "matches": matches
+    }
+
+@app.get("/api/analyses/{analysis_id}/compliance")
+def get_compliance(
+    analysis_id: int,
+    recheck: bool = False,
+    db: Session = Depends(get_db)
+):
+    """
+    Band plan compliance of a measurement as stored at ingest. recheck runs
+    the check again against the current plan and replaces the stored result.
+    """
+    analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
+    
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    
+    result = None if recheck else stored_compliance(db, analysis_id)
+    if result is None or result['plan_version'] != get_band_plan().version:
+        parsed_data, channels_df = _load_analysis_data(analysis)
+        result = check_compliance(channels_df, parsed_data['bands'])
+        store_compliance(db, analysis, result)
+        db.commit()
+    
+    return {"analysis_id": analysis_id, **result}
+
+@app.get("/api/compliance/violations")
+def get_compliance_violations(
+    service: Optional[str] = None,
+    station: Optional[str] = None,
+    min_excess_db: Optional[float] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
+    """
+    Stored mask violations across all measurements, largest excess first
+    """
+    violations = find_violations(db, service, station, min_excess_db, date_from, date_to, limit)
+    return {"count": len(violations), "violations": violations}
+
+@app.get("/api/compliance/band-plan")
+def get_compliance_band_plan():
+    """
+    The band plan / mask table compliance checks run against
+    """
+    plan = get_band_plan()
+    return {"name": plan.name, "version": plan.version, "entries": plan.entries}
+
 @app.post("/api/analyses/{analysis_id}/report")
 def generate_report(
     analysis_id: int,
@@ -354,6 +911,9 @@ def generate_report(
     threshold: float = Form(50.0),
     use_auto_threshold: bool = Form(False),
     margin_db: float = Form(10.0),
+    adaptive_noise_floor: bool = Form(False),
+    noise_window_mhz: Optional[float] = Form(None),
+    include_compliance: bool = Form(False),
     db: Session = Depends(get_db)
 ):
     analysis = db.query(Analysis).filter(Analysis.id == analysis_id).first()
@@ -362,18 +922,7 @@ def generate_report(
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     try:
-        if not analysis.file_path or not os.path.exists(analysis.file_path):
-            raise HTTPException(status_code=404, detail="CSV file not found")
-        
-        file_path = analysis.file_path
-        
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        parser = CSVParser(content)
-        parsed_data = parser.parse()
-        
-        channels_df = pd.DataFrame(parsed_data['channels'])
+        parsed_data, channels_df = _load_analysis_data(analysis)
         
         analyzer = SpectrumAnalyzer(
             channels_df,
@@ -382,7 +931,18 @@ def generate_report(
             db
         )
         
-        results = analyzer.analyze_band(band_number, threshold, use_auto_threshold, margin_db)
+        results = analyzer.analyze_band(
+            band_number, threshold, use_auto_threshold, margin_db, adaptive_noise_floor, noise_window_mhz
+        )
+        if include_compliance:
+            compliance = check_compliance(channels_df, parsed_data['bands'])
+            results['compliance'] = compliance['bands'][band_number - 1]
+        if analysis.waterfall_path and os.path.exists(analysis.waterfall_path):
+            band = parsed_data['bands'][band_number - 1]
+            with WaterfallStore(analysis.waterfall_path) as store:
+                results['duty_cycle'] = compute_duty_cycle(
+                    store, band['start_freq'], band['stop_freq'], results['threshold_used']
+                )
         
         report_filename = f"report_{analysis.task_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         report_path = os.path.join(settings.REPORTS_DIR, report_filename)
@@ -433,18 +993,7 @@ def get_channels(
         raise HTTPException(status_code=404, detail="Analysis not found")
     
     try:
-        if not analysis.file_path or not os.path.exists(analysis.file_path):
-            raise HTTPException(status_code=404, detail="CSV file not found")
-        
-        file_path = analysis.file_path
-        
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        
-        parser = CSVParser(content)
-        parsed_data = parser.parse()
-        
-        channels_df = pd.DataFrame(parsed_data['channels'])
+        parsed_data, channels_df = _load_analysis_data(analysis)
         
         if band_number:
             band = parsed_data['bands'][band_number - 1]
@@ -489,9 +1038,10 @@ async def upload_license_file(
         if len(licenses) == 0:
             raise HTTPException(status_code=400, detail="No valid license data found in file")
         
+        # Replacement, inserts and the stats rollup commit as one transaction
         if replace_existing:
             db.query(LicensedStation).delete()
-            db.commit()
+            reset_license_stats(db)
         
         added_count = 0
         for license_data in licenses:
@@ -499,6 +1049,7 @@ async def upload_license_file(
             db.add(station)
             added_count += 1
         
+        apply_license_delta(db, licenses)
         db.commit()
         
         return {
@@ -509,45 +1060,49 @@ async def upload_license_file(
             "replaced_existing": replace_existing
         }
         
+    except HTTPException:
+        raise
     except ValueError as e:
+        db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        db.rollback()
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
 @app.get("/api/licenses")
 def get_licenses(
+    q: Optional[str] = None,
     province: Optional[str] = None,
     service: Optional[str] = None,
     freq_min: Optional[float] = None,
     freq_max: Optional[float] = None,
-    limit: int = 100,
-    offset: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db)
 ):
     """
-    Get licensed stations with optional filters
+    Search licensed stations with optional filters.
+    `q` searches client name, callsign, station name, city and province by
+    word prefix. Pass `next_after_id` from a response as `after_id` to fetch
+    the next page.
     """
-    query = db.query(LicensedStation)
-    
-    if province:
-        query = query.filter(LicensedStation.province.ilike(f"%{province}%"))
-    
-    if service:
-        query = query.filter(LicensedStation.service.ilike(f"%{service}%"))
-    
-    if freq_min is not None:
-        query = query.filter(LicensedStation.freq >= freq_min)
-    
-    if freq_max is not None:
-        query = query.filter(LicensedStation.freq <= freq_max)
-    
-    total = query.count()
-    stations = query.offset(offset).limit(limit).all()
+    result = search_licenses(
+        db,
+        q=q,
+        province=province,
+        service=service,
+        freq_min=freq_min,
+        freq_max=freq_max,
+        after_id=after_id,
+        limit=limit
+    )
     
     return {
-        "total": total,
+        "total": result["total"],
+        "total_is_estimate": result["total_is_estimate"],
         "limit": limit,
-        "offset": offset,
+        "after_id": after_id,
+        "next_after_id": result["next_after_id"],
         "data": [{
             "id": s.id,
             "clnt_name": s.clnt_name,
@@ -564,34 +1119,94 @@ def get_licenses(
             "eq_mfr": s.eq_mfr,
             "eq_mdl": s.eq_mdl,
             "emis_class_1": s.emis_class_1
-        } for s in stations]
+        } for s in result["stations"]]
     }
 
-@app.get("/api/licenses/stats")
-def get_license_stats(db: Session = Depends(get_db)):
+def _license_summary(station: LicensedStation, distance_km: Optional[float] = None) -> dict:
+    summary = {
+        "id": station.id,
+        "clnt_name": station.clnt_name,
+        "callsign": station.callsign,
+        "stn_name": station.stn_name,
+        "service": station.service,
+        "freq": station.freq,
+        "province": station.province,
+        "city": station.city,
+        "latitude": station.latitude,
+        "longitude": station.longitude,
+        "emis_class_1": station.emis_class_1
+    }
+    if distance_km is not None:
+        summary["distance_km"] = round(distance_km, 3)
+    return summary
+
+@app.get("/api/licenses/nearby")
+def get_nearby_licenses(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(50.0, gt=0, le=2000),
+    freq_min: Optional[float] = None,
+    freq_max: Optional[float] = None,
+    limit: int = Query(200, ge=1, le=5000),
+    db: Session = Depends(get_db)
+):
     """
-    Get statistics about licensed stations
+    Licensed stations within radius_km of a point, nearest first
     """
-    total = db.query(LicensedStation).count()
+    query = db.query(LicensedStation)
+    if freq_min is not None:
+        query = query.filter(LicensedStation.freq >= freq_min)
+    if freq_max is not None:
+        query = query.filter(LicensedStation.freq <= freq_max)
+    
+    results = stations_within_radius(db, lat, lon, radius_km, limit=limit, query=query)
     
-    services = db.query(
-        LicensedStation.service,
-        func.count(LicensedStation.id)
-    ).group_by(LicensedStation.service).all()
+    return {
+        "center": {"lat": lat, "lon": lon},
+        "radius_km": radius_km,
+        "count": len(results),
+        "data": [_license_summary(s, d) for s, d in results]
+    }
+
+@app.get("/api/licenses/within")
+def get_licenses_in_bbox(
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lon: float = Query(..., ge=-180, le=180),
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Licensed stations inside a bounding box (e.g. the visible map area)
+    """
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
     
-    provinces = db.query(
-        LicensedStation.province,
-        func.count(LicensedStation.id)
-    ).group_by(LicensedStation.province).order_by(
-        func.count(LicensedStation.id).desc()
-    ).limit(10).all()
+    stations = stations_in_bbox(db, min_lat, max_lat, min_lon, max_lon, limit=limit)
     
     return {
-        "total_stations": total,
-        "by_service": [{"service": s[0], "count": s[1]} for s in services],
-        "top_provinces": [{"province": p[0], "count": p[1]} for p in provinces]
+        "count": len(stations),
+        "data": [_license_summary(s) for s in stations]
     }
 
+@app.get("/api/licenses/stats")
+def get_license_stats(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Get statistics about licensed stations from the incrementally maintained
+    rollup. The ETag is the license generation, so clients can revalidate
+    with If-None-Match.
+    """
+    stats = read_license_stats(db)
+    etag = f'"licenses-{stats["generation"]}"'
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return stats
+
 @app.delete("/api/licenses")
 @limiter.limit("5/minute")
 def delete_all_licenses(
@@ -605,6 +1220,7 @@ def delete_all_licenses(
     try:
         count = db.query(LicensedStation).count()
         db.query(LicensedStation).delete()
+        reset_license_stats(db)
         db.commit()
         
         return {
@@ -615,6 +1231,140 @@ def delete_all_licenses(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Error deleting licenses: {str(e)}")
 
+@app.post("/api/live/{station}/sweeps")
+async def push_live_sweep(
+    station: str,
+    sweep: LiveSweep,
+    auth: bool = Depends(verify_credentials)
+):
+    """
+    Push one sweep of a live receiver. The first sweep of a station must
+    include the frequencies.
+    """
+    try:
+        live = live_registry.ingest(station, sweep)
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"station": live.name, "sweeps": live.sweeps}
+
+@app.websocket("/api/live/{station}/ingest")
+async def ingest_live_sweeps(websocket: WebSocket, station: str):
+    """
+    Continuous sweep ingestion: one JSON sweep per message. Invalid sweeps
+    are answered with an error message; valid ones are not acknowledged.
+    """
+    if not verify_websocket_credentials(websocket.headers):
+        await websocket.close(code=1008)
+        return
+    
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                live_registry.ingest(station, LiveSweep.model_validate_json(message))
+            except (ValidationError, LookupError, ValueError) as e:
+                await websocket.send_json({"error": str(e)})
+    except WebSocketDisconnect:
+        pass
+
+@app.get("/api/live")
+def list_live_stations():
+    """
+    Stations currently streaming sweeps
+    """
+    return {"stations": live_registry.summary()}
+
+@app.get("/api/live/{station}")
+def get_live_station(
+    station: str,
+    points: int = Query(settings.LIVE_MAX_POINTS, ge=10, le=20000)
+):
+    """
+    Current max-hold, average, noise floor and last sweep of a live station
+    """
+    try:
+        return live_registry.get(station).update(points)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+@app.get("/api/live/{station}/waterfall")
+def get_live_waterfall(
+    station: str,
+    sweeps: Optional[int] = Query(None, ge=1),
+    max_channels: int = Query(1000, ge=10, le=20000)
+):
+    """
+    Recent sweeps from the station's ring buffer, max-hold decimated
+    """
+    try:
+        live = live_registry.get(station)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    times, levels = live.recent(sweeps)
+    reduced, _, cols = decimate_max(levels, len(times) or 1, max_channels)
+    return {
+        "station": live.name,
+        "times": [str(t) for t in times],
+        "frequencies": live.frequencies[cols].tolist(),
+        "levels": np.where(np.isnan(reduced), None, np.round(reduced, 1)).tolist()
+    }
+
+@app.get("/api/live/{station}/events")
+async def stream_live_events(station: str, request: Request):
+    """
+    Server-Sent Events stream of decimated updates of a live station
+    """
+    queue = live_registry.subscribe(station)
+    
+    async def events():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    update = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(update)}\n\n"
+        finally:
+            live_registry.unsubscribe(station, queue)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/api/live/{station}/ws")
+async def watch_live_station(websocket: WebSocket, station: str):
+    """
+    WebSocket stream of decimated updates of a live station
+    """
+    await websocket.accept()
+    queue = live_registry.subscribe(station)
+    try:
+        if station in live_registry.stations:
+            await websocket.send_json(live_registry.get(station).update(settings.LIVE_MAX_POINTS))
+        while True:
+            await websocket.send_json(await queue.get())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_registry.unsubscribe(station, queue)
+
+@app.delete("/api/live/{station}")
+def reset_live_station(
+    station: str,
+    auth: bool = Depends(verify_credentials)
+):
+    """
+    Drop the buffer and accumulators of a live station
+    """
+    try:
+        live_registry.reset(station)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"message": "Live station reset", "station": station}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8002)
@@ -73,9 +73,13 @@ class MapGenerator:
                         'lon': station_lon,
                         'frequency': channel.get('frequency', 0),
                         'service': station.get('service', 'N/A'),
-                        'callsign': station.get('callsign', 'N/A')
+                        'callsign': station.get('callsign', 'N/A'),
+                        'distance_km': station.get('distance_km')
                     })
         
+        # Nearest stations first so the 50-marker cap keeps the plausible ones
+        licensed_stations.sort(key=lambda s: s['distance_km'] if s['distance_km'] is not None else float('inf'))
+        
         for idx, station in enumerate(licensed_stations[:50]):
             folium.Marker(
                 location=[station['lat'], station['lon']],
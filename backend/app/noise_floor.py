@@ -0,0 +1,56 @@
+"""
+Frequency-dependent noise floor estimation.
+
+A single noise floor per band is too coarse for wide bands (band 8 spans
+478-806 MHz). The estimator here splits the sorted channels into blocks of
+a quarter window, takes a low percentile of each block in one vectorized
+call, smooths the block values with a rolling median over the window and
+interpolates back to every channel. Work is linear in the number of
+channels whatever the window size.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .config import settings
+
+BLOCKS_PER_WINDOW = 4
+MIN_BLOCK_CHANNELS = 8
+
+def rolling_noise_floor(frequencies, levels, window_mhz: Optional[float] = None,
+                        percentile: Optional[float] = None) -> np.ndarray:
+    """
+    Noise floor at every channel. `frequencies` must be sorted ascending.
+    """
+    window_mhz = window_mhz or settings.NOISE_FLOOR_WINDOW_MHZ
+    percentile = settings.NOISE_FLOOR_PERCENTILE if percentile is None else percentile
+
+    frequencies = np.asarray(frequencies, dtype=float)
+    levels = np.asarray(levels, dtype=float)
+    n = len(levels)
+    if n == 0:
+        return np.empty(0)
+
+    spacing = float(np.median(np.diff(frequencies))) if n > 1 else 0.0
+    if spacing > 0:
+        block = int(round(window_mhz / BLOCKS_PER_WINDOW / spacing))
+    else:
+        block = n
+    block = min(max(block, MIN_BLOCK_CHANNELS), n)
+
+    # Pad to whole blocks with NaN so one nanpercentile call covers them all
+    blocks = -(-n // block)
+    padded = np.full(blocks * block, np.nan)
+    padded[:n] = levels
+    grid = padded.reshape(blocks, block)
+    block_floor = np.nanpercentile(grid, percentile, axis=1)
+
+    padded_freqs = np.full(blocks * block, np.nan)
+    padded_freqs[:n] = frequencies
+    block_center = np.nanmedian(padded_freqs.reshape(blocks, block), axis=1)
+
+    smoothed = pd.Series(block_floor).rolling(BLOCKS_PER_WINDOW + 1, center=True, min_periods=1).median().to_numpy()
+    if blocks == 1:
+        return np.full(n, smoothed[0])
+    return np.interp(frequencies, block_center, smoothed)
@@ -1,53 +1,123 @@
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple
 from datetime import datetime
 import io
+import mmap
+import warnings
+import numpy as np
+
+from .compression import file_compression, open_decompressed
+
+class _ChainedReader(io.RawIOBase):
+    """Already consumed bytes followed by the rest of a stream"""
+    
+    def __init__(self, head: bytes, stream: BinaryIO):
+        self._head = head
+        self._stream = stream
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        if self._head:
+            n = min(len(buffer), len(self._head))
+            buffer[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._stream.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
 
 class CSVParser:
-    def __init__(self, file_content: bytes):
+    def __init__(self, file_content: bytes = b'', file_path: Optional[str] = None):
         self.file_content = file_content
+        self.file_path = file_path
         self.metadata = {}
         self.bands = []
         self.channels = pd.DataFrame()
+        self.sweeps = None
+    
+    @classmethod
+    def from_file(cls, file_path: str) -> 'CSVParser':
+        """
+        Parser reading a stored file through mmap instead of loading it;
+        compressed files are decompressed as a stream in the same pass
+        """
+        return cls(file_path=file_path)
         
     def parse(self) -> Dict:
         try:
-            content = self.file_content.decode('utf-8')
-            lines = content.split('\n')
-            
-            if not lines[0].strip().startswith('sep='):
-                raise ValueError("Invalid CSV format: missing separator declaration")
-            
-            separator = lines[0].strip().split('=')[1]
-            
-            metadata_start = 1
-            bands_start = None
-            channels_start = None
-            
-            for i, line in enumerate(lines):
-                if 'Band #' in line:
-                    bands_start = i
-                elif 'Channel No.' in line:
-                    channels_start = i
-                    break
-            
-            if bands_start is None or channels_start is None:
-                raise ValueError("Invalid CSV format: missing required sections")
-            
-            self._parse_metadata(lines[metadata_start:bands_start], separator)
-            self._parse_bands(lines[bands_start:channels_start], separator)
-            self._parse_channels(lines[channels_start:], separator)
+            if self.file_path and file_compression(self.file_path):
+                with open_decompressed(self.file_path) as stream:
+                    self._parse_stream(stream)
+            elif self.file_path:
+                with open(self.file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    self._parse_sections(view, f)
+            else:
+                self._parse_sections(self.file_content, io.BytesIO(self.file_content))
             
             return {
                 'metadata': self.metadata,
                 'bands': self.bands,
                 'channels': self.channels.to_dict('records'),
-                'channels_count': len(self.channels)
+                'channels_count': len(self.channels),
+                'sweeps': self.sweeps
             }
             
         except Exception as e:
             raise ValueError(f"Error parsing CSV: {str(e)}")
     
+    def _parse_sections(self, view, stream: BinaryIO):
+        """
+        Only the metadata and band sections before the channel header are
+        decoded; the channel rows are read by pandas straight from the stream.
+        """
+        first_line = bytes(view[:view.find(b'\n')]).decode('utf-8').strip()
+        if not first_line.startswith('sep='):
+            raise ValueError("Invalid CSV format: missing separator declaration")
+        
+        separator = first_line.split('=')[1]
+        
+        channel_header = view.find(b'Channel No.')
+        channels_start = view.rfind(b'\n', 0, channel_header) + 1 if channel_header >= 0 else -1
+        self._parse_preamble(bytes(view[:max(channels_start, 0)]).decode('utf-8'), separator, channels_start >= 0)
+        stream.seek(channels_start)
+        self._parse_channels(stream, separator)
+    
+    def _parse_stream(self, stream: BinaryIO):
+        """Sequential variant of _parse_sections for streams that cannot seek"""
+        first_line = stream.readline()
+        if not first_line.decode('utf-8').strip().startswith('sep='):
+            raise ValueError("Invalid CSV format: missing separator declaration")
+        
+        separator = first_line.decode('utf-8').strip().split('=')[1]
+        
+        preamble = [first_line]
+        for line in iter(stream.readline, b''):
+            if b'Channel No.' in line:
+                break
+            preamble.append(line)
+        else:
+            line = None
+        
+        self._parse_preamble(b''.join(preamble).decode('utf-8'), separator, line is not None)
+        self._parse_channels(io.BufferedReader(_ChainedReader(line, stream)), separator)
+    
+    def _parse_preamble(self, content: str, separator: str, has_channels: bool):
+        lines = content.split('\n')
+        
+        metadata_start = 1
+        bands_start = None
+        for i, line in enumerate(lines):
+            if 'Band #' in line:
+                bands_start = i
+        
+        if bands_start is None or not has_channels:
+            raise ValueError("Invalid CSV format: missing required sections")
+        
+        self._parse_metadata(lines[metadata_start:bands_start], separator)
+        self._parse_bands(lines[bands_start:], separator)
+    
     def _parse_metadata(self, lines: List[str], sep: str):
         header_line = lines[0].strip()
         data_line = lines[1].strip() if len(lines) > 1 else ""
@@ -114,15 +184,27 @@ class CSVParser:
                 except ValueError:
                     continue
     
-    def _parse_channels(self, lines: List[str], sep: str):
-        if len(lines) < 2:
+    def parse_channel_rows(self, header_line: str, rows: List[str], sep: str) -> pd.DataFrame:
+        """Channels of rows appended to a file whose channel header is known"""
+        self.channels = pd.DataFrame()
+        self._parse_channels(io.BytesIO('\n'.join([header_line] + rows).encode('utf-8')), sep)
+        return self.channels
+    
+    def _parse_channels(self, stream: BinaryIO, sep: str):
+        header_line = stream.readline()
+        first_row = stream.readline()
+        if not first_row.strip():
             return
+        header = [h.strip() for h in header_line.decode('utf-8').split(sep)]
+        stream = io.BufferedReader(_ChainedReader(header_line + first_row, stream))
         
-        csv_content = '\n'.join(lines)
+        if 'Time' in header and 'Field Strength (dBuV/m)' in header:
+            self._parse_sweeps(stream, sep)
+            return
         
         try:
             df = pd.read_csv(
-                io.StringIO(csv_content),
+                stream,
                 sep=sep,
                 engine='python'
             )
@@ -148,3 +230,64 @@ class CSVParser:
             
         except Exception as e:
             raise ValueError(f"Error parsing channels data: {str(e)}")
+    
+    def _parse_sweeps(self, stream: BinaryIO, sep: str):
+        """
+        Per-sweep export: one row per sweep and channel. The sweeps are kept
+        as a sweeps x channels matrix and reduced to the usual max/avg rows
+        per channel (avg is the linear mean of the field strength).
+        """
+        try:
+            df = pd.read_csv(stream, sep=sep, engine='c', skipinitialspace=True)
+            df.columns = df.columns.str.strip()
+            df = df.rename(columns={
+                'Time': 'time',
+                'Channel No.': 'channel_no',
+                'Frequency (MHz)': 'frequency',
+                'Field Strength (dBuV/m)': 'level'
+            })
+            df['frequency'] = pd.to_numeric(df['frequency'], errors='coerce')
+            df['level'] = pd.to_numeric(df['level'], errors='coerce')
+            df = df.dropna(subset=['frequency', 'time'])
+            if 'channel_no' not in df:
+                df['channel_no'] = df['frequency'].rank(method='dense').astype(np.int64)
+            
+            # Timestamps repeat once per channel: parse each distinct one once
+            time_codes, time_labels = pd.factorize(df['time'])
+            label_times = pd.to_datetime(pd.Series(time_labels), format='%m/%d/%Y %I:%M:%S %p', errors='coerce')
+            if label_times.isna().any():
+                label_times = pd.to_datetime(pd.Series(time_labels), format='mixed')
+            sweep_times, sweep_of_label = np.unique(label_times.to_numpy(), return_inverse=True)
+            sweep_idx = sweep_of_label[time_codes]
+            
+            channel_no, channel_idx = np.unique(df['channel_no'].to_numpy(dtype=np.int64), return_inverse=True)
+            frequencies = np.empty(len(channel_no))
+            frequencies[channel_idx] = df['frequency'].to_numpy()
+            levels = np.full((len(sweep_times), len(channel_no)), np.nan, dtype=np.float32)
+            levels[sweep_idx, channel_idx] = df['level'].to_numpy(dtype=np.float32)
+            
+            # Columns in frequency order for range reads
+            order = np.argsort(frequencies, kind='stable')
+            channel_no, frequencies, levels = channel_no[order], frequencies[order], levels[:, order]
+        except Exception as e:
+            raise ValueError(f"Error parsing sweep data: {str(e)}")
+        
+        with warnings.catch_warnings():
+            # Channels without any valid sweep stay NaN and are dropped below
+            warnings.simplefilter('ignore', RuntimeWarning)
+            max_level = np.nanmax(levels, axis=0).astype(np.float64)
+            avg_level = 20.0 * np.log10(np.nanmean(np.power(10.0, levels.astype(np.float64) / 20.0), axis=0))
+        
+        channels = pd.DataFrame({
+            'channel_no': channel_no,
+            'frequency': frequencies,
+            'max_field_strength': np.round(max_level, 2),
+            'avg_field_strength': np.round(avg_level, 2)
+        })
+        keep = channels['avg_field_strength'].notna().to_numpy()
+        self.channels = channels[keep].reset_index(drop=True)
+        self.sweeps = {
+            'times': sweep_times,
+            'frequencies': frequencies[keep],
+            'levels': levels[:, keep]
+        }
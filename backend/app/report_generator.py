@@ -247,9 +247,9 @@ class ReportGenerator:
         self.story.append(heading)
         
         # Calculate column widths
-        col_widths = [0.8*cm, 2.2*cm, 1.8*cm, 1.8*cm, 2*cm, self.page_width - 8.6*cm]
+        col_widths = [0.8*cm, 2.2*cm, 1.6*cm, 1.6*cm, 1.6*cm, 2*cm, self.page_width - 9.8*cm]
         
-        data = [['No.', 'Frekuensi', 'Avg (dB)', 'Max (dB)', 'Status', 'Stasiun / Client']]
+        data = [['No.', 'Frekuensi', 'Avg (dB)', 'Max (dB)', 'BW (kHz)', 'Status', 'Stasiun / Client']]
         
         for i, channel in enumerate(display_list, 1):
             station = channel.get('station')
@@ -267,6 +267,7 @@ class ReportGenerator:
                 f"{channel.get('frequency', 0):.3f}",
                 f"{channel.get('avg_field_strength', 0):.1f}",
                 f"{channel.get('max_field_strength', 0):.1f}",
+                f"{channel['bandwidth_khz']:.1f}" if channel.get('bandwidth_khz') else '-',
                 status,
                 station_name
             ])
@@ -276,8 +277,8 @@ class ReportGenerator:
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2c5282')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (0, -1), 'CENTER'),
-            ('ALIGN', (1, 0), (4, -1), 'CENTER'),
-            ('ALIGN', (5, 0), (5, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (5, -1), 'CENTER'),
+            ('ALIGN', (6, 0), (6, -1), 'LEFT'),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
             ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
             ('FONTSIZE', (0, 0), (-1, 0), 8),
@@ -0,0 +1,167 @@
+"""
+Normalized store for spectrum analysis results.
+
+Every analyze_band run is saved as a BandResult summary row plus one
+PeakResult row per detected peak, instead of overwriting a single JSON blob,
+so results can be aggregated across measurements with indexed SQL.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .database import Analysis, BandResult, PeakResult
+
+def store_band_result(db: Session, analysis: Analysis, results: Dict) -> BandResult:
+    """
+    Add the summary and peak rows for one analyze_band result.
+    Does not commit.
+    """
+    band = results.get('band_info') or {}
+    occupied_list = results.get('occupied_list', [])
+    auto_info = results.get('auto_threshold_info') or {}
+    measured_at = analysis.start_time or analysis.upload_time or datetime.utcnow()
+
+    band_result = BandResult(
+        analysis_id=analysis.id,
+        band_number=results['band_number'],
+        start_freq=band.get('start_freq'),
+        stop_freq=band.get('stop_freq'),
+        threshold=results.get('threshold_used'),
+        is_auto_threshold=bool(auto_info.get('is_auto', False)),
+        noise_floor=results.get('noise_floor'),
+        total_channels=results.get('total_channels', 0),
+        occupied_channels=results.get('occupied_channels', 0),
+        occupancy_percentage=results.get('occupancy_percentage', 0),
+        licensed_count=sum(1 for c in occupied_list if c.get('station')),
+        anomalies_count=len(results.get('anomalies', [])),
+        station_name=analysis.station_name,
+        measured_at=measured_at
+    )
+
+    for channel in occupied_list:
+        station = channel.get('station') or {}
+        band_result.peaks.append(PeakResult(
+            analysis_id=analysis.id,
+            band_number=results['band_number'],
+            channel_no=channel.get('channel_no'),
+            frequency=channel['frequency'],
+            avg_field_strength=channel.get('avg_field_strength'),
+            max_field_strength=channel.get('max_field_strength'),
+            center_frequency=channel.get('center_frequency'),
+            bandwidth_khz=channel.get('bandwidth_khz'),
+            licensed=bool(station),
+            callsign=station.get('callsign'),
+            matched_station=station.get('name'),
+            measured_at=measured_at
+        ))
+
+    db.add(band_result)
+    return band_result
+
+def band_result_history(db: Session, analysis_id: int, band_number: Optional[int] = None) -> List[Dict]:
+    """All stored runs of an analysis, newest first"""
+    query = db.query(BandResult).filter(BandResult.analysis_id == analysis_id)
+    if band_number is not None:
+        query = query.filter(BandResult.band_number == band_number)
+
+    return [{
+        'id': r.id,
+        'band_number': r.band_number,
+        'start_freq': r.start_freq,
+        'stop_freq': r.stop_freq,
+        'threshold': r.threshold,
+        'is_auto_threshold': r.is_auto_threshold,
+        'noise_floor': r.noise_floor,
+        'total_channels': r.total_channels,
+        'occupied_channels': r.occupied_channels,
+        'occupancy_percentage': r.occupancy_percentage,
+        'licensed_count': r.licensed_count,
+        'anomalies_count': r.anomalies_count,
+        'created_at': r.created_at
+    } for r in query.order_by(BandResult.created_at.desc(), BandResult.id.desc())]
+
+def occupancy_by_station(
+    db: Session,
+    band_number: int,
+    station: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> List[Dict]:
+    """
+    Occupancy and noise floor of one band aggregated per station, e.g. band 1
+    at every Lampung site over a quarter. `station` matches part of the name.
+    """
+    query = db.query(
+        BandResult.station_name,
+        func.count(BandResult.id),
+        func.count(func.distinct(BandResult.analysis_id)),
+        func.avg(BandResult.occupancy_percentage),
+        func.max(BandResult.occupancy_percentage),
+        func.avg(BandResult.noise_floor),
+        func.min(BandResult.measured_at),
+        func.max(BandResult.measured_at)
+    ).filter(BandResult.band_number == band_number)
+
+    if station:
+        query = query.filter(BandResult.station_name.ilike(f"%{station}%"))
+    if date_from:
+        query = query.filter(BandResult.measured_at >= date_from)
+    if date_to:
+        query = query.filter(BandResult.measured_at <= date_to)
+
+    rows = query.group_by(BandResult.station_name).order_by(BandResult.station_name).all()
+
+    return [{
+        'station_name': r[0],
+        'runs': r[1],
+        'measurements': r[2],
+        'avg_occupancy_percentage': round(r[3], 2) if r[3] is not None else None,
+        'max_occupancy_percentage': r[4],
+        'avg_noise_floor': round(r[5], 2) if r[5] is not None else None,
+        'first_measured_at': r[6],
+        'last_measured_at': r[7]
+    } for r in rows]
+
+def find_peaks(
+    db: Session,
+    freq_min: float,
+    freq_max: float,
+    min_level: Optional[float] = None,
+    licensed: Optional[bool] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    limit: int = 500
+) -> List[Dict]:
+    """Stored peaks within a frequency range, strongest first"""
+    query = db.query(PeakResult).filter(
+        PeakResult.frequency >= freq_min,
+        PeakResult.frequency <= freq_max
+    )
+
+    if min_level is not None:
+        query = query.filter(PeakResult.avg_field_strength >= min_level)
+    if licensed is not None:
+        query = query.filter(PeakResult.licensed == licensed)
+    if date_from:
+        query = query.filter(PeakResult.measured_at >= date_from)
+    if date_to:
+        query = query.filter(PeakResult.measured_at <= date_to)
+
+    peaks = query.order_by(PeakResult.avg_field_strength.desc()).limit(limit).all()
+
+    return [{
+        'analysis_id': p.analysis_id,
+        'band_number': p.band_number,
+        'channel_no': p.channel_no,
+        'frequency': p.frequency,
+        'avg_field_strength': p.avg_field_strength,
+        'max_field_strength': p.max_field_strength,
+        'center_frequency': p.center_frequency,
+        'bandwidth_khz': p.bandwidth_khz,
+        'licensed': p.licensed,
+        'callsign': p.callsign,
+        'matched_station': p.matched_station,
+        'measured_at': p.measured_at
+    } for p in peaks]
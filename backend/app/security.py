@@ -7,6 +7,7 @@ Security utilities for the RF Spectrum Analyzer API
 
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
+import base64
 import secrets
 from typing import Optional
 from functools import wraps
@@ -49,15 +50,42 @@ def verify_credentials(credentials: Optional[HTTPBasicCredentials] = Depends(sec
     
     return True
 
+def verify_websocket_credentials(headers) -> bool:
+    """
+    HTTP Basic Auth check for WebSocket handshakes, where the HTTPBasic
+    dependency is not available. Returns False instead of raising.
+    """
+    if not settings.ENABLE_AUTH:
+        return True
+    
+    scheme, _, encoded = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "basic":
+        return False
+    try:
+        username, _, password = base64.b64decode(encoded).decode("utf8").partition(":")
+    except (ValueError, UnicodeDecodeError):
+        return False
+    
+    correct_username = secrets.compare_digest(username.encode("utf8"), settings.AUTH_USERNAME.encode("utf8"))
+    correct_password = secrets.compare_digest(password.encode("utf8"), settings.AUTH_PASSWORD.encode("utf8"))
+    return correct_username and correct_password
+
 def validate_file_size(content: bytes, max_size_mb: int = None) -> bool:
     """
     Validate file size is within limits.
     """
-    max_size = (max_size_mb or settings.MAX_UPLOAD_SIZE_MB) * 1024 * 1024
-    if len(content) > max_size:
+    return check_upload_size(len(content), max_size_mb)
+
+def check_upload_size(size: int, max_size_mb: int = None) -> bool:
+    """
+    Validate a byte count against the upload limit, e.g. while a file is
+    still being received.
+    """
+    max_size_mb = max_size_mb or settings.MAX_UPLOAD_SIZE_MB
+    if size > max_size_mb * 1024 * 1024:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE_MB}MB"
+            detail=f"File size exceeds maximum allowed size of {max_size_mb}MB"
         )
     return True
 
@@ -0,0 +1,137 @@
+"""
+Spatial index and distance queries for licensed stations.
+
+On SQLite an R*Tree virtual table holds one point box per station with
+coordinates and is maintained by triggers alongside licensed_stations.
+Bounding-box lookups go through the R*Tree; radius queries take the box
+around the circle and rank the survivors with a vectorized haversine.
+"""
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .database import LicensedStation
+
+RTREE_TABLE = "licensed_stations_rtree"
+EARTH_RADIUS_KM = 6371.0088
+
+def _rtree_ddl() -> List[str]:
+    has_coords = "new.latitude IS NOT NULL AND new.longitude IS NOT NULL"
+
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} USING rtree(
+            id, min_lat, max_lat, min_lon, max_lon
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_ai AFTER INSERT ON licensed_stations
+        WHEN {has_coords} BEGIN
+            INSERT INTO {RTREE_TABLE} VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_ad AFTER DELETE ON licensed_stations BEGIN
+            DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {RTREE_TABLE}_au AFTER UPDATE OF latitude, longitude ON licensed_stations BEGIN
+            DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+            INSERT INTO {RTREE_TABLE}
+            SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE {has_coords};
+        END""",
+    ]
+
+def create_spatial_index(engine):
+    """
+    Create the R*Tree table and sync triggers (SQLite only).
+    An index created over an existing table is filled from its rows.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"),
+            {"name": RTREE_TABLE}
+        ).first()
+
+        for statement in _rtree_ddl():
+            conn.execute(text(statement))
+
+        if not exists:
+            conn.execute(text(
+                f"INSERT INTO {RTREE_TABLE} "
+                "SELECT id, latitude, latitude, longitude, longitude FROM licensed_stations "
+                "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            ))
+
+def haversine_km(lat: float, lon: float, lats, lons) -> np.ndarray:
+    """
+    Great-circle distance in km from one point to arrays of points.
+    """
+    lat1 = np.radians(lat)
+    lat2 = np.radians(np.asarray(lats, dtype=float))
+    dlat = lat2 - lat1
+    dlon = np.radians(np.asarray(lons, dtype=float) - lon)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of radius_km.
+    """
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    cos_lat = math.cos(math.radians(lat))
+    dlon = 180.0 if cos_lat < 1e-6 else min(180.0, dlat / cos_lat)
+
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+def stations_in_bbox(db: Session, min_lat: float, max_lat: float,
+                     min_lon: float, max_lon: float, query=None,
+                     limit: Optional[int] = None) -> List[LicensedStation]:
+    """
+    Licensed stations whose coordinates fall inside the box.
+    An existing LicensedStation query can be passed to add further filters.
+    """
+    query = query if query is not None else db.query(LicensedStation)
+
+    if db.get_bind().dialect.name == "sqlite":
+        ids = text(
+            f"SELECT id FROM {RTREE_TABLE} "
+            "WHERE min_lat >= :min_lat AND max_lat <= :max_lat "
+            "AND min_lon >= :min_lon AND max_lon <= :max_lon"
+        ).bindparams(min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon)
+        query = query.filter(LicensedStation.id.in_(ids.columns(LicensedStation.id)))
+    else:
+        query = query.filter(
+            LicensedStation.latitude.between(min_lat, max_lat),
+            LicensedStation.longitude.between(min_lon, max_lon)
+        )
+
+    if limit is not None:
+        query = query.order_by(LicensedStation.id).limit(limit)
+
+    return query.all()
+
+def stations_within_radius(db: Session, lat: float, lon: float, radius_km: float,
+                           limit: Optional[int] = None, query=None) -> List[Tuple[LicensedStation, float]]:
+    """
+    Licensed stations within radius_km of (lat, lon), nearest first,
+    as (station, distance_km) pairs.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    candidates = stations_in_bbox(db, min_lat, max_lat, min_lon, max_lon, query=query)
+
+    if not candidates:
+        return []
+
+    lats = np.fromiter((s.latitude for s in candidates), dtype=float, count=len(candidates))
+    lons = np.fromiter((s.longitude for s in candidates), dtype=float, count=len(candidates))
+    distances = haversine_km(lat, lon, lats, lons)
+
+    inside = np.flatnonzero(distances <= radius_km)
+    order = inside[np.argsort(distances[inside], kind="stable")]
+    if limit is not None:
+        order = order[:limit]
+
+    return [(candidates[i], float(distances[i])) for i in order]
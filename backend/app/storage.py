@@ -0,0 +1,166 @@
+"""
+Access to stored measurement files in UPLOAD_DIR.
+"""
+import hashlib
+import os
+import uuid
+from typing import BinaryIO, Dict, Tuple
+
+import pandas as pd
+from fastapi import HTTPException, Request
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from .compression import open_decompressed
+from .config import settings
+from .parser import CSVParser
+from .security import check_upload_size
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Slack for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD = 64 * 1024
+
+class UploadSpool:
+    """
+    Temporary file in UPLOAD_DIR filled chunk by chunk. The size limit is
+    checked and the SHA-256 updated with every chunk, so memory stays at one
+    chunk whatever the size of the upload.
+    """
+
+    def __init__(self):
+        self.path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4()}.part")
+        self.size = 0
+        self._digest = hashlib.sha256()
+        self._file = open(self.path, 'wb')
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        check_upload_size(self.size)
+        self._digest.update(chunk)
+        self._file.write(chunk)
+
+    def close(self):
+        self._file.close()
+
+    def keep(self, file_path: str) -> str:
+        """Move the complete upload to its stored name"""
+        self.close()
+        os.replace(self.path, file_path)
+        self.path = file_path
+        return file_path
+
+    def discard(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def spool_file(source: BinaryIO) -> UploadSpool:
+    """Copy a file object (e.g. a ZIP member) into a spool"""
+    spool = UploadSpool()
+    try:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            spool.write(chunk)
+        spool.close()
+    except BaseException:
+        spool.discard()
+        raise
+    return spool
+
+def _allowed_files_detail(suffixes: Tuple[str, ...]) -> str:
+    return f"Only {', '.join(s.lstrip('.').upper() for s in suffixes)} files are allowed"
+
+async def spool_upload(request: Request, field: str = 'file',
+                       allowed_suffixes: Tuple[str, ...] = ('.csv',)) -> Tuple[str, UploadSpool]:
+    """
+    Stream the file part `field` of a multipart request into a spool while
+    it is received, instead of buffering the request first. Oversized
+    uploads are rejected from Content-Length, or as soon as the limit is
+    crossed. Returns the client filename and the closed spool.
+    """
+    content_type, params = parse_options_header(request.headers.get('content-type', ''))
+    boundary = params.get(b'boundary')
+    if content_type != b'multipart/form-data' or not boundary:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload")
+    declared = request.headers.get('content-length', '')
+    if declared.isdigit():
+        check_upload_size(max(0, int(declared) - MULTIPART_OVERHEAD))
+
+    state: Dict = {'headers': {}, 'header_field': b'', 'header_value': b'', 'target': False, 'filename': None, 'spool': None}
+
+    def on_part_begin():
+        state['headers'] = {}
+
+    def on_header_field(data: bytes, start: int, end: int):
+        state['header_field'] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        state['header_value'] += data[start:end]
+
+    def on_header_end():
+        state['headers'][state['header_field'].lower()] = state['header_value']
+        state['header_field'] = state['header_value'] = b''
+
+    def on_headers_finished():
+        _, options = parse_options_header(state['headers'].get(b'content-disposition', b''))
+        filename = options.get(b'filename')
+        state['target'] = (options.get(b'name') == field.encode() and filename is not None
+                           and state['spool'] is None)
+        if state['target']:
+            state['filename'] = os.path.basename(filename.decode('utf-8', 'replace'))
+            if not state['filename'].lower().endswith(allowed_suffixes):
+                raise HTTPException(status_code=400, detail=_allowed_files_detail(allowed_suffixes))
+            state['spool'] = UploadSpool()
+
+    def on_part_data(data: bytes, start: int, end: int):
+        if state['target']:
+            state['spool'].write(data[start:end])
+
+    def on_part_end():
+        state['target'] = False
+
+    parser = MultipartParser(boundary, {
+        'on_part_begin': on_part_begin,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': on_part_data,
+        'on_part_end': on_part_end,
+    })
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+    except BaseException:
+        if state['spool'] is not None:
+            state['spool'].discard()
+        raise
+
+    if state['spool'] is None:
+        raise HTTPException(status_code=400, detail=f"No file uploaded in field '{field}'")
+    state['spool'].close()
+    return state['filename'], state['spool']
+
+def read_measurement_bytes(file_path: str) -> bytes:
+    """Raw content of a stored measurement file, decompressed if stored compressed"""
+    with open_decompressed(file_path) as f:
+        return f.read()
+
+def load_measurement(file_path: str) -> Tuple[Dict, pd.DataFrame]:
+    """
+    Parse a stored measurement file.
+    Returns the parser result and the channels as a DataFrame.
+    """
+    if not file_path or not os.path.exists(file_path):
+        raise FileNotFoundError(file_path)
+
+    parsed_data = CSVParser.from_file(file_path).parse()
+    channels_df = pd.DataFrame(parsed_data['channels'])
+    return parsed_data, channels_df
@@ -0,0 +1,219 @@
+"""
+Time x frequency store for multi-sweep measurements (waterfalls).
+
+Levels are quantized (uint8 in WATERFALL_QUANT_STEP_DB steps, or float16)
+and cut into tiles of WATERFALL_TILE_SWEEPS x WATERFALL_TILE_CHANNELS that
+are zlib-compressed independently. A file is laid out as
+
+    magic | header length | JSON header | times | frequencies | tile offsets | tiles
+
+and read through mmap, so a query decompresses only the tiles it touches and
+never holds a whole session in memory.
+"""
+import json
+import mmap
+import struct
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from .config import settings
+
+MAGIC = b'RFWFALL1'
+NAN_CODE = 255
+
+def quantize(levels: np.ndarray, dtype: str, step: float, offset: float) -> np.ndarray:
+    """dBµV/m levels to stored codes; NaN becomes NAN_CODE for uint8"""
+    levels = np.asarray(levels, dtype=np.float32)
+    if dtype == 'float16':
+        return levels.astype(np.float16)
+    if dtype != 'uint8':
+        raise ValueError(f"Unsupported waterfall dtype: {dtype}")
+    codes = np.clip(np.rint((levels - offset) / step), 0, NAN_CODE - 1)
+    codes[np.isnan(levels)] = NAN_CODE
+    return codes.astype(np.uint8)
+
+def dequantize(codes: np.ndarray, dtype: str, step: float, offset: float) -> np.ndarray:
+    if dtype == 'float16':
+        return codes.astype(np.float32)
+    levels = codes.astype(np.float32) * step + offset
+    levels[codes == NAN_CODE] = np.nan
+    return levels
+
+def write_waterfall(
+    path: str,
+    times,
+    frequencies,
+    levels: np.ndarray,
+    dtype: Optional[str] = None,
+    tile_sweeps: Optional[int] = None,
+    tile_channels: Optional[int] = None
+) -> int:
+    """
+    Write a sweeps x channels level matrix. `frequencies` must be sorted and
+    `times` ascending. Returns the file size in bytes.
+    """
+    dtype = dtype or settings.WATERFALL_DTYPE
+    tile_sweeps = tile_sweeps or settings.WATERFALL_TILE_SWEEPS
+    tile_channels = tile_channels or settings.WATERFALL_TILE_CHANNELS
+    times = np.asarray(times, dtype='datetime64[ns]').astype(np.int64)
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    n_sweeps, n_channels = levels.shape
+    if len(times) != n_sweeps or len(frequencies) != n_channels:
+        raise ValueError("Waterfall axes do not match the level matrix")
+
+    header = json.dumps({
+        'sweeps': n_sweeps,
+        'channels': n_channels,
+        'tile_sweeps': tile_sweeps,
+        'tile_channels': tile_channels,
+        'dtype': dtype,
+        'step': settings.WATERFALL_QUANT_STEP_DB,
+        'offset': settings.WATERFALL_QUANT_OFFSET_DB,
+    }).encode()
+    row_tiles = -(-n_sweeps // tile_sweeps)
+    col_tiles = -(-n_channels // tile_channels)
+    tile_offsets = np.zeros(row_tiles * col_tiles + 1, dtype=np.int64)
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(header)) + header)
+        f.write(times.tobytes())
+        f.write(frequencies.tobytes())
+        table_position = f.tell()
+        f.write(tile_offsets.tobytes())
+
+        position = f.tell()
+        tile = 0
+        for row in range(row_tiles):
+            # One row of tiles is quantized at a time
+            block = quantize(levels[row * tile_sweeps:(row + 1) * tile_sweeps], dtype,
+                             settings.WATERFALL_QUANT_STEP_DB, settings.WATERFALL_QUANT_OFFSET_DB)
+            for col in range(col_tiles):
+                tile_offsets[tile] = position
+                data = zlib.compress(
+                    np.ascontiguousarray(block[:, col * tile_channels:(col + 1) * tile_channels]).tobytes(),
+                    settings.WATERFALL_COMPRESSION_LEVEL
+                )
+                f.write(data)
+                position += len(data)
+                tile += 1
+        tile_offsets[tile] = position
+
+        f.seek(table_position)
+        f.write(tile_offsets.tobytes())
+    return int(position)
+
+class WaterfallStore:
+    """Read access to a waterfall file through mmap"""
+
+    def __init__(self, path: str):
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty waterfall file: {path}")
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Not a waterfall file: {path}")
+
+        header_len, = struct.unpack_from('<Q', self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start:start + header_len])
+        self.sweeps = header['sweeps']
+        self.channels = header['channels']
+        self.tile_sweeps = header['tile_sweeps']
+        self.tile_channels = header['tile_channels']
+        self.dtype = header['dtype']
+        self.step = header['step']
+        self.offset = header['offset']
+        self._col_tiles = -(-self.channels // self.tile_channels)
+
+        position = start + header_len
+        self._times = np.frombuffer(self._map, np.int64, self.sweeps, position)
+        position += 8 * self.sweeps
+        self.frequencies = np.frombuffer(self._map, np.float64, self.channels, position).copy()
+        position += 8 * self.channels
+        n_tiles = -(-self.sweeps // self.tile_sweeps) * self._col_tiles
+        self._tile_offsets = np.frombuffer(self._map, np.int64, n_tiles + 1, position)
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times.astype('datetime64[ns]')
+
+    def close(self):
+        # Views into the map must be dropped before it can be closed
+        self._times = self._tile_offsets = None
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> 'WaterfallStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _tile(self, row: int, col: int) -> np.ndarray:
+        index = row * self._col_tiles + col
+        data = zlib.decompress(self._map[self._tile_offsets[index]:self._tile_offsets[index + 1]])
+        width = min(self.tile_channels, self.channels - col * self.tile_channels)
+        codes = np.frombuffer(data, np.uint8 if self.dtype == 'uint8' else np.float16)
+        return codes.reshape(-1, width)
+
+    def sweep_range(self, time_from: Optional[datetime] = None, time_to: Optional[datetime] = None) -> Tuple[int, int]:
+        lo = 0 if time_from is None else int(np.searchsorted(self._times, np.datetime64(time_from, 'ns').astype(np.int64)))
+        hi = self.sweeps if time_to is None else int(
+            np.searchsorted(self._times, np.datetime64(time_to, 'ns').astype(np.int64), side='right'))
+        return lo, hi
+
+    def channel_range(self, start_freq: Optional[float] = None, stop_freq: Optional[float] = None) -> Tuple[int, int]:
+        lo = 0 if start_freq is None else int(np.searchsorted(self.frequencies, start_freq - 1e-9))
+        hi = self.channels if stop_freq is None else int(np.searchsorted(self.frequencies, stop_freq + 1e-9, side='right'))
+        return lo, hi
+
+    def read(self, start_freq: Optional[float] = None, stop_freq: Optional[float] = None,
+             time_from: Optional[datetime] = None, time_to: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Levels (float32, NaN where missing) of the sweeps and channels in range.
+        Returns (times, frequencies, levels).
+        """
+        s_lo, s_hi = self.sweep_range(time_from, time_to)
+        c_lo, c_hi = self.channel_range(start_freq, stop_freq)
+        levels = np.empty((max(s_hi - s_lo, 0), max(c_hi - c_lo, 0)), dtype=np.float32)
+        for rows, block in self.iter_blocks(c_lo, c_hi, s_lo, s_hi):
+            levels[rows.start - s_lo:rows.stop - s_lo] = block
+        return self.times[s_lo:s_hi], self.frequencies[c_lo:c_hi].copy(), levels
+
+    def iter_blocks(self, c_lo: int = 0, c_hi: Optional[int] = None, s_lo: int = 0,
+                    s_hi: Optional[int] = None) -> Iterator[Tuple[slice, np.ndarray]]:
+        """
+        Dequantized levels of channels [c_lo, c_hi) one tile row of sweeps at a
+        time, as (sweep slice, block). Memory stays at one tile row.
+        """
+        c_hi = self.channels if c_hi is None else c_hi
+        s_hi = self.sweeps if s_hi is None else s_hi
+        if c_hi <= c_lo or s_hi <= s_lo:
+            return
+        cols = range(c_lo // self.tile_channels, (c_hi - 1) // self.tile_channels + 1)
+        for row in range(s_lo // self.tile_sweeps, (s_hi - 1) // self.tile_sweeps + 1):
+            row_start = row * self.tile_sweeps
+            codes = np.hstack([self._tile(row, col) for col in cols])
+            first_channel = cols.start * self.tile_channels
+            r_lo, r_hi = max(s_lo, row_start) - row_start, min(s_hi, row_start + len(codes)) - row_start
+            block = codes[r_lo:r_hi, c_lo - first_channel:c_hi - first_channel]
+            yield slice(row_start + r_lo, row_start + r_hi), dequantize(block, self.dtype, self.step, self.offset)
+
+def decimate_max(levels: np.ndarray, max_rows: int, max_cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Max-hold downsampling of a waterfall for display so narrow carriers
+    survive. Returns the levels and the first row / column index of each group.
+    """
+    rows = np.arange(0, levels.shape[0], max(1, -(-levels.shape[0] // max_rows)))
+    cols = np.arange(0, levels.shape[1], max(1, -(-levels.shape[1] // max_cols)))
+    if levels.size == 0:
+        return levels, rows, cols
+    with np.errstate(invalid='ignore'):
+        reduced = np.fmax.reduceat(np.fmax.reduceat(levels, rows, axis=0), cols, axis=1)
+    return reduced, rows, cols
@@ -0,0 +1,131 @@
+"""
+Concurrency benchmark for the SQLite storage profile.
+
+Runs reader threads that query the analyses table while a writer thread
+keeps committing upload-sized transactions, once with SQLite defaults
+(rollback journal, synchronous=FULL) and once with the configured profile
+from app.database. Reports reader latency percentiles, stalled reads and
+writer throughput for both.
+
+Usage:
+    python bench_db_concurrency.py [--seconds 10] [--readers 4] [--rows 200]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, Analysis, create_db_engine
+
+STALL_MS = 100.0
+
+def _legacy_engine(url: str):
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+def _run(engine, seconds: float, readers: int, rows_per_commit: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    stop = threading.Event()
+    latencies = []
+    read_errors = []
+    commits = []
+    lock = threading.Lock()
+
+    def writer():
+        payload = [{'band_number': i, 'start_freq': 87.0, 'stop_freq': 108.0, 'bandwidth': 50.0} for i in range(8)]
+        while not stop.is_set():
+            session = Session()
+            try:
+                started = time.perf_counter()
+                for i in range(rows_per_commit):
+                    session.add(Analysis(
+                        task_id='bench',
+                        filename=f'bench_{i}.csv',
+                        station_name='Bench',
+                        upload_time=datetime.utcnow(),
+                        bands=payload,
+                        analysis_metadata={'Task ID': 'bench'}
+                    ))
+                session.commit()
+                commits.append(time.perf_counter() - started)
+            except Exception:
+                session.rollback()
+            finally:
+                session.close()
+
+    def reader():
+        while not stop.is_set():
+            session = Session()
+            try:
+                started = time.perf_counter()
+                session.execute(text(
+                    "SELECT id, task_id, filename, upload_time FROM analyses "
+                    "ORDER BY upload_time DESC LIMIT 50"
+                )).fetchall()
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    latencies.append(elapsed)
+            except Exception as e:
+                with lock:
+                    read_errors.append(str(e))
+            finally:
+                session.close()
+
+    threads = [threading.Thread(target=writer)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    latencies.sort()
+
+    def pct(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        'reads': len(latencies),
+        'read_errors': len(read_errors),
+        'read_p50_ms': round(pct(0.50), 2),
+        'read_p99_ms': round(pct(0.99), 2),
+        'read_max_ms': round(latencies[-1], 2) if latencies else 0.0,
+        'stalled_reads': sum(1 for l in latencies if l > STALL_MS),
+        'commits': len(commits),
+        'commit_avg_ms': round(statistics.mean(commits) * 1000, 2) if commits else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=200, help='rows inserted per writer commit')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='rf_bench_')
+    try:
+        results = {}
+        for name, factory in (('default', _legacy_engine), ('profile', create_db_engine)):
+            url = f"sqlite:///{os.path.join(workdir, name + '.db')}"
+            results[name] = _run(factory(url), args.seconds, args.readers, args.rows)
+
+        keys = list(results['default'].keys())
+        print(f"{'metric':<16}{'default':>12}{'profile':>12}")
+        for key in keys:
+            print(f"{key:<16}{results['default'][key]:>12}{results['profile'][key]:>12}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Load test: latency of a light endpoint while large files are uploaded.
+
+Uploads FILE.csv from several concurrent clients and meanwhile probes a
+light endpoint at a fixed rate. With parsing off the event loop the probe
+latency should stay close to its idle value.
+
+Run from the backend directory against a running server:
+    python load_test_upload.py FILE.csv [--url http://localhost:8002] [--uploads 8]
+                               [--concurrency 4] [--probe /api/live] [--probe-interval 0.05]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import httpx
+import numpy as np
+
+async def probe(client: httpx.AsyncClient, path: str, interval: float, stop: asyncio.Event) -> list:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def upload(client: httpx.AsyncClient, file_path: str, queue: asyncio.Queue, timings: list):
+    name = os.path.basename(file_path)
+    while not queue.empty():
+        queue.get_nowait()
+        started = time.perf_counter()
+        with open(file_path, 'rb') as f:
+            response = await client.post("/api/upload", files={'file': (name, f, 'text/csv')})
+        response.raise_for_status()
+        timings.append(time.perf_counter() - started)
+
+def summary(label: str, seconds: list) -> str:
+    if not seconds:
+        return f"{label}: no samples"
+    ms = np.array(seconds) * 1000
+    return (f"{label}: n={len(ms)} p50={np.percentile(ms, 50):.0f} ms p95={np.percentile(ms, 95):.0f} ms "
+            f"max={ms.max():.0f} ms")
+
+async def run(args):
+    auth = (args.user, args.password) if args.user else None
+    limits = httpx.Limits(max_connections=args.concurrency + 2)
+    async with httpx.AsyncClient(base_url=args.url, auth=auth, timeout=300.0, limits=limits) as client:
+        stop = asyncio.Event()
+        idle_task = asyncio.create_task(probe(client, args.probe, args.probe_interval, stop))
+        await asyncio.sleep(2.0)
+        stop.set()
+        idle = await idle_task
+
+        queue = asyncio.Queue()
+        for i in range(args.uploads):
+            queue.put_nowait(i)
+        stop = asyncio.Event()
+        timings = []
+        probe_task = asyncio.create_task(probe(client, args.probe, args.probe_interval, stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(upload(client, args.file, queue, timings) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        loaded = await probe_task
+
+    size_mb = os.path.getsize(args.file) / 1024 / 1024
+    print(f"{args.uploads} uploads of {size_mb:.1f} MB in {elapsed:.1f} s ({args.concurrency} concurrent)")
+    print(summary("upload", timings))
+    print(summary(f"GET {args.probe} idle", idle))
+    print(summary(f"GET {args.probe} during uploads", loaded))
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe API latency during concurrent uploads")
+    parser.add_argument("file")
+    parser.add_argument("--url", default="http://localhost:8002")
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--probe", default="/api/live")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    parser.add_argument("--user")
+    parser.add_argument("--password")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
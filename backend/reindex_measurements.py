@@ -0,0 +1,51 @@
+"""
+Build the derived indexes for analyses uploaded before they existed.
+
+Run from the backend directory: python reindex_measurements.py [--all]
+"""
+import sys
+
+from app.database import (
+    SessionLocal, Analysis, FrequencyPosting, MeasurementBandSummary, SpectrumFingerprint, ComplianceSummary,
+    init_db
+)
+from app.ingest import ingest_measurement
+from app.storage import load_measurement
+
+def main():
+    init_db()
+    db = SessionLocal()
+    reindex_all = '--all' in sys.argv
+
+    try:
+        query = db.query(Analysis)
+        if not reindex_all:
+            indexed = db.query(FrequencyPosting.analysis_id).distinct()
+            summarized = db.query(MeasurementBandSummary.analysis_id).distinct()
+            fingerprinted = db.query(SpectrumFingerprint.analysis_id).distinct()
+            checked = db.query(ComplianceSummary.analysis_id).distinct()
+            query = query.filter(
+                ~Analysis.id.in_(indexed) | ~Analysis.id.in_(summarized) |
+                ~Analysis.id.in_(fingerprinted) | ~Analysis.id.in_(checked)
+            )
+
+        analyses = query.order_by(Analysis.id).all()
+        print(f"Reindexing {len(analyses)} analyses...")
+
+        for analysis in analyses:
+            try:
+                parsed_data, channels_df = load_measurement(analysis.file_path)
+            except (FileNotFoundError, ValueError) as e:
+                print(f"  #{analysis.id}: skipped ({e})")
+                continue
+
+            ingest_measurement(db, analysis, parsed_data, channels_df)
+            db.commit()
+            print(f"  #{analysis.id}: {len(channels_df)} channels")
+
+        print("Done.")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
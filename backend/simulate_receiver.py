@@ -0,0 +1,94 @@
+"""
+Simulate a monitoring receiver streaming sweeps to the live endpoints.
+
+The channel list and typical levels come from a measurement CSV; every sweep
+adds noise and switches the emissions above the average on and off.
+
+Run from the backend directory:
+    python simulate_receiver.py FILE.csv [--url http://localhost:8002] [--station NAME]
+                                [--interval 1.0] [--sweeps N] [--ws]
+
+--ws streams over the WebSocket ingest endpoint (needs the `websockets`
+package, installed with uvicorn[standard]); the default posts each sweep.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import time
+from datetime import datetime
+
+import httpx
+import numpy as np
+
+from app.parser import CSVParser
+
+def sweep_generator(file_path: str, seed: int = 0):
+    with open(file_path, 'rb') as f:
+        parsed = CSVParser(f.read()).parse()
+    channels = sorted(parsed['channels'], key=lambda c: c['frequency'])
+    frequencies = [c['frequency'] for c in channels]
+    avg = np.array([c['avg_field_strength'] for c in channels], dtype=float)
+    peak = np.array([c.get('max_field_strength', c['avg_field_strength']) for c in channels], dtype=float)
+    rng = np.random.default_rng(seed)
+
+    first = True
+    while True:
+        on = rng.random(len(avg)) < 0.5
+        levels = np.where(on, peak, np.minimum(avg, peak) - 3.0) + rng.normal(0.0, 1.0, len(avg))
+        sweep = {'levels': np.round(levels, 1).tolist(), 'time': datetime.now().isoformat()}
+        if first:
+            sweep['frequencies'] = frequencies
+            first = False
+        yield sweep
+
+def post_sweeps(args, sweeps):
+    auth = (args.user, args.password) if args.user else None
+    with httpx.Client(base_url=args.url, auth=auth, timeout=30.0) as client:
+        for count, sweep in enumerate(sweeps, start=1):
+            started = time.monotonic()
+            response = client.post(f"/api/live/{args.station}/sweeps", json=sweep)
+            response.raise_for_status()
+            print(f"sweep {count}: {(time.monotonic() - started) * 1000:.0f} ms")
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+
+async def stream_sweeps(args, sweeps):
+    import websockets
+
+    url = args.url.replace('http', 'ws', 1) + f"/api/live/{args.station}/ingest"
+    headers = {}
+    if args.user:
+        token = base64.b64encode(f"{args.user}:{args.password}".encode()).decode()
+        headers['Authorization'] = f"Basic {token}"
+    async with websockets.connect(url, additional_headers=headers, max_size=None) as websocket:
+        for count, sweep in enumerate(sweeps, start=1):
+            await websocket.send(json.dumps(sweep))
+            print(f"sweep {count} sent")
+            await asyncio.sleep(args.interval)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('file')
+    parser.add_argument('--url', default='http://localhost:8002')
+    parser.add_argument('--station', default='simulator')
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--sweeps', type=int, default=0, help='stop after N sweeps (0: run until interrupted)')
+    parser.add_argument('--user')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--ws', action='store_true')
+    args = parser.parse_args()
+
+    sweeps = sweep_generator(args.file)
+    if args.sweeps:
+        sweeps = (sweep for _, sweep in zip(range(args.sweeps), sweeps))
+
+    try:
+        if args.ws:
+            asyncio.run(stream_sweeps(args, sweeps))
+        else:
+            post_sweeps(args, sweeps)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
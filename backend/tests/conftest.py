@@ -0,0 +1,12 @@
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, create_db_engine
+
+@pytest.fixture
+def db():
+    """Session on a fresh in-memory database with every table created"""
+    engine = create_db_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
@@ -0,0 +1,68 @@
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, Analysis, create_db_engine, get_db
+from app.main import app
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+
+    db = Session()
+    # Three uploads share a timestamp, so paging has to break ties by id
+    for i, (station, upload_time) in enumerate([
+        ('Bandar Lampung', datetime(2025, 12, 14, 9, 0)),
+        ('Bandar Lampung', datetime(2025, 12, 15, 8, 0)),
+        ('Metro', datetime(2025, 12, 15, 8, 0)),
+        ('Metro', datetime(2025, 12, 15, 8, 0)),
+        ('Bandar Lampung', datetime(2025, 12, 15, 17, 30)),
+    ], 1):
+        db.add(Analysis(task_id=str(1920 + i), filename=f"{i}.csv", station_name=station,
+                        upload_time=upload_time, bands_count=1))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        session = Session()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+def test_keyset_pages_break_ties_and_round_trip_cursor(client):
+    ids, cursor, pages = [], None, 0
+    while True:
+        params = {'limit': 2, **({'cursor': cursor} if cursor else {})}
+        response = client.get('/api/analyses', params=params)
+        assert response.status_code == 200
+        ids += [a['id'] for a in response.json()]
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor is None:
+            break
+
+    assert ids == [5, 4, 3, 2, 1]
+    assert pages == 3
+
+def test_invalid_cursor_is_rejected(client):
+    for cursor in ('garbage', 'not-a-date_3', '2025-12-15T08:00:00_x'):
+        assert client.get('/api/analyses', params={'cursor': cursor}).status_code == 400
+
+def test_filters(client):
+    def ids(**params):
+        return [a['id'] for a in client.get('/api/analyses', params=params).json()]
+
+    assert ids(station='Metro') == [4, 3]
+    assert ids(task_id='1922') == [2]
+    assert ids(date_from='2025-12-15') == [5, 4, 3, 2]
+    # A bare date_to includes the whole day, a datetime is an exact bound
+    assert ids(date_to='2025-12-15') == [5, 4, 3, 2, 1]
+    assert ids(date_to='2025-12-15T08:00:00') == [4, 3, 2, 1]
+    assert ids(station='Bandar Lampung', date_from='2025-12-15', date_to='2025-12-15') == [5, 2]
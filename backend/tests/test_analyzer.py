@@ -1,6 +1,7 @@
 import pytest
 import pandas as pd
 from app.analyzer import SpectrumAnalyzer
+from app.license_parser import parse_emission_bandwidth_khz
 
 def test_occupancy_calculation():
     channels_data = {
@@ -91,3 +92,61 @@ def test_top_signals():
     
     assert len(results['top_signals']) == 20
     assert results['top_signals'][0]['avg_field_strength'] == 54
+
+def test_station_ranking_prefers_nearby_matching_service():
+    channels_df = pd.DataFrame({
+        'channel_no': [1, 2, 3],
+        'frequency': [98.2, 98.3, 98.4],
+        'avg_field_strength': [30, 70, 30],
+        'max_field_strength': [35, 75, 35]
+    })
+    bands = [{'band_number': 1, 'start_freq': 87.0, 'stop_freq': 108.0, 'bandwidth': 50.0}]
+    metadata = {'Task ID': '1924', 'Location (lat)': -5.357882, 'Location (lon)': 105.216545}
+    
+    analyzer = SpectrumAnalyzer(channels_df, bands, metadata)
+    analyzer.licensed_stations = [
+        {'name': 'Jakarta FM', 'frequency': 98.3, 'service': 'Broadcast', 'latitude': -6.2, 'longitude': 106.8},
+        {'name': 'Lampung Link', 'frequency': 98.31, 'service': 'Fixed', 'latitude': -5.36, 'longitude': 105.22},
+        {'name': 'Lampung FM', 'frequency': 98.32, 'service': 'Broadcast', 'latitude': -5.40, 'longitude': 105.25},
+        {'name': 'Off Frequency', 'frequency': 99.0, 'service': 'Broadcast', 'latitude': -5.36, 'longitude': 105.22},
+    ]
+    analyzer._build_station_arrays()
+    
+    ranked = analyzer.rank_stations(98.3)
+    
+    assert [s['name'] for s in ranked] == ['Lampung FM', 'Lampung Link', 'Jakarta FM']
+    assert ranked[0]['freq_offset_khz'] == 20.0
+    assert ranked[0]['distance_km'] < 10
+    assert analyzer._match_station(98.3)['name'] == 'Lampung FM'
+
+def test_station_matching_uses_emission_bandwidth_and_pair():
+    channels_df = pd.DataFrame({
+        'channel_no': [1, 2, 3],
+        'frequency': [760.0, 765.0, 770.0],
+        'avg_field_strength': [30, 70, 30],
+        'max_field_strength': [35, 75, 35]
+    })
+    bands = [{'band_number': 1, 'start_freq': 700.0, 'stop_freq': 800.0, 'bandwidth': 50.0}]
+    
+    analyzer = SpectrumAnalyzer(channels_df, bands, {'Task ID': '1924'})
+    analyzer.licensed_stations = [
+        {'name': 'LTE Site', 'frequency': 713.0, 'freq_pair': 768.0, 'emis_class_1': '10M0W7D'},
+        {'name': 'Narrow Link', 'frequency': 765.15, 'emis_class_1': '16K0F3E'},
+    ]
+    analyzer._build_station_arrays()
+    
+    ranked = analyzer.rank_stations(765.0, bandwidth_khz=50.0)
+    
+    assert [s['name'] for s in ranked] == ['LTE Site']
+    assert ranked[0]['matched_frequency'] == 768.0
+    assert ranked[0]['bandwidth_khz'] == 10000.0
+
+@pytest.mark.parametrize('emission_class,expected', [
+    ('16K0F3E', 16.0),
+    ('200KF3E', 200.0),
+    ('G3E', None),
+    ('F3E', None),
+    ('H3E', None),
+])
+def test_parse_emission_bandwidth(emission_class, expected):
+    assert parse_emission_bandwidth_khz(emission_class) == expected
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+from app.anomaly_detection import detect_anomalies
+
+BAND = {'band_number': 1, 'start_freq': 87.0, 'stop_freq': 108.0, 'bandwidth': 50.0}
+
+def _band(levels, max_levels=None):
+    freqs = np.round(87.0 + np.arange(len(levels)) * 0.05, 3)
+    levels = np.asarray(levels, dtype=float)
+    return pd.DataFrame({
+        'channel_no': np.arange(1, len(levels) + 1),
+        'frequency': freqs,
+        'avg_field_strength': levels,
+        'max_field_strength': levels if max_levels is None else np.asarray(max_levels, dtype=float),
+    })
+
+def _types(anomalies):
+    return {(a['type'], a['frequency']) for a in anomalies}
+
+def test_detectors_flag_each_pattern_once():
+    levels = np.full(420, 20.0)
+    levels[100] = 75.0          # strong carrier, 55 dB above the floor
+    levels[104] = 35.0          # spurious 4 channels away
+    levels[300] = 85.0          # high power
+    maxima = levels.copy()
+    maxima[200] = 45.0          # bursty: max 25 dB above avg
+    levels[1] = 40.0            # energy at the lower band edge
+    maxima[1] = 40.0
+    
+    anomalies = detect_anomalies(_band(levels, maxima), BAND)
+    
+    assert _types(anomalies) == {
+        ('above_floor', 92.0),
+        ('spurious', 92.2),
+        ('high_power', 102.0),
+        ('bursty', 97.0),
+        ('band_edge', 87.05),
+    }
+    assert len(anomalies) == 5
+
+def test_detector_subset_and_params():
+    levels = np.full(100, 20.0)
+    levels[50] = 85.0
+    
+    assert _types(detect_anomalies(_band(levels), BAND, detectors=['above_floor'])) == {('above_floor', 89.5)}
+    assert detect_anomalies(_band(levels), BAND, params={'high_power_level': 90.0, 'floor_margin_db': 70.0}) == []
+    assert detect_anomalies(_band([]), BAND) == []
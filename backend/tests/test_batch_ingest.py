@@ -0,0 +1,98 @@
+import asyncio
+import io
+import os
+import zipfile
+import pytest
+from app.database import Analysis
+from app.config import settings
+from app import batch_ingest
+from app.batch_ingest import iter_measurement_files, parse_file, parse_files, store_batch
+from app.storage import spool_file
+
+CSV = b"""sep=^
+Task ID^Start Time^Stop Time^Station Name
+1924^12/15/2025 7:30:00 AM^12/15/2025 8:00:01 AM^Bandar Lampung
+
+Band #^Start Frequency (MHz)^Stop Frequency (MHz)^Bandwidth (kHz)
+1^87.000000^108.000000^50.00000
+
+Channel No.^Frequency (MHz)^Maximum Field Strength (dBuV/m)^Average Field Strength (dBuV/m)
+1^87.000000^44^36
+2^87.050000^47^43
+3^87.100000^47^44
+"""
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'UPLOAD_DIR', str(tmp_path))
+    return tmp_path
+
+def test_zip_members_are_spooled_with_errors():
+    archive = _zip({'2025/a.csv': CSV, '2025/notes.txt': b'x', '__MACOSX/2025/._a.csv': b'x', 'b.csv': CSV})
+    entries = list(iter_measurement_files('archive.zip', archive))
+
+    assert [name for name, _, _ in entries] == ['archive.zip/2025/a.csv', 'archive.zip/b.csv']
+    assert all(open(spool.path, 'rb').read() == CSV and error is None for _, spool, error in entries)
+
+    assert list(iter_measurement_files('report.pdf', io.BytesIO(b'x')))[0][2] is not None
+    assert list(iter_measurement_files('broken.zip', io.BytesIO(b'x')))[0][2] == "Invalid ZIP archive"
+
+def test_store_batch_reports_every_file(db, upload_dir):
+    results = [
+        dict(parse_file(name, spool_file(io.BytesIO(content)).path, str(upload_dir)), content_sha256=None)
+        for name, content in (('a.csv', CSV), ('bad.csv', b'not a measurement'), ('b.csv', CSV))
+    ]
+    statuses = store_batch(db, results)
+
+    assert [s['status'] for s in statuses] == ['stored', 'failed', 'stored']
+    assert statuses[0]['channels_count'] == 3
+    assert 'separator' in statuses[1]['error']
+    assert db.query(Analysis).count() == 2
+    assert os.path.exists(db.get(Analysis, statuses[2]['id']).file_path)
+
+def test_parse_files_reports_worker_errors(upload_dir, monkeypatch):
+    async def run_in_parse_pool(func, name, spool_path, upload_dir):
+        if name == 'locked.csv':
+            raise OSError("disk full")
+        return func(name, spool_path, upload_dir)
+    monkeypatch.setattr(batch_ingest, 'run_in_parse_pool', run_in_parse_pool)
+
+    entries = [(name, spool_file(io.BytesIO(CSV)), None) for name in ('a.csv', 'locked.csv', 'b.csv')]
+    results = asyncio.run(parse_files(iter(entries)))
+
+    assert [r['filename'] for r in results] == ['a.csv', 'locked.csv', 'b.csv']
+    assert results[1]['error'] == "Parse failed: disk full"
+    assert 'error' not in results[0] and 'error' not in results[2]
+    # The spool of the failed file is removed
+    assert not any(name.endswith('.part') for name in os.listdir(upload_dir))
+
+def test_store_batch_rolls_back_a_failing_file_only(db, upload_dir, monkeypatch):
+    store_analysis = batch_ingest.store_analysis
+
+    def failing_store(db, parsed_data, filename, *args):
+        analysis = store_analysis(db, parsed_data, filename, *args)
+        if filename == 'bad.csv':
+            # After the rows are flushed, so the savepoint has to undo them
+            raise KeyError('start_freq')
+        return analysis
+    monkeypatch.setattr(batch_ingest, 'store_analysis', failing_store)
+
+    results = [
+        dict(parse_file(name, spool_file(io.BytesIO(CSV)).path, str(upload_dir)), content_sha256=None)
+        for name in ('a.csv', 'bad.csv', 'b.csv')
+    ]
+    statuses = store_batch(db, results)
+
+    assert [s['status'] for s in statuses] == ['stored', 'failed', 'stored']
+    assert 'start_freq' in statuses[1]['error']
+    assert db.query(Analysis).count() == 2
+    assert not os.path.exists(results[1]['file_path'])
+    assert os.path.exists(results[2]['file_path'])
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+import pandas as pd
+from app.analyzer import SpectrumAnalyzer
+from app.change_detection import match_peaks, classify_changes
+
+def _peaks(freqs, levels):
+    return {'frequency': np.array(freqs, dtype=float), 'level': np.array(levels, dtype=float)}
+
+def test_match_peaks_is_mutual_nearest_within_tolerance():
+    baseline, new = match_peaks([90.0, 98.3, 101.1], [90.0, 98.31, 98.35, 105.0], 0.05)
+    
+    assert list(zip(baseline, new)) == [(0, 0), (1, 1)]
+
+def test_classify_ranks_new_emissions_first():
+    baseline = _peaks([90.0, 98.3, 101.1, 104.0], [60.0, 70.0, 55.0, 50.0])
+    new = _peaks([90.0, 98.3, 101.15, 106.5], [60.0, 80.0, 55.0, 75.0])
+    
+    events = classify_changes(baseline, new, match_tolerance_khz=100, shift_tolerance_khz=10,
+                              level_change_db=6, threshold=30.0)
+    by_type = {e['type']: e for e in events}
+    
+    assert events[0]['type'] == 'new'
+    assert by_type['new']['frequency'] == 106.5
+    assert by_type['disappeared']['baseline_frequency'] == 104.0
+    assert by_type['shifted']['offset_khz'] == 50.0
+    assert by_type['level_increase']['level_delta_db'] == 10.0
+    assert [e['rank'] for e in events] == [1, 2, 3, 4]
+
+def test_analyzer_detects_new_transmitter():
+    freqs = np.round(np.arange(87.0, 108.0, 0.05), 3)
+    baseline = np.full(len(freqs), 20.0)
+    baseline[np.abs(freqs - 98.3) < 0.01] = 70.0
+    current = baseline.copy()
+    current[np.abs(freqs - 102.5) < 0.01] = 65.0
+    
+    channels = pd.DataFrame({'channel_no': range(len(freqs)), 'frequency': freqs,
+                             'avg_field_strength': current, 'max_field_strength': current})
+    baseline_df = channels.assign(avg_field_strength=baseline, max_field_strength=baseline)
+    bands = [{'band_number': 1, 'start_freq': 87.0, 'stop_freq': 108.0, 'bandwidth': 50.0}]
+    
+    analyzer = SpectrumAnalyzer(channels, bands, {})
+    result = analyzer.detect_changes(baseline_df, 1)
+    
+    assert result['event_counts'] == {'new': 1}
+    assert result['events'][0]['frequency'] == 102.5
+    assert result['changed_channels'] == 1
+    
+    for band_number in (0, 2):
+        with pytest.raises(ValueError):
+            analyzer.detect_changes(baseline_df, band_number)
@@ -0,0 +1,32 @@
+import numpy as np
+import pandas as pd
+from app.comparison import align_spectra, compare_spectra, to_json_list
+
+def _frame(freqs, levels):
+    return pd.DataFrame({'frequency': freqs, 'avg_field_strength': levels})
+
+def test_alignment_tolerates_float_noise_and_gaps():
+    base = _frame([100.0, 100.025, 100.05, 100.075], [20.0, 30.0, 40.0, 50.0])
+    noisy = _frame([100.0000001, 100.0249999, 100.0500002, 100.0749998], [21.0, 31.0, 41.0, 51.0])
+    partial = _frame([100.0, 100.025], [25.0, 35.0])
+    
+    grid, values = align_spectra([base, noisy, partial], 100.0, 100.1)
+    
+    assert len(grid) == 4
+    np.testing.assert_allclose(values[1], [21.0, 31.0, 41.0, 51.0], atol=1e-3)
+    assert np.isnan(values[2, 3])
+    assert not np.isnan(values[2, :2]).any()
+
+def test_compare_reports_deltas_and_top_changes():
+    base = _frame([100.0, 100.025, 100.05], [20.0, 20.0, 20.0])
+    day2 = _frame([100.0, 100.025, 100.05], [20.0, 32.0, 20.0])
+    day3 = _frame([100.0, 100.025, 100.05], [18.0, 26.0, 20.0])
+    
+    result = compare_spectra([base, day2, day3], 100.0, 100.05, change_threshold_db=6.0)
+    
+    assert result['per_measurement'][1]['max_increase_db'] == 12.0
+    assert result['per_measurement'][1]['max_increase_frequency'] == 100.025
+    assert result['per_measurement'][2]['changed_channels'] == 1
+    assert result['top_changes'][0]['frequency'] == 100.025
+    assert result['top_changes'][0]['range_db'] == 12.0
+    assert to_json_list(np.array([1.234, np.nan])) == [1.23, None]
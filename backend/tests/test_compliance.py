@@ -0,0 +1,60 @@
+import pandas as pd
+from datetime import datetime
+from app.database import Analysis
+from app.compliance import BandPlan, check_compliance, store_compliance, stored_compliance, find_violations
+
+PLAN = BandPlan([
+    {'start_freq': 87.5, 'stop_freq': 108.0, 'service': 'FM', 'allocation': 'Broadcasting',
+     'limit_level': 60.0, 'max_limit_level': 70.0},
+    # Stricter overlapping sub-range
+    {'start_freq': 88.0, 'stop_freq': 88.2, 'service': 'Guard', 'allocation': 'Guard band',
+     'limit_level': 30.0},
+], version='test')
+
+BANDS = [{'start_freq': 87.0, 'stop_freq': 89.0}]
+
+def _channels():
+    freqs = [round(87.0 + i * 0.1, 1) for i in range(21)]
+    levels = [20.0] * 21
+    maxima = [25.0] * 21
+    levels[7] = levels[8] = 65.0     # 87.7-87.8 over the FM limit
+    levels[10] = 40.0                # 88.0 only over the guard limit
+    maxima[15] = 75.0                # 88.5 over the FM max limit only
+    return pd.DataFrame({'frequency': freqs, 'avg_field_strength': levels, 'max_field_strength': maxima})
+
+def test_check_merges_runs_and_uses_strictest_limit():
+    result = check_compliance(_channels(), BANDS, PLAN)
+    band = result['bands'][0]
+
+    assert band['checked_channels'] == 21
+    assert band['unallocated_channels'] == 5
+    assert band['violating_channels'] == 4
+
+    by_start = {v['start_freq']: v for v in band['violations']}
+    assert by_start[87.7]['stop_freq'] == 87.8
+    assert by_start[87.7]['channels'] == 2
+    assert by_start[87.7]['excess_db'] == 5.0
+    assert by_start[88.0]['service'] == 'Guard'
+    assert by_start[88.0]['excess_db'] == 10.0
+    assert by_start[88.5]['level_type'] == 'max'
+    assert band['worst_excess_db'] == 10.0
+    assert result['summary']['violations'] == 3
+
+def test_store_and_query_violations(db):
+    analysis = Analysis(task_id='1', station_name='Bandar Lampung', start_time=datetime(2025, 12, 15, 9, 0))
+    db.add(analysis)
+    db.flush()
+
+    store_compliance(db, analysis, check_compliance(_channels(), BANDS, PLAN))
+    # Storing again replaces the previous result
+    store_compliance(db, analysis, check_compliance(_channels(), BANDS, PLAN))
+    db.flush()
+
+    stored = stored_compliance(db, analysis.id)
+    assert stored['plan_version'] == 'test'
+    assert stored['summary']['violations'] == 3
+
+    guard = find_violations(db, service='Guard')
+    assert len(guard) == 1
+    assert guard[0]['station_name'] == 'Bandar Lampung'
+    assert len(find_violations(db, min_excess_db=6.0)) == 1
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import inspect, text
+from app.config import settings
+from app.database import Base, _migrate_sqlite_schema, create_db_engine
+
+def test_sqlite_profile_applied_on_connect(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    
+    with engine.connect() as conn:
+        journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+        synchronous = conn.execute(text("PRAGMA synchronous")).scalar()
+        busy_timeout = conn.execute(text("PRAGMA busy_timeout")).scalar()
+        cache_size = conn.execute(text("PRAGMA cache_size")).scalar()
+    
+    engine.dispose()
+    
+    assert journal_mode.upper() == settings.SQLITE_JOURNAL_MODE.upper()
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == settings.SQLITE_BUSY_TIMEOUT_MS
+    assert cache_size == -settings.SQLITE_CACHE_SIZE_KB
+
+def test_sqlite_profile_rejects_invalid_mode(monkeypatch):
+    monkeypatch.setattr(settings, 'SQLITE_SYNCHRONOUS', 'FAST; DROP TABLE analyses')
+    
+    with pytest.raises(ValueError, match="SQLITE_SYNCHRONOUS"):
+        create_db_engine("sqlite:///:memory:")
+
+def test_migration_adds_columns_and_backfills_old_schema(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        # analyses as created before bands_count and the later columns
+        conn.execute(text(
+            "CREATE TABLE analyses (id INTEGER PRIMARY KEY, task_id VARCHAR, filename VARCHAR, "
+            "file_path VARCHAR, upload_time DATETIME, location_lat FLOAT, location_lon FLOAT, "
+            "start_time DATETIME, stop_time DATETIME, station_name VARCHAR, operator_id VARCHAR, "
+            "analysis_metadata JSON, bands JSON, occupancy_results JSON, report_path VARCHAR)"
+        ))
+        conn.execute(text(
+            "INSERT INTO analyses (id, task_id, bands) VALUES "
+            "(1, '1924', '[{\"band_number\": 1}, {\"band_number\": 2}]'), (2, '1925', NULL)"
+        ))
+    
+    Base.metadata.create_all(bind=engine)
+    _migrate_sqlite_schema(engine)
+    
+    columns = {c['name'] for c in inspect(engine).get_columns('analyses')}
+    indexes = {i['name'] for i in inspect(engine).get_indexes('analyses')}
+    with engine.connect() as conn:
+        counts = conn.execute(text("SELECT id, bands_count FROM analyses ORDER BY id")).all()
+    engine.dispose()
+    
+    assert {'bands_count', 'waterfall_path', 'sweeps_count', 'content_sha256'} <= columns
+    assert 'ix_analyses_list' in indexes
+    assert counts == [(1, 2), (2, 0)]
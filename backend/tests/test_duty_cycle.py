@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from app.waterfall_store import WaterfallStore, write_waterfall
+from app.duty_cycle import compute_duty_cycle, busy_hour
+
+@pytest.fixture
+def store(tmp_path):
+    # 8 sweeps a minute apart over 20 channels; channel 3 is on every other sweep
+    levels = np.full((8, 20), 10.0, dtype=np.float32)
+    levels[::2, 3] = 60.0
+    levels[:, 10] = 70.0
+    levels[5, 12] = np.nan
+    times = np.datetime64('2025-12-15T07:30:00') + np.arange(8) * np.timedelta64(60, 's')
+    path = str(tmp_path / 'sweeps.wf')
+    write_waterfall(path, times, 100.0 + np.arange(20) * 0.1, levels, tile_sweeps=3, tile_channels=7)
+    with WaterfallStore(path) as opened:
+        yield opened
+
+def test_duty_cycle_per_channel_and_heatmap(store):
+    duty = compute_duty_cycle(store, None, None, 30.0, time_bins=4, freq_bins=5, histograms=True)
+    
+    assert duty['sweeps'] == 8
+    assert duty['duty_cycle'][3] == 50.0
+    assert duty['duty_cycle'][10] == 100.0
+    assert duty['duty_cycle'][0] == 0.0
+    assert duty['duty_cycle_histogram'].sum() == 20
+    
+    heatmap = duty['heatmap']['occupancy']
+    assert heatmap.shape == (4, 5)
+    # Channels 0-3 in the first frequency bin, channel 3 on in 1 of 2 sweeps per bucket
+    assert heatmap[0, 0] == pytest.approx(12.5)
+    
+    counts = duty['level_histograms']['counts']
+    assert counts[12].sum() == 7
+    assert counts[10][(70 + 20) // 2] == 8
+
+def test_threshold_per_channel(store):
+    threshold = np.full(20, 30.0)
+    threshold[10] = 80.0
+    duty = compute_duty_cycle(store, 100.5, 101.5, threshold[5:16])
+    assert duty['channels'] == 11
+    assert duty['duty_cycle'][5] == 0.0
+
+def test_busy_hour_picks_loudest_full_hour():
+    times = np.datetime64('2025-12-15T00:00') + np.arange(180) * np.timedelta64(1, 'm')
+    occupancy = np.full(180, 0.1)
+    occupancy[90:150] = 0.8
+    busy = busy_hour(times, occupancy)
+    assert busy['start'] == '2025-12-15T01:30:00'
+    assert busy['occupancy_percentage'] == 80.0
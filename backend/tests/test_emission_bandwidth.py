@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from app.analyzer import SpectrumAnalyzer
+from app.emission_bandwidth import measure_emissions
+
+def _spectrum():
+    freqs = np.round(np.arange(100.0, 101.0, 0.01), 3)
+    levels = np.full(len(freqs), 10.0)
+    levels[40:51] = 60.0        # 110 kHz wide emission centred on 100.45 MHz
+    levels[45] = 70.0
+    levels[80] = 50.0           # single-channel carrier
+    return freqs, levels
+
+def test_bandwidth_centre_and_integrated_level():
+    freqs, levels = _spectrum()
+    result = measure_emissions(freqs, levels, [45, 80], noise_floor=10.0, x_db=26.0, power_fraction=0.99)
+    
+    assert result['bandwidth_xdb_khz'].tolist() == [110.0, 10.0]
+    assert result['bandwidth_99_khz'].tolist() == [110.0, 10.0]
+    assert abs(result['center_frequency'][0] - 100.45) < 1e-6
+    assert result['center_frequency'][1] == 100.8
+    expected = 10 * np.log10((10 ** 6.0) * 10 + 10 ** 7.0 + 5 * 10 ** 1.0 * 2)
+    assert abs(result['integrated_level'][0] - expected) < 0.5
+    assert measure_emissions(freqs, levels, [])['bandwidth_99_khz'].size == 0
+
+def test_analyze_band_reports_emission_bandwidth():
+    freqs, levels = _spectrum()
+    channels = pd.DataFrame({'channel_no': range(len(freqs)), 'frequency': freqs,
+                             'avg_field_strength': levels, 'max_field_strength': levels})
+    bands = [{'band_number': 1, 'start_freq': 100.0, 'stop_freq': 101.0, 'bandwidth': 10.0}]
+    
+    results = SpectrumAnalyzer(channels, bands, {}).analyze_band(1, threshold=30.0)
+    by_freq = {round(c['frequency'], 2): c for c in results['occupied_list']}
+    
+    assert by_freq[100.45]['bandwidth_khz'] == 110.0
+    assert by_freq[100.8]['bandwidth_khz'] == 10.0
+    assert abs(by_freq[100.45]['center_frequency'] - 100.45) < 1e-6
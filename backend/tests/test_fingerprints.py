@@ -0,0 +1,52 @@
+import pytest
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from app.database import Analysis
+from app.fingerprints import compute_fingerprint, fingerprint_measurement, similar_measurements, biggest_changes
+
+BANDS = [{'start_freq': 87.0, 'stop_freq': 108.0}]
+
+def _channels(carriers, offset=0.0):
+    freqs = np.round(np.arange(87.0, 108.0, 0.05), 3)
+    levels = np.full(len(freqs), 20.0 + offset)
+    for carrier in carriers:
+        levels[np.abs(freqs - carrier) < 0.2] = 70.0 + offset
+    return pd.DataFrame({'frequency': freqs, 'avg_field_strength': levels})
+
+def test_fingerprint_resamples_and_fills_gaps():
+    vector = compute_fingerprint(np.array([0.5, 3.5]), np.array([10.0, 40.0]), 0.0, 4.0, bins=4)
+    
+    assert vector.dtype == np.float32
+    assert vector.tolist() == [10.0, 20.0, 30.0, 40.0]
+    assert compute_fingerprint(np.array([]), np.array([]), 0.0, 4.0) is None
+
+def test_similar_and_changes(db):
+    spectra = {
+        'a': ('Bandar Lampung', datetime(2025, 12, 1), [90.0, 98.3]),
+        'b': ('Bandar Lampung', datetime(2025, 12, 2), [90.0, 98.3]),
+        'c': ('Bandar Lampung', datetime(2025, 12, 3), [101.1, 105.0]),
+        'd': ('Metro', datetime(2025, 12, 1), [90.0, 98.3]),
+    }
+    ids = {}
+    for key, (station, when, carriers) in spectra.items():
+        analysis = Analysis(task_id=key, station_name=station, start_time=when)
+        db.add(analysis)
+        db.flush()
+        fingerprint_measurement(db, analysis, _channels(carriers, offset=5.0 if key == 'd' else 0.0), BANDS)
+        ids[key] = analysis.id
+    db.commit()
+    
+    similar = similar_measurements(db, ids['a'], 1, limit=2)
+    assert {s['analysis_id'] for s in similar} == {ids['b'], ids['d']}
+    assert similar[0]['similarity'] == pytest.approx(1.0)
+    assert all(s['analysis_id'] == ids['b'] for s in similar_measurements(db, ids['a'], 1, same_station=True)[:1])
+    
+    changes = biggest_changes(db, band_number=1)
+    assert len(changes) == 2
+    assert changes[0]['previous_analysis_id'] == ids['b']
+    assert changes[0]['analysis_id'] == ids['c']
+    assert changes[1]['rms_change_db'] == 0
+    
+    with pytest.raises(LookupError):
+        similar_measurements(db, ids['a'], 2)
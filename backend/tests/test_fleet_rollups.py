@@ -0,0 +1,78 @@
+import pandas as pd
+from datetime import datetime
+from app.analyzer import SpectrumAnalyzer
+from app.database import Analysis, OccupancyRollup
+from app.fleet_rollups import summarize_bands, rollup_measurement, remove_measurement_rollups, occupancy_series
+
+BANDS = [
+    {'start_freq': 87.0, 'stop_freq': 88.0},
+    {'start_freq': 200.0, 'stop_freq': 201.0},
+]
+
+def _channels(peaks):
+    freqs = [87.0 + i * 0.1 for i in range(10)]
+    levels = [20.0] * 10
+    for index in peaks:
+        levels[index] = 60.0
+    return pd.DataFrame({
+        'channel_no': range(1, 11),
+        'frequency': freqs,
+        'avg_field_strength': levels,
+        'max_field_strength': [l + 5 for l in levels],
+    })
+
+def test_summary_counts_occupancy_and_peaks():
+    summaries = summarize_bands(_channels([2, 7]), BANDS, margin_db=10.0)
+    
+    # Bands without channels are skipped
+    assert len(summaries) == 1
+    band = summaries[0]
+    assert band['noise_floor'] == 20.0
+    assert band['occupied_channels'] == 2
+    assert band['occupancy_percentage'] == 20.0
+    assert band['peak_count'] == 2
+    assert band['max_level'] == 65.0
+
+def test_summary_matches_analyzer():
+    # Adjacent and close peaks are counted as the analyzer counts them
+    channels = _channels([2, 3, 5, 7])
+    band = summarize_bands(channels, BANDS, margin_db=10.0)[0]
+    
+    analyzer = SpectrumAnalyzer(channels, BANDS, {})
+    results = analyzer.analyze_band(1, use_auto_threshold=True, margin_db=10.0)
+    
+    for key in ('total_channels', 'occupied_channels', 'occupancy_percentage', 'noise_floor'):
+        assert band[key] == results[key]
+    assert band['threshold'] == results['threshold_used']
+    assert band['peak_count'] == results['occupied_channels']
+
+def test_rollups_add_and_subtract(db):
+    morning = Analysis(task_id='1', station_name='Bandar Lampung', start_time=datetime(2025, 12, 15, 9, 10))
+    later = Analysis(task_id='2', station_name='Bandar Lampung', start_time=datetime(2025, 12, 15, 9, 40))
+    other_day = Analysis(task_id='3', station_name='Bandar Lampung', start_time=datetime(2025, 12, 16, 9, 0))
+    db.add_all([morning, later, other_day])
+    db.flush()
+    
+    rollup_measurement(db, morning, _channels([2]), BANDS)
+    rollup_measurement(db, later, _channels([2, 5, 8]), BANDS)
+    rollup_measurement(db, other_day, _channels([]), BANDS)
+    db.flush()
+    
+    hourly = occupancy_series(db, 1, 'hour')[0]['points']
+    assert [p['measurements'] for p in hourly] == [2, 1]
+    assert hourly[0]['avg_occupancy_percentage'] == 20.0
+    assert hourly[0]['max_peak_count'] == 3
+    
+    remove_measurement_rollups(db, later.id)
+    db.flush()
+    
+    daily = occupancy_series(db, 1, 'day')[0]['points']
+    assert daily[0]['measurements'] == 1
+    assert daily[0]['max_occupancy_percentage'] == 10.0
+    assert daily[0]['max_peak_count'] == 1
+    
+    # Re-ingesting an analysis replaces its contribution
+    rollup_measurement(db, morning, _channels([2]), BANDS)
+    db.flush()
+    assert db.query(OccupancyRollup).count() == 4
+    assert occupancy_series(db, 1, 'day', combine=True)[0]['points'][0]['measurements'] == 1
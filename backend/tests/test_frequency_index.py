@@ -0,0 +1,56 @@
+import pytest
+import pandas as pd
+from app.database import Analysis, FrequencyPosting
+from app.frequency_index import build_postings, index_measurement, find_candidates, search_frequency, merge_postings
+
+def _channels(levels):
+    freqs = sorted(levels)
+    return pd.DataFrame({
+        'channel_no': range(1, len(freqs) + 1),
+        'frequency': freqs,
+        'avg_field_strength': [levels[f] for f in freqs],
+        'max_field_strength': [levels[f] + 5 for f in freqs],
+    })
+
+def test_postings_keep_bin_maxima():
+    postings = build_postings(1, _channels({98.3: 70.0, 98.35: 40.0, 98.41: 55.0, 101.1: 30.0}))
+    by_bin = {p['bin_id']: p for p in postings}
+    
+    assert sorted(by_bin) == [983, 984, 1011]
+    assert by_bin[983]['max_level'] == 750
+    assert by_bin[983]['avg_level'] == 700
+    assert by_bin[984]['avg_level'] == 550
+
+def test_search_prunes_by_level_and_bin(db):
+    loud = Analysis(task_id='1', station_name='Bandar Lampung')
+    quiet = Analysis(task_id='2', station_name='Metro Lampung')
+    db.add_all([loud, quiet])
+    db.flush()
+    
+    index_measurement(db, loud.id, _channels({98.3: 70.0, 101.1: 30.0}))
+    index_measurement(db, quiet.id, _channels({98.3: 35.0, 101.1: 75.0}))
+    db.commit()
+    
+    assert set(find_candidates(db, 98.275, 98.325, 60.0)) == {loud.id}
+    assert set(find_candidates(db, 101.075, 101.125, 60.0, level='avg')) == {quiet.id}
+    
+    # No stored files: candidates are returned unverified
+    matches = search_frequency(db, 98.3, min_level=60.0)
+    assert [m['analysis_id'] for m in matches] == [loud.id]
+    assert matches[0]['verified'] is False
+    
+    with pytest.raises(ValueError):
+        search_frequency(db, 98.3, level='median')
+
+def test_reindex_replaces_and_merge_keeps_maxima(db):
+    analysis = Analysis(task_id='1')
+    db.add(analysis)
+    db.flush()
+    
+    index_measurement(db, analysis.id, _channels({98.3: 70.0}))
+    index_measurement(db, analysis.id, _channels({98.3: 50.0}))
+    merge_postings(db, analysis.id, _channels({98.31: 45.0, 99.0: 60.0}))
+    db.flush()
+    
+    postings = {p.bin_id: p.avg_level for p in db.query(FrequencyPosting)}
+    assert postings == {983: 500, 990: 600}
@@ -0,0 +1,105 @@
+import os
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.database import Base, Analysis, FrequencyPosting, MeasurementBandSummary, WatchedFile, create_db_engine
+from app.ingest_watcher import IngestWatcher
+
+HEADER = b"""sep=^
+Task ID^Start Time^Stop Time^Station Name^Location (lat)^Location (lon)
+1924^12/15/2025 7:30:00 AM^12/15/2025 8:00:01 AM^Bandar Lampung^-5.357882^105.216545
+
+Band #^Start Frequency (MHz)^Stop Frequency (MHz)^Bandwidth (kHz)
+1^87.000000^108.000000^50.00000
+
+Channel No.^Frequency (MHz)^Maximum Field Strength (dBuV/m)^Average Field Strength (dBuV/m)
+"""
+
+def _rows(first, count, level=20):
+    return b''.join(
+        f"{first + i}^{87.0 + (first + i) * 0.05:.6f}^{level + 5}^{level}\n".encode() for i in range(count)
+    )
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+@pytest.fixture
+def dirs(tmp_path):
+    watch, uploads = tmp_path / 'watch', tmp_path / 'uploads'
+    watch.mkdir()
+    uploads.mkdir()
+    return watch, uploads
+
+def test_tails_growing_file(session_factory, dirs):
+    watch, uploads = dirs
+    watcher = IngestWatcher(str(watch), session_factory, str(uploads))
+    path = watch / 'task.csv'
+
+    # Header only, then a partial line: nothing to ingest yet
+    path.write_bytes(HEADER)
+    assert watcher.poll() == []
+    path.write_bytes(HEADER + _rows(0, 10) + b'10^87.5')
+    events = watcher.poll()
+    assert events[0]['status'] == 'created'
+    assert events[0]['channels'] == 10
+
+    with open(path, 'ab') as f:
+        f.write(b'00000^60^55\n' + _rows(11, 9, level=60))
+    events = watcher.poll()
+    assert events[0]['status'] == 'appended'
+    assert events[0]['channels'] == 10
+    assert events[0]['total_channels'] == 20
+    # Unchanged files are not read again
+    assert watcher.poll() == []
+
+    db = session_factory()
+    record = db.query(WatchedFile).one()
+    assert record.offset == path.stat().st_size
+    analysis = db.get(Analysis, record.analysis_id)
+    assert analysis.station_name == 'Bandar Lampung'
+    assert db.query(FrequencyPosting).filter(FrequencyPosting.analysis_id == analysis.id).count() > 0
+    summary = db.query(MeasurementBandSummary).filter(MeasurementBandSummary.analysis_id == analysis.id).one()
+    assert summary.total_channels == 20
+    with open(record.stored_path, 'rb') as f:
+        assert f.read() == path.read_bytes()
+    db.close()
+
+def test_resumes_after_restart_and_restarts_truncated_file(session_factory, dirs):
+    watch, uploads = dirs
+    path = watch / 'task.csv'
+    path.write_bytes(HEADER + _rows(0, 5))
+    IngestWatcher(str(watch), session_factory, str(uploads)).poll()
+
+    # A new watcher rebuilds the accumulated channels from the stored copy
+    with open(path, 'ab') as f:
+        f.write(_rows(5, 5))
+    watcher = IngestWatcher(str(watch), session_factory, str(uploads))
+    assert watcher.poll()[0]['total_channels'] == 10
+
+    path.write_bytes(HEADER + _rows(0, 3))
+    events = watcher.poll()
+    assert events[0]['status'] == 'created'
+
+    db = session_factory()
+    assert db.query(Analysis).count() == 2
+    db.close()
+
+def test_failing_file_does_not_stall_the_directory(session_factory, dirs):
+    watch, uploads = dirs
+    (watch / 'a.csv').write_bytes(HEADER + _rows(0, 5))
+    IngestWatcher(str(watch), session_factory, str(uploads)).poll()
+    
+    # The stored copy is gone, so the channels cannot be restored after a restart
+    db = session_factory()
+    os.remove(db.query(WatchedFile).one().stored_path)
+    db.close()
+    with open(watch / 'a.csv', 'ab') as f:
+        f.write(_rows(5, 5))
+    (watch / 'b.csv').write_bytes(HEADER + _rows(0, 3))
+    
+    events = IngestWatcher(str(watch), session_factory, str(uploads)).poll()
+    
+    assert [e['status'] for e in events] == ['error', 'created']
+    assert events[1]['path'].endswith('b.csv')
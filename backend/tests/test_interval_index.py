@@ -0,0 +1,31 @@
+import pytest
+import numpy as np
+from app.interval_index import IntervalIndex
+
+def _brute_overlap(starts, stops, lo, hi):
+    return np.flatnonzero((starts <= hi) & (stops >= lo))
+
+def test_overlap_matches_brute_force():
+    rng = np.random.default_rng(42)
+    starts = rng.uniform(0, 1000, 2000)
+    stops = starts + rng.exponential(5, 2000)
+    index = IntervalIndex(starts, stops, leaf_size=8)
+    
+    for _ in range(200):
+        lo = rng.uniform(-10, 1010)
+        hi = lo + rng.exponential(10)
+        assert np.array_equal(np.sort(index.overlap(lo, hi)), _brute_overlap(starts, stops, lo, hi))
+
+def test_stab_returns_all_containing_pairs():
+    starts = np.array([87.5, 98.0, 98.2, 150.0])
+    stops = np.array([108.0, 98.6, 98.4, 150.0])
+    index = IntervalIndex(starts, stops, leaf_size=1)
+    
+    point_ids, interval_ids = index.stab([98.3, 120.0, 150.0])
+    pairs = sorted(zip(point_ids.tolist(), interval_ids.tolist()))
+    
+    assert pairs == [(0, 0), (0, 1), (0, 2), (2, 3)]
+
+def test_rejects_inverted_interval():
+    with pytest.raises(ValueError):
+        IntervalIndex([10.0], [5.0])
@@ -0,0 +1,63 @@
+import pytest
+from app.database import LicensedStation
+from app.license_search import create_license_search_index, build_match_expression, search_licenses
+
+@pytest.fixture
+def db(db):
+    create_license_search_index(db.get_bind())
+    
+    stations = [
+        ('PT Radio Suara Lampung', 'PM4FAA', 'Studio Lampung', 'Bandar Lampung', 'Lampung', 'Broadcast', 98.3),
+        ('PT Radio Sriwijaya', 'PM5FBB', 'Studio Palembang', 'Palembang', 'Sumatera Selatan', 'Broadcast', 101.1),
+        ('Dinas Perhubungan', 'DISHUB', 'Repeater Way Kanan', 'Way Kanan', 'Lampung', 'Land Mobile', 150.5),
+    ]
+    for clnt_name, callsign, stn_name, city, province, service, freq in stations:
+        db.add(LicensedStation(
+            clnt_name=clnt_name, callsign=callsign, stn_name=stn_name,
+            city=city, province=province, service=service, freq=freq
+        ))
+    db.commit()
+    
+    return db
+
+def test_match_expression_quotes_prefix_terms():
+    assert build_match_expression("radio lamp") == '"radio"* "lamp"*'
+    assert build_match_expression(None, "sumatera") == 'province : ("sumatera"*)'
+    assert build_match_expression('"; DROP', None) == '"DROP"*'
+    assert build_match_expression("", "") is None
+
+def test_prefix_search_across_columns(db):
+    result = search_licenses(db, q="lamp")
+    assert {s.callsign for s in result['stations']} == {'PM4FAA', 'DISHUB'}
+    
+    result = search_licenses(db, q="pm5")
+    assert [s.callsign for s in result['stations']] == ['PM5FBB']
+    
+    result = search_licenses(db, province="lampung", service="land")
+    assert [s.callsign for s in result['stations']] == ['DISHUB']
+    
+    result = search_licenses(db, service="mobile")
+    assert [s.callsign for s in result['stations']] == ['DISHUB']
+
+def test_index_follows_writes(db):
+    station = db.query(LicensedStation).filter(LicensedStation.callsign == 'PM5FBB').first()
+    station.city = 'Prabumulih'
+    db.commit()
+    
+    assert search_licenses(db, q="palembang")['total'] == 1  # station name still matches
+    assert search_licenses(db, q="prabumulih")['total'] == 1
+    
+    db.query(LicensedStation).delete()
+    db.commit()
+    
+    assert search_licenses(db, q="lampung")['total'] == 0
+
+def test_keyset_pagination(db):
+    first = search_licenses(db, limit=2)
+    assert len(first['stations']) == 2
+    assert first['total'] == 3
+    assert first['total_is_estimate'] is False
+    
+    second = search_licenses(db, limit=2, after_id=first['next_after_id'])
+    assert len(second['stations']) == 1
+    assert second['next_after_id'] is None
@@ -0,0 +1,42 @@
+from app.database import LicensedStation
+from app.license_stats import apply_license_delta, reset_license_stats, rebuild_license_stats, get_license_stats
+
+def _add(db, licenses):
+    for record in licenses:
+        db.add(LicensedStation(**record))
+    apply_license_delta(db, licenses)
+    db.commit()
+
+def test_rollup_follows_uploads_and_matches_rebuild(db):
+    _add(db, [
+        {'service': 'Broadcast', 'province': 'Lampung', 'freq': 98.3},
+        {'service': 'Broadcast', 'province': 'Lampung', 'freq': 101.1},
+        {'service': 'Fixed', 'province': 'Bali', 'freq': 450.0},
+    ])
+    _add(db, [{'service': 'Fixed', 'province': 'Lampung', 'freq': 460.0}])
+    
+    stats = get_license_stats(db)
+    
+    assert stats['total_stations'] == 4
+    assert stats['by_service'] == [{'service': 'Broadcast', 'count': 2}, {'service': 'Fixed', 'count': 2}]
+    assert stats['top_provinces'][0] == {'province': 'Lampung', 'count': 3}
+    assert stats['generation'] == 2
+    
+    rebuild_license_stats(db)
+    db.commit()
+    rebuilt = get_license_stats(db)
+    assert rebuilt['by_service'] == stats['by_service']
+    assert rebuilt['top_provinces'] == stats['top_provinces']
+    assert rebuilt['generation'] == 3
+
+def test_reset_clears_rollup(db):
+    _add(db, [{'service': 'Broadcast', 'province': 'Lampung', 'freq': 98.3}])
+    
+    db.query(LicensedStation).delete()
+    reset_license_stats(db)
+    db.commit()
+    
+    stats = get_license_stats(db)
+    assert stats['total_stations'] == 0
+    assert stats['by_service'] == []
+    assert stats['generation'] == 2
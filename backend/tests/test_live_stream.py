@@ -0,0 +1,66 @@
+import asyncio
+import numpy as np
+import pytest
+from app.live_stream import LiveStation, LiveRegistry, LiveSweep
+
+FREQS = [100.0, 100.1, 100.2, 100.3]
+
+def test_accumulators_and_ring_buffer():
+    station = LiveStation('Bandar Lampung', FREQS, capacity=3)
+    station.add_sweep([20.0, 40.0, 20.0, np.nan])
+    station.add_sweep([20.0, 60.0, 10.0, np.nan])
+    for _ in range(3):
+        station.add_sweep([20.0, 40.0, 30.0, 25.0])
+    
+    assert station.sweeps == 5
+    assert station.max_hold.tolist() == [20.0, 60.0, 30.0, 25.0]
+    assert station.average[0] == pytest.approx(20.0)
+    # Floor drops at once and rises slowly
+    assert 10.0 < station.noise_floor[2] < 12.0
+    
+    times, levels = station.recent()
+    assert len(times) == 3
+    assert levels[:, 3].tolist() == [25.0, 25.0, 25.0]
+
+def test_sweep_must_match_channels():
+    station = LiveStation('x', FREQS)
+    with pytest.raises(ValueError):
+        station.add_sweep([1.0, 2.0])
+
+def test_registry_fans_out_and_drops_oldest(monkeypatch):
+    monkeypatch.setattr('app.live_stream.settings.LIVE_QUEUE_SIZE', 2)
+    registry = LiveRegistry()
+    
+    with pytest.raises(LookupError):
+        registry.ingest('x', LiveSweep(levels=[1.0, 2.0, 3.0, 4.0]))
+    
+    async def scenario():
+        queue = registry.subscribe('x')
+        registry.ingest('x', LiveSweep(levels=[1.0, 2.0, 3.0, 4.0], frequencies=FREQS))
+        for level in (5.0, 6.0):
+            registry.ingest('x', LiveSweep(levels=[level, None, 3.0, 4.0]))
+        first = await queue.get()
+        registry.unsubscribe('x', queue)
+        return first, queue.qsize()
+    
+    first, remaining = asyncio.run(scenario())
+    assert first['sweeps'] == 2
+    assert first['levels'] == [5.0, None, 3.0, 4.0]
+    assert remaining == 1
+    assert registry.summary()[0]['subscribers'] == 0
+
+def test_registry_rejects_sweeps_before_replacing_station(monkeypatch):
+    monkeypatch.setattr('app.live_stream.settings.LIVE_MAX_CHANNELS', 8)
+    monkeypatch.setattr('app.live_stream.settings.LIVE_MAX_STATIONS', 1)
+    registry = LiveRegistry()
+    registry.ingest('x', LiveSweep(levels=[1.0, 2.0, 3.0, 4.0], frequencies=FREQS))
+    
+    with pytest.raises(ValueError):
+        registry.ingest('x', LiveSweep(levels=[1.0, 2.0], frequencies=[200.0, 200.1, 200.2]))
+    assert registry.get('x').sweeps == 1
+    
+    with pytest.raises(ValueError):
+        registry.ingest('x', LiveSweep(levels=[1.0] * 9, frequencies=[200.0 + i for i in range(9)]))
+    with pytest.raises(ValueError):
+        registry.ingest('y', LiveSweep(levels=[1.0, 2.0, 3.0, 4.0], frequencies=FREQS))
+    assert [s['station'] for s in registry.summary()] == ['x']
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from app.analyzer import SpectrumAnalyzer
+from app.noise_floor import rolling_noise_floor
+
+def _sloped_band():
+    # Noise rising from 10 to 40 dB across a wide band, with carriers on top
+    freqs = np.round(np.arange(478.0, 806.0, 0.1), 3)
+    rng = np.random.default_rng(0)
+    levels = np.linspace(10.0, 40.0, len(freqs)) + rng.normal(0, 1.0, len(freqs))
+    for carrier in (490.0, 790.0):
+        levels[np.abs(freqs - carrier) < 0.01] += 25.0
+    return freqs, levels
+
+def test_rolling_floor_follows_the_slope():
+    freqs, levels = _sloped_band()
+    floor = rolling_noise_floor(freqs, levels, window_mhz=10.0, percentile=10.0)
+    
+    assert floor.shape == levels.shape
+    assert abs(floor[freqs < 490].mean() - 10.5) < 2.0
+    assert abs(floor[freqs > 790].mean() - 38.5) < 2.0
+    assert rolling_noise_floor([], [], 10.0).size == 0
+
+def test_adaptive_threshold_finds_carriers_in_sloped_band():
+    freqs, levels = _sloped_band()
+    channels = pd.DataFrame({'channel_no': range(len(freqs)), 'frequency': freqs,
+                             'avg_field_strength': levels, 'max_field_strength': levels})
+    bands = [{'band_number': 1, 'start_freq': 478.0, 'stop_freq': 806.0, 'bandwidth': 8000.0}]
+    analyzer = SpectrumAnalyzer(channels, bands, {})
+    
+    flat = analyzer.analyze_band(1, margin_db=10.0, use_auto_threshold=True)
+    adaptive = analyzer.analyze_band(1, margin_db=10.0, adaptive_noise_floor=True, noise_window_mhz=10.0)
+    
+    adaptive_freqs = sorted(round(c['frequency'], 1) for c in adaptive['occupied_list'])
+    assert adaptive_freqs == [490.0, 790.0]
+    assert len(flat['occupied_list']) > 2
+    assert adaptive['auto_threshold_info']['adaptive']['max'] > adaptive['auto_threshold_info']['adaptive']['min'] + 20
@@ -1,4 +1,5 @@
 import pytest
+import numpy as np
 from app.parser import CSVParser
 
 def test_csv_parser_valid_file():
@@ -44,3 +45,28 @@ Task ID^Operator
     parser = CSVParser(invalid_csv)
     with pytest.raises(ValueError, match="missing required sections"):
         parser.parse()
+
+def test_csv_parser_sweep_export():
+    sweep_csv = b"""sep=^
+Task ID^Storage Interval^Start Time^Station Name
+1925^15 secs^12/15/2025 7:30:00 AM^Bandar Lampung
+
+Band #^Start Frequency (MHz)^Stop Frequency (MHz)^Bandwidth (kHz)
+1^87.000000^108.000000^50.00000
+
+Time^Channel No.^Frequency (MHz)^Field Strength (dBuV/m)
+12/15/2025 7:30:00 AM^1^87.000000^40
+12/15/2025 7:30:00 AM^2^87.050000^20
+12/15/2025 7:30:15 AM^1^87.000000^40
+12/15/2025 7:30:15 AM^2^87.050000^60
+"""
+    
+    result = CSVParser(sweep_csv).parse()
+    
+    assert result['channels_count'] == 2
+    assert result['sweeps']['levels'].shape == (2, 2)
+    assert result['sweeps']['times'][1] == np.datetime64('2025-12-15T07:30:15')
+    second = result['channels'][1]
+    assert second['max_field_strength'] == 60.0
+    # Linear mean of 20 and 60 dBuV/m
+    assert second['avg_field_strength'] == 54.07
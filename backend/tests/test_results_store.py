@@ -0,0 +1,46 @@
+from datetime import datetime
+from app.database import Analysis, BandResult, PeakResult
+from app.results_store import store_band_result, occupancy_by_station, find_peaks
+
+def _results(occupancy, peaks):
+    return {
+        'band_number': 1,
+        'band_info': {'band_number': 1, 'start_freq': 87.0, 'stop_freq': 108.0, 'bandwidth': 50.0},
+        'total_channels': 100,
+        'occupied_channels': len(peaks),
+        'occupancy_percentage': occupancy,
+        'noise_floor': 20.0,
+        'occupied_list': [
+            {'channel_no': i, 'frequency': f, 'avg_field_strength': level, 'max_field_strength': level + 5,
+             'station': {'name': 'RRI', 'callsign': 'RRI'} if i == 0 else None}
+            for i, (f, level) in enumerate(peaks)
+        ],
+        'anomalies': [],
+        'threshold_used': 50.0,
+        'auto_threshold_info': {'is_auto': False}
+    }
+
+def test_runs_are_kept_and_aggregated(db):
+    lampung = Analysis(task_id='1', station_name='Bandar Lampung', start_time=datetime(2025, 12, 15))
+    metro = Analysis(task_id='2', station_name='Metro Lampung', start_time=datetime(2025, 11, 1))
+    db.add_all([lampung, metro])
+    db.flush()
+    
+    store_band_result(db, lampung, _results(10.0, [(98.3, 70.0), (101.1, 55.0)]))
+    store_band_result(db, lampung, _results(20.0, [(98.3, 70.0)]))
+    store_band_result(db, metro, _results(30.0, [(98.3, 60.0)]))
+    db.commit()
+    
+    summary = occupancy_by_station(db, 1, station='lampung', date_from=datetime(2025, 10, 1))
+    assert [(s['station_name'], s['runs'], s['avg_occupancy_percentage']) for s in summary] == [
+        ('Bandar Lampung', 2, 15.0), ('Metro Lampung', 1, 30.0)
+    ]
+    
+    peaks = find_peaks(db, 98.0, 99.0, min_level=65.0)
+    assert len(peaks) == 2
+    assert all(p['licensed'] for p in peaks)
+    
+    db.delete(lampung)
+    db.commit()
+    assert db.query(BandResult).count() == 1
+    assert db.query(PeakResult).count() == 1
@@ -0,0 +1,50 @@
+import pytest
+import numpy as np
+import pandas as pd
+from app.analyzer import SpectrumAnalyzer
+from app.database import LicensedStation
+from app.spatial_index import create_spatial_index, haversine_km, stations_in_bbox, stations_within_radius
+
+@pytest.fixture
+def db(db):
+    create_spatial_index(db.get_bind())
+    
+    # Bandar Lampung, Metro (~45 km), Palembang (~330 km), no coordinates
+    for callsign, lat, lon in [('BDL', -5.43, 105.26), ('MET', -5.11, 105.31),
+                               ('PLG', -2.99, 104.76), ('NONE', None, None)]:
+        db.add(LicensedStation(callsign=callsign, freq=98.3, latitude=lat, longitude=lon))
+    db.commit()
+    
+    return db
+
+def test_haversine_vectorized():
+    distances = haversine_km(-5.43, 105.26, [-5.43, -2.99], [105.26, 104.76])
+    assert distances[0] == pytest.approx(0.0)
+    assert distances[1] == pytest.approx(276.8, abs=1.0)
+
+def test_radius_query_ranks_nearest_first(db):
+    results = stations_within_radius(db, -5.36, 105.22, 100.0)
+    assert [s.callsign for s, _ in results] == ['BDL', 'MET']
+    assert results[0][1] < results[1][1]
+
+def test_bbox_query_and_index_sync(db):
+    stations = stations_in_bbox(db, -6.0, -5.0, 105.0, 106.0)
+    assert {s.callsign for s in stations} == {'BDL', 'MET'}
+    
+    metro = db.query(LicensedStation).filter(LicensedStation.callsign == 'MET').first()
+    metro.latitude, metro.longitude = -3.0, 104.7
+    db.commit()
+    
+    stations = stations_in_bbox(db, -6.0, -5.0, 105.0, 106.0)
+    assert [s.callsign for s in stations] == ['BDL']
+
+def test_analyzer_keeps_stations_without_coordinates(db):
+    channels = pd.DataFrame({'channel_no': [1], 'frequency': [98.3],
+                             'avg_field_strength': [60.0], 'max_field_strength': [65.0]})
+    bands = [{'band_number': 1, 'start_freq': 87.0, 'stop_freq': 108.0, 'bandwidth': 50.0}]
+    metadata = {'Location (lat)': -5.36, 'Location (lon)': 105.22}
+    
+    analyzer = SpectrumAnalyzer(channels, bands, metadata, db)
+    
+    assert [s['callsign'] for s in analyzer.licensed_stations] == ['BDL', 'MET', 'NONE']
+    assert analyzer.licensed_stations[2]['distance_km'] is None
@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import io
+import os
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from app.config import settings
+from app.compression import compress_file, file_compression
+from app.parser import CSVParser
+from app.storage import read_measurement_bytes, spool_file, spool_upload
+
+BOUNDARY = 'testboundary'
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, 'UPLOAD_DIR', str(tmp_path))
+    return tmp_path
+
+def _request(content: bytes, filename: str = 'a.csv', chunk: int = 1000) -> Request:
+    body = (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="note"\r\n\r\nhello\r\n'
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f'Content-Type: text/csv\r\n\r\n'
+    ).encode() + content + f'\r\n--{BOUNDARY}--\r\n'.encode()
+    chunks = [body[i:i + chunk] for i in range(0, len(body), chunk)]
+
+    async def receive():
+        data = chunks.pop(0) if chunks else b''
+        return {'type': 'http.request', 'body': data, 'more_body': bool(chunks)}
+
+    headers = [(b'content-type', f'multipart/form-data; boundary={BOUNDARY}'.encode())]
+    return Request({'type': 'http', 'method': 'POST', 'headers': headers}, receive)
+
+def test_spool_file_hashes_and_enforces_limit(upload_dir, monkeypatch):
+    content = b'x' * (3 * 1024 * 1024 + 10)
+    spool = spool_file(io.BytesIO(content))
+    assert spool.size == len(content)
+    assert spool.sha256 == hashlib.sha256(content).hexdigest()
+    path = spool.keep(str(upload_dir / 'kept.csv'))
+    assert open(path, 'rb').read() == content
+
+    monkeypatch.setattr(settings, 'MAX_UPLOAD_SIZE_MB', 2)
+    with pytest.raises(HTTPException) as error:
+        spool_file(io.BytesIO(content))
+    assert error.value.status_code == 413
+    assert os.listdir(upload_dir) == ['kept.csv']
+
+def test_spool_upload_streams_file_part(upload_dir, monkeypatch):
+    content = bytes(range(256)) * 40
+    filename, spool = asyncio.run(spool_upload(_request(content)))
+    assert filename == 'a.csv'
+    assert open(spool.path, 'rb').read() == content
+    assert spool.sha256 == hashlib.sha256(content).hexdigest()
+    spool.discard()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(spool_upload(_request(content, filename='a.pdf')))
+    assert error.value.status_code == 400
+
+    monkeypatch.setattr(settings, 'MAX_UPLOAD_SIZE_MB', 1)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(spool_upload(_request(b'x' * (1024 * 1024 + 1), chunk=64 * 1024)))
+    assert error.value.status_code == 413
+    assert os.listdir(upload_dir) == []
+
+def test_compressed_files_parse_and_read_transparently(upload_dir, monkeypatch):
+    content = b"""sep=^
+Task ID^Station Name
+1924^Bandar Lampung
+
+Band #^Start Frequency (MHz)^Stop Frequency (MHz)^Bandwidth (kHz)
+1^87.000000^108.000000^50.00000
+
+Channel No.^Frequency (MHz)^Maximum Field Strength (dBuV/m)^Average Field Strength (dBuV/m)
+1^87.000000^44^36
+2^87.050000^47^43
+"""
+    path = str(upload_dir / 'a.csv')
+    with open(path, 'wb') as f:
+        f.write(content)
+    raw = CSVParser.from_file(path).parse()
+
+    compressed = compress_file(path, 'gzip')
+    assert compressed.endswith('.csv.gz') and not os.path.exists(path)
+    assert file_compression(compressed) == 'gzip'
+    assert read_measurement_bytes(compressed) == content
+    assert CSVParser.from_file(compressed).parse()['channels'] == raw['channels']
+
+    monkeypatch.setattr(settings, 'MAX_DECOMPRESSED_SIZE_MB', 0)
+    with pytest.raises(ValueError):
+        read_measurement_bytes(compressed)
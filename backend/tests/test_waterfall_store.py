@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from app.waterfall_store import WaterfallStore, write_waterfall, quantize, dequantize, decimate_max
+
+@pytest.fixture
+def matrix():
+    rng = np.random.default_rng(0)
+    levels = rng.uniform(0.0, 100.0, size=(10, 37)).astype(np.float32)
+    levels[3, 5] = np.nan
+    times = np.datetime64('2025-12-15T07:30:00') + np.arange(10) * np.timedelta64(15, 's')
+    frequencies = 87.0 + np.arange(37) * 0.05
+    return times, frequencies, levels
+
+def test_uint8_quantization_keeps_half_db_and_nan():
+    levels = np.array([-20.0, 36.3, 150.0, np.nan], dtype=np.float32)
+    restored = dequantize(quantize(levels, 'uint8', 0.5, -20.0), 'uint8', 0.5, -20.0)
+    assert restored[0] == -20.0
+    assert abs(restored[1] - 36.3) <= 0.25
+    assert restored[2] == 107.0
+    assert np.isnan(restored[3])
+
+@pytest.mark.parametrize('dtype', ['uint8', 'float16'])
+def test_read_ranges_across_tiles(tmp_path, matrix, dtype):
+    times, frequencies, levels = matrix
+    path = str(tmp_path / 'sweeps.wf')
+    write_waterfall(path, times, frequencies, levels, dtype=dtype, tile_sweeps=4, tile_channels=8)
+    
+    with WaterfallStore(path) as store:
+        assert (store.sweeps, store.channels) == (10, 37)
+        
+        got_times, got_freqs, got = store.read(87.3, 87.8, times[2], times[6])
+        assert got_times[0] == times[2] and len(got_times) == 5
+        assert got_freqs[0] == pytest.approx(87.3) and len(got_freqs) == 11
+        
+        expected = levels[2:7, 6:17]
+        assert np.array_equal(np.isnan(got), np.isnan(expected))
+        assert np.nanmax(np.abs(got - expected)) <= 0.25
+        
+        _, _, everything = store.read()
+        assert everything.shape == (10, 37)
+
+def test_decimate_keeps_maxima(matrix):
+    _, _, levels = matrix
+    reduced, rows, cols = decimate_max(levels, 5, 10)
+    assert reduced.shape == (len(rows), len(cols))
+    assert np.nanmax(reduced) == np.nanmax(levels)
@@ -0,0 +1,32 @@
+"""
+Tail a directory of measurement CSVs that receivers are still writing.
+
+Run from the backend directory: python watch_ingest.py DIR [--interval SECONDS] [--once]
+"""
+import argparse
+
+from app.database import init_db
+from app.ingest_watcher import IngestWatcher
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest growing measurement CSVs from a directory")
+    parser.add_argument("directory")
+    parser.add_argument("--interval", type=float, default=None, help="seconds between polls")
+    parser.add_argument("--once", action="store_true", help="poll once and exit")
+    args = parser.parse_args()
+
+    init_db()
+    watcher = IngestWatcher(args.directory)
+    if args.once:
+        for event in watcher.poll():
+            print(event)
+        return
+
+    print(f"Watching {args.directory}... (Ctrl+C to stop)")
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+if __name__ == "__main__":
+    main()
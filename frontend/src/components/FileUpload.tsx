@@ -18,8 +18,8 @@ export default function FileUpload({ onUploadSuccess }: FileUploadProps) {
   const handleFileChange = (e: React.ChangeEvent<HTMLInputElement>) => {
     const selectedFile = e.target.files?.[0]
     if (selectedFile) {
-      if (!selectedFile.name.endsWith('.csv')) {
-        setError('Hanya file CSV yang diperbolehkan')
+      if (!/\.csv(\.gz|\.zst)?$/i.test(selectedFile.name)) {
+        setError('Hanya file CSV (boleh dikompresi .gz/.zst) yang diperbolehkan')
         return
       }
       if (selectedFile.size > 10 * 1024 * 1024) {
@@ -63,7 +63,7 @@ export default function FileUpload({ onUploadSuccess }: FileUploadProps) {
         <input
           ref={fileInputRef}
           type="file"
-          accept=".csv"
+          accept=".csv,.gz,.zst"
           onChange={handleFileChange}
           className="hidden"
           id="file-upload"